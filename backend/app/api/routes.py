@@ -1,93 +1,367 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, UploadFile, File, Form, Query, Response, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from starlette.websockets import WebSocketState
 from typing import List, Optional
-import json
+import asyncio
+import dataclasses
 from datetime import datetime
+from pathlib import Path
 
 from app.core.database import get_db
-from app.models.models import User, LoanApplication, Document, VideoInteraction, LoanStatus, DocumentType
-from app.services.video_service import process_video, verify_face
-from app.services.document_service import process_document, extract_document_data
-from app.services.loan_service import evaluate_loan_eligibility
+from app.models.models import User, LoanApplication, Document, VideoInteraction, LoanStatus, DocumentType, JobStatus
+from app.services.video_service import LiveRecording, process_video, record_video_interaction, screen_video, verify_face
+from app.services.application_cache import application_cache
+from app.services.audio_service import schedule_transcription, transcribe_interaction
+from app.services.document_service import process_document, screen_document
+from app.services.document_jobs import document_jobs
+from app.services.eligibility_rules import rule_engine
+from app.services.eligibility_state import initialize_eligibility, update_eligibility
+from app.services.identity_search import IdentifierType, find_documents, find_duplicate_identities
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from app.services.portfolio_rescoring import rescore_portfolio
+from app.services.upload_service import UploadRejected
 
 router = APIRouter()
 
 @router.post("/video-interaction")
 async def create_video_interaction(
+    background_tasks: BackgroundTasks,
     video: UploadFile = File(...),
     question_id: int = Form(...),
     user_id: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Process a video interaction from the user
+    Process a video interaction from the user; the answer is transcribed in the background
     """
     try:
         # Save video file
-        video_path = await process_video(video)
+        upload = await process_video(video)
+        video_path = upload.path
         
-        # Verify face in video
-        face_verified = await verify_face(video_path)
+        # Reject corrupt, over-long or unsupported videos from their headers alone
+        metadata = await screen_video(upload)
         
-        # Create video interaction record
-        video_interaction = VideoInteraction(
-            user_id=user_id,
-            video_path=video_path,
-            question_id=question_id,
-            face_verified=face_verified
+        # Find the face in the video and check it's the person from earlier interactions
+        face_result = await verify_face(video_path, metadata.frame_count)
+        video_interaction, face_match = await record_video_interaction(
+            db, user_id, question_id, video_path, face_result, metadata
         )
         
-        db.add(video_interaction)
-        db.commit()
-        db.refresh(video_interaction)
+        # Runs after the response is sent; poll GET /video-interaction/{id} for the transcript
+        if video_interaction.transcription_status == JobStatus.QUEUED:
+            background_tasks.add_task(transcribe_interaction, video_interaction.id, video_path)
         
         return {
             "status": "success",
-            "face_verified": face_verified,
-            "video_interaction_id": video_interaction.id
+            "face_verified": video_interaction.face_verified,
+            "face_match": face_match,
+            "face_detection": face_result,
+            "video": metadata.to_dict(),
+            "video_interaction_id": video_interaction.id,
+            "transcription_status": video_interaction.transcription_status
         }
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/documents")
+@router.websocket("/video-interaction/stream")
+async def stream_video_interaction(
+    websocket: WebSocket,
+    question_id: int,
+    user_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Receive a video answer while it is being recorded.
+    
+    The client sends MediaRecorder chunks as binary messages and the text message "end"
+    when recording stops. The face is searched for as chunks arrive; the server sends a
+    {"type": "face"} message per scan and a final {"type": "result"} message shaped like
+    the POST /video-interaction response.
+    """
+    await websocket.accept()
+    recording = LiveRecording()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                scan = await recording.add_chunk(message["bytes"])
+                if scan is not None:
+                    await websocket.send_json({"type": "face", **face_stats(scan)})
+            elif message.get("text") == "end":
+                break
+        
+        upload, face_result, metadata = await recording.finish()
+        video_interaction, face_match = await record_video_interaction(
+            db, user_id, question_id, upload.path, face_result, metadata
+        )
+        if video_interaction.transcription_status == JobStatus.QUEUED:
+            schedule_transcription(video_interaction.id, upload.path)
+        
+        await websocket.send_json({
+            "type": "result",
+            "status": "success",
+            "face_verified": video_interaction.face_verified,
+            "face_match": face_match,
+            "face_detection": face_stats(face_result),
+            "video": metadata.to_dict(),
+            "video_interaction_id": video_interaction.id,
+            "transcription_status": video_interaction.transcription_status
+        })
+        await websocket.close()
+    except WebSocketDisconnect:
+        # The browser went away mid-recording; drop the partial file
+        await recording.discard()
+    except UploadRejected as e:
+        await recording.discard()
+        await close_with_error(websocket, e.status_code, e.detail, code=1008)
+    except Exception as e:
+        await recording.discard()
+        await close_with_error(websocket, 500, str(e), code=1011)
+
+async def close_with_error(websocket: WebSocket, status_code: int, detail, code: int):
+    """
+    Send a {"type": "error"} message and close, unless the client has already gone away
+    """
+    if websocket.client_state != WebSocketState.CONNECTED or websocket.application_state != WebSocketState.CONNECTED:
+        return
+    try:
+        await websocket.send_json({"type": "error", "status_code": status_code, "detail": detail})
+        await websocket.close(code=code)
+    except (WebSocketDisconnect, RuntimeError):
+        # Disconnected while the error was being sent
+        pass
+
+def face_stats(face_result: dict) -> dict:
+    return {name: value for name, value in face_result.items() if name != "encoding"}
+
+async def list_page(db: AsyncSession, query, model, cursor: Optional[str], limit: int) -> dict:
+    try:
+        page = await keyset_page(db, query, model, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": page.items, "next_cursor": page.next_cursor}
+
+@router.get("/video-interaction")
+async def list_video_interactions(
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    A user's video interactions, newest first; pass next_cursor back as cursor for the next page
+    """
+    query = select(VideoInteraction).where(VideoInteraction.user_id == user_id)
+    page = await list_page(db, query, VideoInteraction, cursor, limit)
+    page["items"] = [
+        {
+            "id": video_interaction.id,
+            "question_id": video_interaction.question_id,
+            "face_verified": video_interaction.face_verified,
+            "transcription_status": video_interaction.transcription_status,
+            "duration": video_interaction.duration,
+            "created_at": video_interaction.created_at
+        }
+        for video_interaction in page["items"]
+    ]
+    return page
+
+@router.get("/video-interaction/{video_interaction_id}")
+async def get_video_interaction(
+    video_interaction_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a video interaction, including its transcript so far
+    """
+    video_interaction = await db.get(VideoInteraction, video_interaction_id)
+    
+    if not video_interaction:
+        raise HTTPException(status_code=404, detail="Video interaction not found")
+    
+    return {
+        "id": video_interaction.id,
+        "question_id": video_interaction.question_id,
+        "face_verified": video_interaction.face_verified,
+        "response_text": video_interaction.response_text,
+        "transcription_status": video_interaction.transcription_status,
+        "duration": video_interaction.duration,
+        "has_audio": video_interaction.has_audio,
+        "created_at": video_interaction.created_at
+    }
+
+@router.post("/documents", status_code=202)
 async def upload_document(
     document: UploadFile = File(...),
     document_type: DocumentType = Form(...),
     user_id: int = Form(...),
     loan_application_id: Optional[int] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Upload and process a document
+    Upload a document and queue it for data extraction; poll GET /documents/{id} for the result
     """
     try:
         # Save document file
-        file_path = await process_document(document)
+        upload = await process_document(document)
+        file_path = upload.path
         
-        # Extract data from document
-        extracted_data = await extract_document_data(file_path, document_type)
+        # Reject unusable scans before spending OCR time on them
+        quality = await screen_document(upload)
         
-        # Create document record
-        doc = Document(
-            user_id=user_id,
-            loan_application_id=loan_application_id,
-            document_type=document_type,
-            file_path=file_path,
-            extracted_data=json.dumps(extracted_data)
-        )
+        try:
+            loan_application = None
+            if loan_application_id is not None:
+                # Lock the application before inserting the document: the insert's foreign
+                # key check takes a share lock on the row, and two uploads each holding one
+                # would deadlock asking for this lock. Taken first, it serializes them.
+                loan_application = await db.get(LoanApplication, loan_application_id, with_for_update=True)
+                if not loan_application:
+                    raise HTTPException(status_code=404, detail="Loan application not found")
+            
+            # Create document record; it doubles as the extraction job
+            doc = Document(
+                user_id=user_id,
+                loan_application_id=loan_application_id,
+                document_type=document_type,
+                file_path=file_path,
+                content_hash=upload.sha256,
+                status=JobStatus.QUEUED,
+                progress=0
+            )
+            db.add(doc)
+            await db.flush()
+            
+            if loan_application is not None:
+                # Add the document's checks to the application's eligibility state in the
+                # same transaction
+                if loan_application.eligibility_state is None:
+                    documents = await db.scalars(
+                        select(Document).where(Document.loan_application_id == loan_application_id)
+                    )
+                    initialize_eligibility(loan_application, documents.all())
+                else:
+                    update_eligibility(loan_application, doc)
+            await db.commit()
+        except BaseException:
+            # Without its document row nothing would ever refer to the saved file
+            Path(file_path).unlink(missing_ok=True)
+            raise
+        if loan_application_id is not None:
+            application_cache.invalidate(loan_application_id)
+        await db.refresh(doc)
         
-        db.add(doc)
-        db.commit()
-        db.refresh(doc)
+        document_jobs.enqueue(doc.id)
         
         return {
-            "status": "success",
+            "status": "accepted",
             "document_id": doc.id,
-            "extracted_data": extracted_data
+            "job_status": doc.status,
+            "quality_warnings": quality.warnings
         }
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/documents")
+async def list_documents(
+    user_id: Optional[int] = None,
+    loan_application_id: Optional[int] = None,
+    status: Optional[JobStatus] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Documents, newest first, by user, loan application or extraction status; pass
+    next_cursor back as cursor for the next page
+    """
+    query = select(Document).options(defer(Document.extracted_data))
+    if user_id is not None:
+        query = query.where(Document.user_id == user_id)
+    if loan_application_id is not None:
+        query = query.where(Document.loan_application_id == loan_application_id)
+    if status is not None:
+        query = query.where(Document.status == status)
+    page = await list_page(db, query, Document, cursor, limit)
+    page["items"] = [
+        {
+            "id": doc.id,
+            "document_type": doc.document_type,
+            "user_id": doc.user_id,
+            "loan_application_id": doc.loan_application_id,
+            "status": doc.status,
+            "progress": doc.progress,
+            "is_verified": doc.is_verified,
+            "created_at": doc.created_at
+        }
+        for doc in page["items"]
+    ]
+    return page
+
+@router.get("/documents/{document_id}")
+async def get_document(
+    document_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get a document's extraction status, progress and, once completed, its extracted data
+    """
+    doc = await db.get(Document, document_id)
+    
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return {
+        "id": doc.id,
+        "document_type": doc.document_type,
+        "loan_application_id": doc.loan_application_id,
+        "status": doc.status,
+        "progress": doc.progress,
+        "error": doc.error,
+        "extracted_data": doc.extracted_data,
+        "is_verified": doc.is_verified,
+        "created_at": doc.created_at,
+        "updated_at": doc.updated_at
+    }
+
+@router.get("/identity-search")
+async def search_identity(
+    identifier_type: IdentifierType,
+    value: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find the documents, applicants and loan applications carrying a PAN or Aadhaar number
+    """
+    documents = await find_documents(db, identifier_type, value)
+    return {
+        "documents": [
+            {
+                "id": doc.id,
+                "document_type": doc.document_type,
+                "user_id": doc.user_id,
+                "loan_application_id": doc.loan_application_id,
+                "created_at": doc.created_at
+            }
+            for doc in documents
+        ],
+        "user_ids": sorted({doc.user_id for doc in documents if doc.user_id is not None}),
+        "loan_application_ids": sorted({
+            doc.loan_application_id for doc in documents if doc.loan_application_id is not None
+        })
+    }
+
 @router.post("/loan-applications")
 async def create_loan_application(
     loan_amount: float = Form(...),
@@ -95,10 +369,11 @@ async def create_loan_application(
     monthly_income: float = Form(...),
     employment_type: str = Form(...),
     user_id: int = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Create a new loan application
+    Create a new loan application and decide it under the active eligibility ruleset;
+    see GET /eligibility-rules
     """
     try:
         # Create loan application
@@ -110,16 +385,15 @@ async def create_loan_application(
             employment_type=employment_type
         )
         
-        db.add(loan_application)
-        db.commit()
-        db.refresh(loan_application)
-        
-        # Evaluate eligibility
-        eligibility_result = await evaluate_loan_eligibility(loan_application.id, db)
+        # Evaluate eligibility; documents are attached after creation, so a new
+        # application has none and nothing needs loading. This also sets the status and
+        # starts the eligibility state that document uploads update.
+        eligibility_result = initialize_eligibility(loan_application)
         
-        # Update loan status based on evaluation
-        loan_application.status = eligibility_result["status"]
-        db.commit()
+        # Insert it with its status in one transaction
+        db.add(loan_application)
+        await db.commit()
+        application_cache.invalidate(loan_application.id)
         
         return {
             "status": "success",
@@ -129,28 +403,116 @@ async def create_loan_application(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/loan-applications")
+async def list_loan_applications(
+    status: Optional[LoanStatus] = None,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Loan applications, newest first, optionally by status or user; pass next_cursor back
+    as cursor for the next page
+    """
+    query = select(LoanApplication).options(defer(LoanApplication.eligibility_state))
+    if status is not None:
+        query = query.where(LoanApplication.status == status)
+    if user_id is not None:
+        query = query.where(LoanApplication.user_id == user_id)
+    page = await list_page(db, query, LoanApplication, cursor, limit)
+    page["items"] = [
+        {
+            "id": loan_application.id,
+            "user_id": loan_application.user_id,
+            "loan_amount": loan_application.loan_amount,
+            "loan_type": loan_application.loan_type,
+            "status": loan_application.status,
+            "ruleset_version": loan_application.ruleset_version,
+            "created_at": loan_application.created_at
+        }
+        for loan_application in page["items"]
+    ]
+    return page
+
+@router.post("/loan-applications/rescore")
+async def rescore_loan_applications(
+    min_monthly_income: Optional[float] = Form(None),
+    max_loan_multiplier: Optional[float] = Form(None),
+    apply: bool = Form(False)
+):
+    """
+    Re-score applications against the active eligibility ruleset.
+    
+    Applications failing its income, employment or loan amount rules become rejected,
+    whatever their status. Rejected applications passing them are decided again from
+    their stored document checks and become approved or more_info_needed. Other
+    applications passing them keep their status: pending ones haven't been evaluated yet,
+    and the documents behind approved and more_info_needed ones haven't changed. Applied
+    changes save each application's eligibility state with its status.
+    
+    Without apply=true this only reports which statuses would change; thresholds given
+    here override the ruleset's for such a what-if run. Applying uses the active ruleset
+    as is, so every saved status is traceable to a ruleset version.
+    """
+    ruleset = rule_engine.active.ruleset
+    overrides = {"min_monthly_income": min_monthly_income, "max_loan_multiplier": max_loan_multiplier}
+    overrides = {name: value for name, value in overrides.items() if value is not None}
+    if overrides:
+        if apply:
+            raise HTTPException(status_code=400, detail="Change the eligibility rules file to apply new thresholds")
+        ruleset = dataclasses.replace(ruleset, version=f"{ruleset.version}+what-if", **overrides)
+    try:
+        # Bulk reads and NumPy work; keep them off the event loop
+        report = await asyncio.to_thread(rescore_portfolio, ruleset, apply=apply)
+        return report.to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/eligibility-rules")
+async def get_eligibility_rules():
+    """
+    The eligibility ruleset new decisions are made with. Applications failing its income,
+    employment type or loan amount rules are rejected whatever documents they have; an
+    empty employment_types accepts any employment type.
+    """
+    return rule_engine.active.ruleset.to_dict()
+
 @router.get("/loan-applications/{loan_application_id}")
 async def get_loan_application(
     loan_application_id: int,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get loan application details; send the ETag back as If-None-Match to get a bodiless
+    304 while the application is unchanged
+    """
+    # Served from the application cache; a hit doesn't touch the database
+    view = await application_cache.get(db, loan_application_id)
+    
+    if view is None:
+        raise HTTPException(status_code=404, detail="Loan application not found")
+    
+    if view.not_modified(if_none_match):
+        return Response(status_code=304, headers=view.headers)
+    return Response(content=view.body, media_type="application/json", headers=view.headers)
+
+@router.get("/loan-applications/{loan_application_id}/duplicate-identities")
+async def get_duplicate_identities(
+    loan_application_id: int,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get loan application details
+    Other documents sharing a PAN or Aadhaar number with this application's documents.
+    Matches from another user_id point at one identity used by several applicants.
     """
-    loan_application = db.query(LoanApplication).filter(
-        LoanApplication.id == loan_application_id
-    ).first()
+    loan_application = await db.get(LoanApplication, loan_application_id)
     
     if not loan_application:
         raise HTTPException(status_code=404, detail="Loan application not found")
     
-    return {
-        "id": loan_application.id,
-        "loan_amount": loan_application.loan_amount,
-        "loan_type": loan_application.loan_type,
-        "status": loan_application.status,
-        "monthly_income": loan_application.monthly_income,
-        "employment_type": loan_application.employment_type,
-        "created_at": loan_application.created_at,
-        "updated_at": loan_application.updated_at
-    } 
\ No newline at end of file
+    duplicates = await find_duplicate_identities(db, loan_application_id)
+    for duplicate in duplicates:
+        duplicate["other_user"] = duplicate["user_id"] != loan_application.user_id
+    return {"loan_application_id": loan_application_id, "duplicates": duplicates}
@@ -17,21 +17,97 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "ai_branch_manager"
-    SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    SQLALCHEMY_DATABASE_URI: Optional[str] = None  # sync engine, for scripts and worker threads
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None  # request handlers; derived from the sync URI by default
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
     
     # File Storage
     UPLOAD_DIR: Path = Path("uploads")
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_VIDEO_UPLOAD_SIZE: int = 200 * 1024 * 1024  # 200MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB
     
     # Video Processing
     VIDEO_FORMATS: list = ["mp4", "webm", "mov"]
+    VIDEO_CODECS: list = ["h264", "hevc", "vp8", "vp9", "av1", "mpeg4"]
     MAX_VIDEO_DURATION: int = 300  # 5 minutes
+    VIDEO_STREAM_ALLOWANCE: float = 10.0  # seconds a live recording may take beyond MAX_VIDEO_DURATION to arrive
+    FFPROBE_CMD: str = "ffprobe"
+    VIDEO_PROBE_TIMEOUT: int = 10  # seconds
+    
+    # Audio Transcription
+    FFMPEG_CMD: str = "ffmpeg"
+    AUDIO_VAD_THRESHOLD_DB: float = -40.0  # frames quieter than this (dBFS) are silence
+    AUDIO_VAD_MIN_SILENCE_MS: int = 400  # a pause this long ends a speech segment
+    AUDIO_VAD_MIN_SPEECH_MS: int = 250  # shorter noises are dropped
+    AUDIO_MAX_SEGMENT_SECONDS: float = 20.0
+    STT_BACKEND: str = "faster_whisper"  # or "stub" for tests
+    STT_MODEL: str = "base.en"
+    STT_LANGUAGE: str = "en"
+    STT_THREADS: int = 2
+    TRANSCRIPTION_WORKERS: int = 1  # videos transcribed at the same time
+    
+    # Loan Eligibility
+    ELIGIBILITY_RULES_PATH: Optional[Path] = None  # JSON ruleset; defaults to services/eligibility_rules.json
+    ELIGIBILITY_RULES_CHECK_INTERVAL: float = 5.0  # seconds between checks of the rules file for changes
+    RESCORE_CHUNK_SIZE: int = 50000  # applications read per query when re-scoring the portfolio
     
     # Document Processing
     ALLOWED_DOCUMENT_TYPES: list = ["image/jpeg", "image/png", "application/pdf"]
     
+    # Image Quality Gate
+    QUALITY_GATE_ENABLED: bool = True
+    QUALITY_MIN_SHORT_SIDE: int = 500  # pixels
+    QUALITY_MIN_SHARPNESS: float = 60.0  # variance of the Laplacian at 1000px
+    QUALITY_MIN_BRIGHTNESS: int = 50
+    QUALITY_MAX_BRIGHTNESS: int = 248
+    QUALITY_MIN_CONTRAST: float = 20.0
+    
+    # PDF Processing
+    PDF_RASTER_DPI: int = 200
+    PDF_MAX_PAGES: int = 50
+    PDF_TEXT_LAYER_MIN_CHARS: int = 20  # pages with less embedded text are OCR'd
+    
+    # OCR Worker Pool
+    OCR_WORKERS: int = 2
+    OCR_TASK_TIMEOUT: int = 60  # seconds
+    OCR_MAX_TASKS_PER_WORKER: int = 50  # recycle workers to contain memory growth
+    OCR_BACKEND: str = "auto"  # "tesserocr" (in-process engine), "subprocess" (pytesseract), or "auto"
+    OCR_LANGUAGE: str = "eng"
+    TESSDATA_DIR: Optional[str] = None  # language data for the in-process engine; defaults to tesseract's own
+    TESSERACT_CMD: Optional[str] = None
+    OCR_FAST_MAX_SIDE: int = 1280  # fast pass downscales larger images to this many pixels
+    OCR_UPSCALE_MIN_SIDE: int = 1000  # enhanced pass upscales images smaller than this
+    OCR_REGION_THREADS: int = 4  # concurrent tesseract calls per worker for card field regions
+    
+    # Document Jobs
+    DOCUMENT_JOB_WORKERS: int = 4  # concurrent jobs; OCR itself is bounded by OCR_WORKERS
+    DOCUMENT_JOB_POLL_INTERVAL: float = 5.0  # seconds between checks for jobs queued elsewhere
+    DOCUMENT_JOB_LEASE: float = 120.0  # seconds without a renewal before another worker takes a job over
+    DOCUMENT_JOB_MAX_ATTEMPTS: int = 3  # claims before a job that never finishes is marked failed
+    
+    # OCR Result Cache
+    OCR_CACHE_DIR: Path = Path("uploads") / "ocr_cache"
+    OCR_CACHE_MEMORY_ENTRIES: int = 1024
+    OCR_CACHE_MAX_DISK_BYTES: int = 256 * 1024 * 1024  # 256MB
+    
+    # Loan Application Read Cache
+    APPLICATION_CACHE_TTL: float = 5.0  # seconds; bounds staleness from writes made by other processes
+    APPLICATION_CACHE_MAX_ENTRIES: int = 10000
+    
     # Face Verification
-    FACE_MATCH_THRESHOLD: float = 0.6
+    FACE_MATCH_THRESHOLD: float = 0.6  # max embedding distance to a user's earlier face
+    FACE_MAX_REFERENCES: int = 20  # most recent verified faces compared per user
+    FACE_INDEX_MAX_USERS: int = 10000  # users whose reference faces are kept in memory
+    FACE_WORKERS: int = 2
+    FACE_TASK_TIMEOUT: int = 30  # seconds per video, not counting time queued for a worker
+    FACE_MAX_TASKS_PER_WORKER: int = 100
+    FACE_SAMPLE_FRAMES: int = 8  # evenly spaced frames searched per video
+    FACE_DETECTION_WIDTH: int = 480  # frames are downscaled to this width for detection
+    FACE_MIN_DETECTION_SCORE: float = 0.5  # HOG detector score that ends the search early
+    FACE_STREAM_SCAN_INTERVAL: float = 1.0  # seconds between face scans of a live recording
+    FACE_STREAM_MAX_FRAMES: int = 900  # live scans cover this many frames; each re-decodes the ones before it
     
     class Config:
         case_sensitive = True
@@ -44,8 +120,22 @@ class Settings(BaseSettings):
                 f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
                 f"@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
             )
-        
-        # Create upload directory if it doesn't exist
-        self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        if not self.ASYNC_SQLALCHEMY_DATABASE_URI:
+            self.ASYNC_SQLALCHEMY_DATABASE_URI = async_database_uri(self.SQLALCHEMY_DATABASE_URI)
+        # UPLOAD_DIR and its subdirectories are created by the first write to them
+
+# Async drivers for the sync URIs' backends
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_uri(uri: str) -> str:
+    """
+    The same database as `uri`, reached through its async driver
+    """
+    scheme, rest = uri.split("://", 1)
+    backend = scheme.split("+", 1)[0]
+    return f"{ASYNC_DRIVERS.get(backend, scheme)}://{rest}"
 
 settings = Settings() 
\ No newline at end of file
@@ -1,17 +1,63 @@
-from sqlalchemy import create_engine
+from sqlalchemy import String, create_engine, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.functions import FunctionElement
 from app.core.config import settings
 
+def pool_options(uri: str) -> dict:
+    # SQLite's pools don't take sizes
+    if uri.startswith("sqlite"):
+        return {}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
+# Sync engine, for scripts and code that already runs in worker threads (document jobs, transcription)
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers: a handler waiting on the database yields the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_SQLALCHEMY_DATABASE_URI,
+    pool_pre_ping=True,
+    **pool_options(settings.ASYNC_SQLALCHEMY_DATABASE_URI)
+)
+# Objects stay readable after commit; lazy loads would need an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+class json_text(FunctionElement):
+    """
+    A top-level field of a JSON column as text. The key is written into the SQL instead of
+    being bound, so the planner can match the expression against an index on the same field.
+    """
+    type = String()
+    inherit_cache = True
+
+    def __init__(self, column, key: str):
+        if not key.isidentifier():
+            raise ValueError(f"Unsupported JSON key: {key}")
+        super().__init__(column, literal_column(key))
+
+@compiles(json_text)
+def compile_json_text(element, compiler, **kw):
+    column, key = element.clauses
+    return f"json_extract({compiler.process(column, **kw)}, '$.{key.name}')"
+
+@compiles(json_text, "postgresql")
+def compile_json_text_postgresql(element, compiler, **kw):
+    column, key = element.clauses
+    return f"({compiler.process(column, **kw)} ->> '{key.name}')"
+
 # Dependency
-def get_db():
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
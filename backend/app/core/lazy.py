@@ -0,0 +1,29 @@
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """
+    A module that is imported on first attribute access.
+
+    NumPy, OpenCV and the OCR libraries take hundreds of milliseconds to import, and most
+    of the code using them runs in worker processes or on a few request types. Binding
+    them as `cv2 = LazyModule("cv2")` keeps them out of app startup; worker initializers
+    call load() so workers still import them before their first task.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
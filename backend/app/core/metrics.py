@@ -0,0 +1,40 @@
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """
+    Minimal in-process counters and latency samples, exposed at /metrics
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self._counters = defaultdict(int)
+        self._timings = defaultdict(lambda: deque(maxlen=max_samples))
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._timings[name].append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: sorted(samples) for name, samples in self._timings.items()}
+        return {
+            "counters": counters,
+            "timings": {
+                name: {
+                    "count": len(samples),
+                    "p50": samples[len(samples) // 2],
+                    "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                }
+                for name, samples in timings.items() if samples
+            },
+        }
+
+
+metrics = Metrics()
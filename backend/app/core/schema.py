@@ -0,0 +1,51 @@
+"""
+Bring the database schema up to date. Run it before starting the app, e.g. as a deploy
+step; the app itself never creates or alters tables:
+
+    python -m app.core.schema
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.database import Base, engine
+import app.models.models  # noqa: F401  registers the tables on Base.metadata
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# migrations/versions/0001_baseline.py
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection=None) -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    # migrations/env.py runs on this connection instead of opening its own
+    config.attributes["connection"] = connection
+    return config
+
+
+def migrate(bind=engine) -> str:
+    """
+    Create an empty database from the models and stamp it with the latest revision, or
+    apply the pending migrations to an existing one. Returns what was done.
+    """
+    with bind.begin() as connection:
+        config = alembic_config(connection)
+        tables = inspect(connection).get_table_names()
+        if not tables:
+            Base.metadata.create_all(bind=connection)
+            command.stamp(config, "head")
+            return "created"
+        if "alembic_version" not in tables:
+            # Created by the app before it had migrations: the baseline schema, possibly
+            # with some later columns, which the next revision skips
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+        return "upgraded"
+
+
+if __name__ == "__main__":
+    print(f"Database schema {migrate()}")
@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+
+def _ping() -> bool:
+    """
+    No-op task used to force worker processes to start
+    """
+    return True
+
+
+class ProcessPool:
+    """
+    Process pool for CPU-bound work (OCR, face detection) that must not run on the event loop.
+
+    Workers are spawned (not forked) so they don't inherit the parent's DB connections or
+    event loop, run `initializer` once to import heavy libraries, and are replaced after
+    `max_tasks_per_child` jobs so leaks in native code can't accumulate.
+
+    With `max_in_flight`, at most that many tasks are handed to the executor at once and
+    the rest wait on the event loop, so a task's timeout covers its run time rather than
+    time spent queued behind other tasks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        initializer: Optional[Callable] = None,
+        max_tasks_per_child: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.max_tasks_per_child = max_tasks_per_child
+        self.task_timeout = task_timeout
+        self.max_in_flight = max_in_flight
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[tuple] = None  # (event loop, semaphore)
+
+    def start(self) -> ProcessPoolExecutor:
+        """
+        Create the underlying executor if it isn't running yet
+        """
+        if self._executor is None:
+            kwargs = {}
+            # Worker recycling is only available from Python 3.11
+            if self.max_tasks_per_child and sys.version_info >= (3, 11):
+                kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                **kwargs,
+            )
+        return self._executor
+
+    async def warm_up(self):
+        """
+        Start every worker and wait until their initializers have run
+        """
+        # The pings hold in-flight slots like tasks do, so tasks submitted meanwhile wait
+        # on the event loop instead of timing out behind a worker's initializer
+        submitted = [await self._submit(_ping) for _ in range(self.max_workers)]
+        try:
+            await asyncio.gather(*[asyncio.wrap_future(future) for _, future in submitted])
+        except BrokenProcessPool:
+            self._discard(submitted[0][0])
+            raise
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """
+        Run `fn(*args)` in a worker process and await its result.
+
+        Raises asyncio.TimeoutError if the task takes longer than the timeout. The worker
+        itself is not interrupted, so `fn` should enforce its own limits on external calls.
+        """
+        executor, future = await self._submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.task_timeout)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    async def _submit(self, fn: Callable, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        """
+        Hand `fn(*args)` to the executor once an in-flight slot is free
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._get_slots(loop)
+        if slots is not None:
+            await slots.acquire()
+
+        executor = self.start()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            if slots is not None:
+                slots.release()
+            if isinstance(e, BrokenProcessPool):
+                self._discard(executor)
+            raise
+        if slots is not None:
+            # Free the slot when the worker is actually done, not when the caller gives up
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        return executor, future
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """
+        Drop a broken executor so the next task starts a fresh one
+        """
+        # A worker died (OOM kill, crash in native code)
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_slots(self, loop) -> Optional[asyncio.Semaphore]:
+        if not self.max_in_flight:
+            return None
+        if self._slots is None or self._slots[0] is not loop:
+            self._slots = (loop, asyncio.Semaphore(self.max_in_flight))
+        return self._slots[1]
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop all worker processes
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -2,20 +2,47 @@ from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import List, Optional
-import uvicorn
+from contextlib import asynccontextmanager
+import asyncio
 from pathlib import Path
 
 from app.core.config import settings
 from app.api.routes import router as api_router
-from app.core.database import engine, Base
+from app.core.metrics import metrics
+from app.services.audio_service import resume_transcriptions
+from app.services.document_service import ocr_pool
+from app.services.document_jobs import document_jobs
+from app.services.video_service import face_pool
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed outside the app: run `python -m app.core.schema` before starting it
+
+async def warm_up_workers():
+    try:
+        await asyncio.gather(ocr_pool.warm_up(), face_pool.warm_up())
+    except Exception as e:
+        print(f"Error in worker warm-up: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start OCR and face workers in the background so the first upload doesn't pay for
+    # process spawn, imports and model loading, without holding up startup; tasks
+    # submitted meanwhile queue behind the workers' initializers
+    warm_up = asyncio.create_task(warm_up_workers())
+    # Resume document jobs a previous run left unfinished
+    await document_jobs.start()
+    # and transcriptions a restart interrupted
+    await resume_transcriptions()
+    yield
+    warm_up.cancel()
+    await document_jobs.stop()
+    ocr_pool.shutdown()
+    face_pool.shutdown()
 
 app = FastAPI(
     title="Alvenio API",
     description="API for AI-powered video-based loan assistance system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -50,5 +77,10 @@ async def health_check():
         }
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -1,8 +1,9 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, JSON, String, Float, DateTime, Enum, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from app.core.database import Base
+from app.core.database import Base, json_text
 
 class LoanStatus(str, enum.Enum):
     PENDING = "pending"
@@ -17,6 +18,12 @@ class DocumentType(str, enum.Enum):
     BANK_STATEMENT = "bank_statement"
     OTHER = "other"
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class User(Base):
     __tablename__ = "users"
 
@@ -44,6 +51,9 @@ class LoanApplication(Base):
     status = Column(Enum(LoanStatus), default=LoanStatus.PENDING)
     monthly_income = Column(Float)
     employment_type = Column(String)
+    ruleset_version = Column(String)  # eligibility ruleset the status was decided under
+    # Per-document checks behind the status; see eligibility_state.py
+    eligibility_state = Column(JSON().with_variant(JSONB(), "postgresql"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -51,6 +61,10 @@ class LoanApplication(Base):
     user = relationship("User", back_populates="loan_applications")
     documents = relationship("Document", back_populates="loan_application")
 
+# Keyset-paginated listings filter on one column and page by id; see services/pagination.py
+Index("ix_loan_applications_status_id", LoanApplication.status, LoanApplication.id)
+Index("ix_loan_applications_user_id_id", LoanApplication.user_id, LoanApplication.id)
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -59,14 +73,32 @@ class Document(Base):
     loan_application_id = Column(Integer, ForeignKey("loan_applications.id"))
     document_type = Column(Enum(DocumentType))
     file_path = Column(String)
-    extracted_data = Column(String)  # JSON string of extracted information
+    # Extracted fields; JSONB on Postgres, so identifiers can be indexed and queried
+    extracted_data = Column(JSON().with_variant(JSONB(), "postgresql"))
     is_verified = Column(Boolean, default=False)
+    # Extraction runs as a background job; the row is the job record
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED)
+    progress = Column(Integer, default=0)  # percent
+    error = Column(String)
+    claimed_by = Column(String)  # lease of the worker running the job; see document_jobs.py
+    claimed_at = Column(DateTime(timezone=True))  # when that lease was last renewed
+    attempts = Column(Integer, default=0)  # times the job was claimed
+    content_hash = Column(String)  # SHA-256 of the upload, the OCR cache key
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="documents")
     loan_application = relationship("LoanApplication", back_populates="documents")
 
+# An application's or user's documents, and the job queue's oldest-queued-first claim
+Index("ix_documents_loan_application_id_id", Document.loan_application_id, Document.id)
+Index("ix_documents_user_id_id", Document.user_id, Document.id)
+Index("ix_documents_status_id", Document.status, Document.id)
+# Identity lookups and duplicate detection; see services/identity_search.py
+Index("ix_documents_pan_number", json_text(Document.extracted_data, "pan_number"))
+Index("ix_documents_aadhaar_number", json_text(Document.extracted_data, "aadhaar_number"))
+
 class VideoInteraction(Base):
     __tablename__ = "video_interactions"
 
@@ -74,9 +106,23 @@ class VideoInteraction(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     video_path = Column(String)
     question_id = Column(Integer)
-    response_text = Column(String)  # Transcribed response
-    face_verified = Column(Boolean, default=False)
+    response_text = Column(String)  # Transcribed response, filled in segment by segment
+    transcription_status = Column(Enum(JobStatus))
+    # Container metadata probed at ingest
+    duration = Column(Float)  # seconds
+    video_codec = Column(String)
+    width = Column(Integer)
+    height = Column(Integer)
+    frame_rate = Column(Float)
+    frame_count = Column(Integer)
+    has_audio = Column(Boolean)
+    face_verified = Column(Boolean, default=False)  # same person as the user's earlier interactions
+    face_encoding = Column(LargeBinary)  # 128 float32 values, see services/face_index.py
+    face_distance = Column(Float)  # distance to the closest earlier face
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="video_interactions") 
\ No newline at end of file
+    user = relationship("User", back_populates="video_interactions") 
+
+# A user's interactions, newest first: listings and face verification references
+Index("ix_video_interactions_user_id_id", VideoInteraction.user_id, VideoInteraction.id)
@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.models import LoanApplication
+from app.services.eligibility_rules import CompiledRules, rule_engine
+from app.services.eligibility_state import current_eligibility
+
+
+def application_view(application: LoanApplication, rules: CompiledRules) -> dict:
+    """
+    The GET /loan-applications/{id} response body
+    """
+    return {
+        "id": application.id,
+        "loan_amount": application.loan_amount,
+        "loan_type": application.loan_type,
+        "status": application.status,
+        "monthly_income": application.monthly_income,
+        "employment_type": application.employment_type,
+        "ruleset_version": application.ruleset_version,
+        # Read from the stored state: no documents are loaded or parsed here
+        "eligibility": current_eligibility(application, rules),
+        "created_at": application.created_at,
+        "updated_at": application.updated_at
+    }
+
+
+def last_modified(application: LoanApplication) -> Optional[datetime]:
+    changed = application.updated_at or application.created_at
+    if changed is None:
+        return None
+    # SQLite hands back naive timestamps; CURRENT_TIMESTAMP is UTC
+    if changed.tzinfo is None:
+        changed = changed.replace(tzinfo=timezone.utc)
+    return changed.astimezone(timezone.utc).replace(microsecond=0)
+
+
+@dataclass(frozen=True)
+class CachedView:
+    """
+    A rendered application response with its validators
+    """
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+    ruleset_version: str
+    expires_at: float
+
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """
+        Whether a conditional GET with this If-None-Match header can be answered with 304.
+
+        If-Modified-Since is deliberately not honoured: Last-Modified has one-second
+        resolution and misses ruleset changes, so it could confirm a stale copy.
+        """
+        if if_none_match is None:
+            return False
+        # GET compares entity tags weakly
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+
+def render_view(application: LoanApplication, rules: CompiledRules, ttl: float) -> CachedView:
+    body = JSONResponse(jsonable_encoder(application_view(application, rules))).body
+    return CachedView(
+        body=body,
+        # Hash the body rather than use updated_at alone: timestamps can be second-granular,
+        # and a ruleset change alters the eligibility without touching the row
+        etag=f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"',
+        last_modified=last_modified(application),
+        ruleset_version=rules.ruleset.version,
+        expires_at=time.monotonic() + ttl
+    )
+
+
+class ApplicationCache:
+    """
+    Read-through TTL/LRU cache of rendered loan application responses.
+
+    Every write to an application in this process invalidates its entry after the commit.
+    Writes made by other processes are picked up once the entry's TTL runs out, and
+    entries rendered under an older eligibility ruleset are re-rendered.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self._views = LRUCache(max_entries)
+        # Bumped by every invalidation, so a read that started before a write can't cache
+        # what it loaded once the write has committed
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    async def get(self, db: AsyncSession, loan_application_id: int) -> Optional[CachedView]:
+        """
+        The cached response for an application, loading and rendering it on a miss;
+        None if the application doesn't exist
+        """
+        rules = rule_engine.active
+        view = self._views.get(loan_application_id)
+        if view is not None and view.expires_at > time.monotonic() and view.ruleset_version == rules.ruleset.version:
+            metrics.increment("application_cache.hit")
+            return view
+
+        metrics.increment("application_cache.miss")
+        generation = self._generation
+        application = await db.get(LoanApplication, loan_application_id)
+        if application is None:
+            return None
+        view = render_view(application, rules, self.ttl)
+        with self._lock:
+            if generation == self._generation:
+                self._views.set(loan_application_id, view)
+        return view
+
+    def invalidate(self, *loan_application_ids: int):
+        """
+        Drop cached responses; call after committing a change to the applications
+        """
+        with self._lock:
+            self._generation += 1
+            for loan_application_id in loan_application_ids:
+                self._views.pop(int(loan_application_id))
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._views.clear()
+
+
+application_cache = ApplicationCache(
+    ttl=settings.APPLICATION_CACHE_TTL,
+    max_entries=settings.APPLICATION_CACHE_MAX_ENTRIES
+)
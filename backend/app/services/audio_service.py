@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import AsyncIterator, List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.lazy import LazyModule
+from app.core.metrics import metrics
+from app.models.models import JobStatus, VideoInteraction
+
+np = LazyModule("numpy")
+
+# ffmpeg resamples to 16 kHz mono 16-bit PCM, what speech models expect
+SAMPLE_RATE = 16000
+VAD_FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000  # 30 ms
+READ_BLOCK_BYTES = SAMPLE_RATE * 2  # one second of audio per pipe read
+
+
+async def stream_audio(video_path: str) -> AsyncIterator[np.ndarray]:
+    """
+    Demux and decode a video's audio track through an ffmpeg pipe, one block of PCM
+    samples at a time; nothing is written to disk
+    """
+    process = await asyncio.create_subprocess_exec(
+        settings.FFMPEG_CMD, "-nostdin", "-loglevel", "error",
+        "-i", video_path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        leftover = b""
+        while True:
+            data = await process.stdout.read(READ_BLOCK_BYTES)
+            if not data:
+                break
+            data = leftover + data
+            # Pipe reads can split a sample in half
+            usable = len(data) - len(data) % 2
+            leftover = data[usable:]
+            yield np.frombuffer(data[:usable], dtype=np.int16)
+
+        if await process.wait() != 0:
+            error = (await process.stderr.read()).decode(errors="replace").strip()
+            raise RuntimeError(f"ffmpeg could not read the audio: {error[-300:]}")
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+class EnergyVad:
+    """
+    Energy-based voice activity detection over a PCM stream.
+
+    30 ms frames louder than `threshold_db` (dBFS) are speech. A segment closes after
+    `min_silence_ms` of quiet, or at `max_segment_seconds`; segments with less than
+    `min_speech_ms` of speech (clicks, coughs) are dropped.
+    """
+
+    def __init__(self, threshold_db: float, min_silence_ms: int, min_speech_ms: int, max_segment_seconds: float):
+        self.threshold_db = threshold_db
+        self.min_silence_frames = max(1, min_silence_ms // 30)
+        self.min_speech_frames = max(1, min_speech_ms // 30)
+        self.max_segment_frames = int(max_segment_seconds * 1000 // 30)
+        self._pending = np.empty(0, dtype=np.int16)
+        self._segment: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._silence_run = 0
+
+    def feed(self, samples: np.ndarray) -> List[np.ndarray]:
+        """
+        Consume a block of samples and return the speech segments it completed
+        """
+        samples = np.concatenate([self._pending, samples])
+        count = len(samples) // VAD_FRAME_SAMPLES
+        frames = samples[:count * VAD_FRAME_SAMPLES].reshape(count, VAD_FRAME_SAMPLES)
+        self._pending = samples[count * VAD_FRAME_SAMPLES:]
+
+        # Frame energies for the whole block in one step
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        is_speech = 20 * np.log10(rms / 32768 + 1e-10) > self.threshold_db
+
+        segments = []
+        for frame, speech in zip(frames, is_speech):
+            if speech:
+                self._segment.append(frame)
+                self._speech_frames += 1
+                self._silence_run = 0
+            elif self._segment:
+                self._segment.append(frame)
+                self._silence_run += 1
+                if self._silence_run >= self.min_silence_frames:
+                    segments.extend(self._close())
+            if len(self._segment) >= self.max_segment_frames:
+                segments.extend(self._close())
+        return segments
+
+    def flush(self) -> List[np.ndarray]:
+        """
+        Close the segment in progress at the end of the stream
+        """
+        return self._close()
+
+    def _close(self) -> List[np.ndarray]:
+        frames = self._segment[:len(self._segment) - self._silence_run]
+        speech_frames = self._speech_frames
+        self._segment, self._speech_frames, self._silence_run = [], 0, 0
+        if speech_frames < self.min_speech_frames:
+            return []
+        return [np.concatenate(frames)]
+
+
+class StubSpeechToText:
+    """
+    Deterministic stand-in for tests: describes each segment instead of transcribing it
+    """
+    name = "stub"
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        return f"[speech {len(samples) / sample_rate:.2f}s]"
+
+
+class FasterWhisperSpeechToText:
+    """
+    Local Whisper model through faster-whisper (CTranslate2, int8 on CPU)
+    """
+    name = "faster_whisper"
+
+    def __init__(self):
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(
+            settings.STT_MODEL, device="cpu", compute_type="int8", cpu_threads=settings.STT_THREADS
+        )
+        # One model instance; calls from concurrent transcriptions take turns
+        self._lock = threading.Lock()
+
+    def transcribe(self, samples: np.ndarray, sample_rate: int) -> str:
+        audio = samples.astype(np.float32) / 32768
+        with self._lock:
+            # Silence is already trimmed, so Whisper's own VAD is off
+            segments, _ = self._model.transcribe(audio, language=settings.STT_LANGUAGE, beam_size=1, vad_filter=False)
+            return " ".join(segment.text.strip() for segment in segments)
+
+
+STT_BACKENDS = {
+    StubSpeechToText.name: StubSpeechToText,
+    FasterWhisperSpeechToText.name: FasterWhisperSpeechToText,
+}
+
+_stt_backend = None
+_stt_backend_lock = threading.Lock()
+_transcription_slots: Optional[asyncio.Semaphore] = None
+# The event loop only keeps weak references to tasks
+_background_transcriptions = set()
+
+
+def get_stt_backend():
+    """
+    The configured speech-to-text backend, loaded on first use
+    """
+    global _stt_backend
+    with _stt_backend_lock:
+        if _stt_backend is None:
+            _stt_backend = STT_BACKENDS[settings.STT_BACKEND]()
+    return _stt_backend
+
+
+async def transcribe_segments(blocks: AsyncIterator[np.ndarray], backend) -> AsyncIterator[str]:
+    """
+    Trim silence from a PCM stream and transcribe each speech segment as soon as it ends.
+
+    The PCM stream isn't read while a segment is being transcribed, so a slow backend
+    pauses ffmpeg instead of buffering the whole track.
+    """
+    vad = EnergyVad(
+        threshold_db=settings.AUDIO_VAD_THRESHOLD_DB,
+        min_silence_ms=settings.AUDIO_VAD_MIN_SILENCE_MS,
+        min_speech_ms=settings.AUDIO_VAD_MIN_SPEECH_MS,
+        max_segment_seconds=settings.AUDIO_MAX_SEGMENT_SECONDS,
+    )
+
+    async def finished_segments():
+        async for block in blocks:
+            for segment in vad.feed(block):
+                yield segment
+        for segment in vad.flush():
+            yield segment
+
+    async for segment in finished_segments():
+        metrics.observe("transcription.segment_seconds", len(segment) / SAMPLE_RATE)
+        text = (await asyncio.to_thread(backend.transcribe, segment, SAMPLE_RATE)).strip()
+        if text:
+            yield text
+
+
+async def transcribe_interaction(video_interaction_id: int, video_path: str):
+    """
+    Transcribe a video answer in the background, saving the transcript to response_text
+    after every speech segment so partial results are visible while it runs
+    """
+    global _transcription_slots
+    if _transcription_slots is None:
+        _transcription_slots = asyncio.Semaphore(settings.TRANSCRIPTION_WORKERS)
+
+    parts = []
+    try:
+        async with _transcription_slots:
+            await asyncio.to_thread(_save_transcript, video_interaction_id, None, JobStatus.PROCESSING)
+            backend = await asyncio.to_thread(get_stt_backend)
+            async for text in transcribe_segments(stream_audio(video_path), backend):
+                parts.append(text)
+                await asyncio.to_thread(_save_transcript, video_interaction_id, " ".join(parts), JobStatus.PROCESSING)
+
+        await asyncio.to_thread(_save_transcript, video_interaction_id, " ".join(parts), JobStatus.COMPLETED)
+        metrics.increment("transcription.completed")
+    except Exception as e:
+        print(f"Error in audio transcription: {str(e)}")
+        await asyncio.to_thread(_save_transcript, video_interaction_id, " ".join(parts) or None, JobStatus.FAILED)
+        metrics.increment("transcription.failed")
+
+
+def schedule_transcription(video_interaction_id: int, video_path: str):
+    """
+    Start transcribe_interaction without waiting for it, where no BackgroundTasks are
+    available (WebSocket handlers)
+    """
+    task = asyncio.create_task(transcribe_interaction(video_interaction_id, video_path))
+    _background_transcriptions.add(task)
+    task.add_done_callback(_background_transcriptions.discard)
+
+
+async def resume_transcriptions() -> int:
+    """
+    Restart transcriptions a previous run left queued or unfinished; each is transcribed
+    again from the start of its video, replacing the partial transcript as it goes.
+
+    Transcriptions hold no lease, so with several API processes on one database a process
+    starting up also re-runs the ones still in progress elsewhere; both write the same
+    transcript.
+    """
+    unfinished = await asyncio.to_thread(_unfinished_transcriptions)
+    for video_interaction_id, video_path in unfinished:
+        schedule_transcription(video_interaction_id, video_path)
+    return len(unfinished)
+
+
+def _unfinished_transcriptions() -> List[tuple]:
+    with SessionLocal() as db:
+        rows = (
+            db.query(VideoInteraction.id, VideoInteraction.video_path)
+            .filter(VideoInteraction.transcription_status.in_([JobStatus.QUEUED, JobStatus.PROCESSING]))
+            .order_by(VideoInteraction.id)
+            .all()
+        )
+        return [(row.id, row.video_path) for row in rows]
+
+
+def _save_transcript(video_interaction_id: int, text: Optional[str], status: JobStatus):
+    with SessionLocal() as db:
+        values = {VideoInteraction.transcription_status: status}
+        if text is not None:
+            values[VideoInteraction.response_text] = text
+        db.query(VideoInteraction).filter(VideoInteraction.id == video_interaction_id).update(
+            values, synchronize_session=False
+        )
+        db.commit()
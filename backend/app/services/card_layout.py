@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.lazy import LazyModule
+from app.services.field_extraction import empty_fields, parse_field
+from app.services.image_quality import find_document_contour
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+# Rectified card size: ID-1 format (85.6 x 54 mm) at 20 px/mm, so field text is ~30px tall
+CARD_WIDTH, CARD_HEIGHT = 1712, 1080
+CARD_ASPECT = CARD_WIDTH / CARD_HEIGHT
+
+# Whitelists are passed on the tesseract command line, so they must not contain quotes or spaces
+_DIGITS = "0123456789"
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LETTERS = _UPPER + _UPPER.lower()
+
+
+@dataclass(frozen=True)
+class FieldRegion:
+    """
+    Where a field sits on a rectified card, as fractions of its width and height
+    """
+    name: str
+    box: tuple  # (left, top, right, bottom)
+    psm: int = 7  # a single text line
+    whitelist: Optional[str] = None
+
+
+# Regions for the current card designs; re-check these against sample cards when issuers change layout
+LAYOUT_TEMPLATES: Dict[str, List[FieldRegion]] = {
+    "aadhaar": [
+        FieldRegion("name", (0.28, 0.27, 0.97, 0.39), whitelist=_LETTERS + "."),
+        FieldRegion("dob", (0.28, 0.38, 0.97, 0.49), whitelist=_LETTERS + _DIGITS + ":/-"),
+        FieldRegion("gender", (0.28, 0.48, 0.97, 0.59), whitelist=_LETTERS + ":/"),
+        FieldRegion("aadhaar_number", (0.22, 0.74, 0.78, 0.90), whitelist=_DIGITS),
+    ],
+    "pan": [
+        FieldRegion("pan_number", (0.04, 0.25, 0.62, 0.39), whitelist=_UPPER + _DIGITS),
+        FieldRegion("name", (0.04, 0.45, 0.70, 0.56), whitelist=_LETTERS + "."),
+        FieldRegion("father_name", (0.04, 0.61, 0.70, 0.72), whitelist=_LETTERS + "."),
+        FieldRegion("dob", (0.04, 0.78, 0.50, 0.89), whitelist=_DIGITS + "/-"),
+    ],
+}
+
+
+def order_corners(points: np.ndarray) -> np.ndarray:
+    """
+    Sort four points as top-left, top-right, bottom-right, bottom-left
+    """
+    points = points.astype(np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([
+        points[np.argmin(sums)],
+        points[np.argmin(diffs)],
+        points[np.argmax(sums)],
+        points[np.argmax(diffs)],
+    ], dtype=np.float32)
+
+
+def rectify_card(gray: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Find an ID-1 card in the image and warp it to a canonical, upright CARD_WIDTH x CARD_HEIGHT view
+    """
+    # Contour search on a small copy; corners are scaled back for the full-resolution warp
+    scale = min(1.0, 800 / max(gray.shape))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    contour = find_document_contour(small)
+    if contour is None:
+        return None
+
+    corners = order_corners(contour / scale)
+    top_left, top_right, bottom_right, bottom_left = corners
+    width = (np.linalg.norm(top_right - top_left) + np.linalg.norm(bottom_right - bottom_left)) / 2
+    height = (np.linalg.norm(bottom_left - top_left) + np.linalg.norm(bottom_right - top_right)) / 2
+    if height == 0 or abs(width / height - CARD_ASPECT) > 0.25:
+        # Not card-shaped (a full A4 page, or a card photographed in portrait); fall back to full-page OCR
+        return None
+
+    target = np.array([[0, 0], [CARD_WIDTH, 0], [CARD_WIDTH, CARD_HEIGHT], [0, CARD_HEIGHT]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(gray, matrix, (CARD_WIDTH, CARD_HEIGHT), flags=cv2.INTER_CUBIC)
+
+
+def crop_region(card: np.ndarray, region: FieldRegion) -> np.ndarray:
+    left, top, right, bottom = region.box
+    crop = card[int(top * CARD_HEIGHT):int(bottom * CARD_HEIGHT), int(left * CARD_WIDTH):int(right * CARD_WIDTH)]
+    return cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+
+def extract_card_fields(card: np.ndarray, document_type: str, recognize: Callable[[np.ndarray, str], str]) -> dict:
+    """
+    OCR each template region of a rectified card in parallel and parse it as its own field.
+
+    `recognize(image, config)` runs tesseract; the crops are small, so the threads mostly
+    wait on tesseract and a handful of them keep the worker's core busy.
+    """
+    regions = LAYOUT_TEMPLATES.get(getattr(document_type, "value", document_type), [])
+
+    def read(region: FieldRegion):
+        config = f"--psm {region.psm}"
+        if region.whitelist:
+            config += f" -c tessedit_char_whitelist={region.whitelist}"
+        return region, recognize(crop_region(card, region), config)
+
+    data = empty_fields(document_type)
+    with ThreadPoolExecutor(max_workers=settings.OCR_REGION_THREADS) as executor:
+        for region, text in executor.map(read, regions):
+            match = parse_field(text, document_type, region.name)
+            if match is not None:
+                data[region.name] = match.value
+                data["confidence"][region.name] = round(match.confidence, 2)
+    return data
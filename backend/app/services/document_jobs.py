@@ -0,0 +1,242 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.models.models import Document, JobStatus, LoanApplication
+from app.services.application_cache import application_cache
+from app.services.document_service import extract_document_data
+from app.services.eligibility_state import initialize_eligibility, update_eligibility
+
+
+class DocumentJobQueue:
+    """
+    Background document extraction, with the documents table as the queue.
+
+    A Document row in QUEUED state is a pending job. Workers claim a row with a conditional
+    UPDATE, so a job runs once even if it's enqueued twice or several app processes share
+    the database. The in-process queue only wakes workers early; they also poll the table,
+    which picks up jobs submitted by other processes.
+
+    A claim is a lease: the worker renews claimed_at while the job runs, and a PROCESSING
+    job whose lease hasn't been renewed for `lease_seconds` (its process died or was
+    stopped) can be claimed again. A worker that lost its lease doesn't record a result.
+    Every claim counts as an attempt; a job claimed more than `max_attempts` times, e.g.
+    one whose OCR keeps killing its worker, is marked FAILED instead of run again.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        poll_interval: float,
+        session_factory=SessionLocal,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds or settings.DOCUMENT_JOB_LEASE
+        self.max_attempts = max_attempts or settings.DOCUMENT_JOB_MAX_ATTEMPTS
+        self._wakeups: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """
+        Start the workers; each first takes on any backlog, including expired leases
+        """
+        self._wakeups = asyncio.Queue()
+        for _ in range(self.workers):
+            self._wakeups.put_nowait(None)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Stop the workers; jobs they were running are taken over once their leases expire
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, document_id: int):
+        """
+        Wake a worker for a job whose row has already been committed
+        """
+        if self._wakeups is not None:
+            self._wakeups.put_nowait(document_id)
+
+    async def _work(self):
+        while True:
+            try:
+                document_id = await asyncio.wait_for(self._wakeups.get(), self.poll_interval)
+            except asyncio.TimeoutError:
+                document_id = None
+
+            try:
+                job = await asyncio.to_thread(self._claim, document_id)
+                while job is not None:
+                    await self.run_job(*job)
+                    # Drain the backlog before going back to sleep
+                    job = await asyncio.to_thread(self._claim, None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in document job worker: {str(e)}")
+
+    async def run_job(
+        self, document_id: int, file_path: str, document_type: str, content_hash: Optional[str], claim: Optional[str] = None
+    ):
+        """
+        Extract data for a claimed job and record the outcome on its row
+        """
+        heartbeat = asyncio.create_task(self._keep_lease(document_id, claim)) if claim else None
+        try:
+            extracted_data = await extract_document_data(file_path, document_type, content_hash=content_hash)
+            if extracted_data:
+                await asyncio.to_thread(
+                    self._finish, document_id, claim,
+                    status=JobStatus.COMPLETED, progress=100, extracted_data=extracted_data,
+                )
+                metrics.increment("document_jobs.completed")
+            else:
+                # extract_document_data logs the cause and returns {} on OCR errors and timeouts
+                await asyncio.to_thread(
+                    self._finish, document_id, claim,
+                    status=JobStatus.FAILED, progress=100, error="No data could be extracted from the document",
+                )
+                metrics.increment("document_jobs.failed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error in document job {document_id}: {str(e)}")
+            await asyncio.to_thread(self._finish, document_id, claim, status=JobStatus.FAILED, progress=100, error=str(e))
+            metrics.increment("document_jobs.failed")
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+    async def _keep_lease(self, document_id: int, claim: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 4)
+            try:
+                renewed = await asyncio.to_thread(self._renew, document_id, claim)
+            except Exception as e:
+                # A missed renewal is retried; the lease has room for several
+                print(f"Error renewing document job {document_id}: {str(e)}")
+                continue
+            if not renewed:
+                print(f"Lost the lease on document job {document_id}")
+                return
+
+    def _claimable(self):
+        """
+        Queued jobs, and running jobs whose lease has expired
+        """
+        expired = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        return or_(
+            Document.status == JobStatus.QUEUED,
+            and_(
+                Document.status == JobStatus.PROCESSING,
+                # No claimed_at: claimed before leases existed
+                or_(Document.claimed_at.is_(None), Document.claimed_at < expired),
+            ),
+        )
+
+    def _claim(self, document_id: Optional[int]) -> Optional[tuple]:
+        """
+        Move a claimable job to PROCESSING under a new lease: the given one, or the oldest
+        if no id is given
+        """
+        with self.session_factory() as db:
+            while True:
+                candidate = document_id
+                if candidate is None:
+                    row = db.query(Document.id).filter(self._claimable()).order_by(Document.id).first()
+                    if row is None:
+                        return None
+                    candidate = row.id
+
+                claim = uuid.uuid4().hex
+                claimed = db.query(Document).filter(
+                    Document.id == candidate,
+                    self._claimable(),
+                ).update({
+                    Document.status: JobStatus.PROCESSING,
+                    Document.progress: 10,
+                    Document.claimed_by: claim,
+                    Document.claimed_at: datetime.now(timezone.utc),
+                    Document.attempts: func.coalesce(Document.attempts, 0) + 1,
+                }, synchronize_session=False)
+                db.commit()
+
+                if claimed:
+                    doc = db.get(Document, candidate)
+                    if doc.attempts <= self.max_attempts:
+                        return doc.id, doc.file_path, doc.document_type, doc.content_hash, claim
+                    # Every earlier attempt ended without a result; the claim only keeps a
+                    # late one from overwriting this
+                    self._finish(
+                        doc.id, claim, status=JobStatus.FAILED, progress=100,
+                        error=f"Extraction did not finish in {self.max_attempts} attempts",
+                    )
+                    metrics.increment("document_jobs.failed")
+                if document_id is not None:
+                    # Already taken or finished
+                    return None
+
+    def _renew(self, document_id: int, claim: str) -> bool:
+        """
+        Extend a job's lease; False if another worker has taken the job over
+        """
+        with self.session_factory() as db:
+            renewed = db.query(Document).filter(
+                Document.id == document_id,
+                Document.status == JobStatus.PROCESSING,
+                Document.claimed_by == claim,
+            ).update({Document.claimed_at: datetime.now(timezone.utc)}, synchronize_session=False)
+            db.commit()
+            return bool(renewed)
+
+    def _finish(self, document_id: int, claim: Optional[str] = None, **values):
+        """
+        Record a job's outcome and re-check the document in its application's eligibility
+        state, in one transaction. With a claim, nothing is recorded unless the lease is
+        still held.
+        """
+        with self.session_factory() as db:
+            # The row lock keeps the job from being taken over until this commits
+            doc = db.get(Document, document_id, with_for_update=True)
+            if doc is None:
+                return
+            if claim is not None and doc.claimed_by != claim:
+                print(f"Dropped the result of document job {document_id}: its lease expired")
+                return
+            for name, value in values.items():
+                setattr(doc, name, value)
+
+            loan_application_id = doc.loan_application_id
+            if loan_application_id is not None:
+                application = db.get(LoanApplication, loan_application_id, with_for_update=True)
+                if application is not None:
+                    if application.eligibility_state is None:
+                        db.flush()
+                        initialize_eligibility(application, db.query(Document).filter(
+                            Document.loan_application_id == application.id
+                        ).all())
+                    else:
+                        update_eligibility(application, doc)
+            db.commit()
+        if loan_application_id is not None:
+            application_cache.invalidate(loan_application_id)
+
+
+document_jobs = DocumentJobQueue(
+    workers=settings.DOCUMENT_JOB_WORKERS,
+    poll_interval=settings.DOCUMENT_JOB_POLL_INTERVAL,
+)
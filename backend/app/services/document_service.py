@@ -1,36 +1,173 @@
-import pytesseract
-import cv2
-import numpy as np
-from PIL import Image
-import aiofiles
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import shlex
+import time
 from pathlib import Path
-import uuid
+from typing import Optional
 import json
 from app.core.config import settings
+from app.core.lazy import LazyModule
+from app.core.metrics import metrics
+from app.core.workers import ProcessPool
+from app.services.card_layout import LAYOUT_TEMPLATES, extract_card_fields, rectify_card
+from app.services.field_extraction import extract_fields, merge_fields, missing_fields
+from app.services.image_quality import QualityReport, assess_image_quality
+from app.services.ocr_cache import OcrResultCache, hash_file
+from app.services.upload_service import StoredUpload, UploadRejected, save_upload
+
+pytesseract = LazyModule("pytesseract")
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+pdfium = LazyModule("pypdfium2")
+Image = LazyModule("PIL.Image")
+
+# Bump whenever OCR preprocessing or field extraction changes; cached results are keyed on it
+EXTRACTOR_VERSION = "5"
+
+async def process_document(document_file) -> StoredUpload:
+    """
+    Stream the uploaded document file to disk, validating its type and size
+    """
+    return await save_upload(
+        document_file,
+        subdir="documents",
+        allowed_types=settings.ALLOWED_DOCUMENT_TYPES,
+        max_size=settings.MAX_UPLOAD_SIZE,
+    )
+
+async def screen_document(upload: StoredUpload) -> QualityReport:
+    """
+    Reject images that OCR can't succeed on before any OCR work is queued
+    """
+    if not settings.QUALITY_GATE_ENABLED or upload.mime_type == "application/pdf":
+        return QualityReport(accepted=True)
+    
+    report = await asyncio.to_thread(assess_image_quality, upload.path)
+    if not report.accepted:
+        metrics.increment("quality_gate.rejected")
+        Path(upload.path).unlink(missing_ok=True)
+        raise UploadRejected(
+            {"message": "The document image is not usable", "reasons": report.reasons, "metrics": report.metrics},
+            status_code=422,
+        )
+    
+    metrics.increment("quality_gate.accepted")
+    return report
+
+def init_ocr_worker():
+    """
+    Initialize an OCR worker process: import the vision and OCR libraries and load the
+    engine now, rather than in the worker's first task
+    """
+    for module in (np, cv2, pdfium, Image, pytesseract):
+        module.load()
+    # Each worker is single-threaded; let the pool provide the parallelism
+    cv2.setNumThreads(1)
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if settings.TESSERACT_CMD:
+        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+    # Load the OCR engine and language model once per worker, not once per call
+    get_ocr_backend()
+
+ocr_pool = ProcessPool(
+    name="ocr",
+    max_workers=settings.OCR_WORKERS,
+    initializer=init_ocr_worker,
+    max_tasks_per_child=settings.OCR_MAX_TASKS_PER_WORKER,
+    task_timeout=settings.OCR_TASK_TIMEOUT,
+    max_in_flight=settings.OCR_WORKERS,
+)
+
+ocr_cache = OcrResultCache(
+    cache_dir=settings.OCR_CACHE_DIR,
+    version=EXTRACTOR_VERSION,
+    max_entries=settings.OCR_CACHE_MEMORY_ENTRIES,
+    max_disk_bytes=settings.OCR_CACHE_MAX_DISK_BYTES,
+)
+
+async def extract_document_data(file_path: str, document_type: str, content_hash: Optional[str] = None) -> dict:
+    """
+    Extract relevant information from the document, reusing cached results for identical files
+    """
+    try:
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(hash_file, file_path)
+        
+        cached = await ocr_cache.get(content_hash, document_type)
+        if cached is not None:
+            metrics.increment("ocr.cache_hit")
+            return cached
+        
+        started = time.perf_counter()
+        if Path(file_path).suffix.lower() == ".pdf":
+            extracted_data = await extract_pdf_data(file_path, document_type)
+            tier = "pdf"
+        else:
+            extracted_data, tier = await ocr_pool.run(run_document_extraction, file_path, document_type)
+        
+        # Which pass resolved the document, and what that cost end to end
+        metrics.increment(f"ocr.resolved.{tier}")
+        metrics.observe(f"ocr.latency.{tier}", time.perf_counter() - started)
+        
+        # Empty results mean OCR failed; let the next upload retry instead of caching the failure
+        if any(extracted_data.values()):
+            await ocr_cache.set(content_hash, document_type, extracted_data)
+        
+        return extracted_data
+    except asyncio.TimeoutError:
+        print(f"Error in document processing: OCR timed out after {settings.OCR_TASK_TIMEOUT}s")
+        return {}
+    except Exception as e:
+        print(f"Error in document extraction: {str(e)}")
+        return {}
 
-async def process_document(document_file) -> str:
+async def extract_pdf_data(file_path: str, document_type: str) -> dict:
     """
-    Process and save the uploaded document file
+    Extract information from a multi-page PDF.
+
+    Pages with an embedded text layer are used as-is; the rest are rasterized and OCR'd
+    in parallel across the worker pool. Page results are merged in page order and any
+    pages still pending are cancelled once every required field has been found.
     """
-    # Generate unique filename
-    file_extension = os.path.splitext(document_file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = settings.UPLOAD_DIR / "documents" / unique_filename
+    page_texts = await ocr_pool.run(read_pdf_text_layer, file_path)
     
-    # Create documents directory if it doesn't exist
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        None if text is not None else asyncio.ensure_future(ocr_pool.run(run_pdf_page_ocr, file_path, index))
+        for index, text in enumerate(page_texts)
+    ]
     
-    # Save document file
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await document_file.read()
-        await out_file.write(content)
+    extracted_data = {}
+    try:
+        for text, task in zip(page_texts, tasks):
+            if task is not None:
+                try:
+                    text = await task
+                except asyncio.TimeoutError:
+                    print(f"Error in PDF processing: page OCR timed out after {settings.OCR_TASK_TIMEOUT}s")
+                    continue
+            
+            extracted_data = merge_fields(extracted_data, extract_fields(text, document_type))
+            if extracted_data and not missing_fields(extracted_data, document_type):
+                break
+    finally:
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
     
-    return str(file_path)
+    return extracted_data
 
-async def extract_document_data(file_path: str, document_type: str) -> dict:
+def run_document_extraction(file_path: str, document_type: str) -> tuple:
     """
-    Extract relevant information from the document based on its type
+    Extract relevant information from an image with escalating OCR passes (runs in an OCR worker).
+
+    Returns the extracted data and the name of the pass that found every target field,
+    or "unresolved" if none did.
     """
+    # Errors are handled here: exceptions from native/OCR libraries don't always pickle
+    # back to the parent, and an unpicklable result breaks the whole pool
     try:
         # Read image
         image = cv2.imread(file_path)
@@ -40,105 +177,240 @@ async def extract_document_data(file_path: str, document_type: str) -> dict:
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
-        # Apply thresholding to preprocess the image
-        gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-        
-        # Perform OCR
-        text = pytesseract.image_to_string(gray)
-        
-        # Extract data based on document type
         extracted_data = {}
         
-        if document_type == "aadhaar":
-            extracted_data = extract_aadhaar_data(text)
-        elif document_type == "pan":
-            extracted_data = extract_pan_data(text)
-        elif document_type == "income_proof":
-            extracted_data = extract_income_data(text)
+        # ID cards: OCR only the known field regions of the perspective-corrected card
+        if getattr(document_type, "value", document_type) in LAYOUT_TEMPLATES:
+            card = rectify_card(gray)
+            if card is not None:
+                extracted_data = extract_card_fields(card, document_type, recognize_text)
+                if not missing_fields(extracted_data, document_type):
+                    return extracted_data, "layout"
         
-        return extracted_data
+        for tier, preprocess, psm in OCR_TIERS:
+            config = f"--psm {psm}"
+            whitelist = OCR_CHAR_WHITELISTS.get(getattr(document_type, "value", document_type))
+            if tier == "fast" and whitelist:
+                config += f" -c tessedit_char_whitelist={whitelist}"
+            
+            text = recognize_text(preprocess(gray), config)
+            extracted_data = merge_fields(extracted_data, extract_fields(text, document_type))
+            
+            # Only escalate while fields verify_document_data needs are still missing
+            if not missing_fields(extracted_data, document_type):
+                return extracted_data, tier
+        
+        return extracted_data, "unresolved"
         
     except Exception as e:
         print(f"Error in document processing: {str(e)}")
-        return {}
+        return {}, "failed"
 
-def extract_aadhaar_data(text: str) -> dict:
+def recognize_text(image: np.ndarray, config: str = "") -> str:
     """
-    Extract information from Aadhaar card
+    Run tesseract on an in-memory image with this worker's OCR backend
     """
-    data = {
-        "name": "",
-        "dob": "",
-        "gender": "",
-        "aadhaar_number": "",
-        "address": ""
-    }
-    
-    # TODO: Implement Aadhaar data extraction using regex or NLP
-    # This is a placeholder implementation
-    lines = text.split('\n')
-    for line in lines:
-        if "Name" in line:
-            data["name"] = line.split(":")[-1].strip()
-        elif "DOB" in line:
-            data["dob"] = line.split(":")[-1].strip()
-        elif "Gender" in line:
-            data["gender"] = line.split(":")[-1].strip()
-        elif "Aadhaar" in line:
-            data["aadhaar_number"] = line.split(":")[-1].strip()
+    return get_ocr_backend().recognize(image, config)
+
+def parse_tesseract_config(config: str) -> tuple:
+    """
+    Split a tesseract command-line config ("--psm 7 -c name=value") into the page
+    segmentation mode and a dict of variables
+    """
+    psm = 3
+    variables = {}
+    args = shlex.split(config)
+    for flag, value in zip(args, args[1:]):
+        if flag == "--psm":
+            psm = int(value)
+        elif flag == "-c":
+            name, _, setting = value.partition("=")
+            variables[name] = setting
+    return psm, variables
+
+class SubprocessOcrBackend:
+    """
+    pytesseract: writes each image to a temp file and runs the tesseract binary on it,
+    reloading the language model every call. Needs only the tesseract binary.
+    """
+    name = "subprocess"
     
-    return data
+    def recognize(self, image: np.ndarray, config: str = "") -> str:
+        # tesseract is killed if it outlives the task timeout
+        return pytesseract.image_to_string(
+            image, lang=settings.OCR_LANGUAGE, config=config, timeout=settings.OCR_TASK_TIMEOUT
+        )
 
-def extract_pan_data(text: str) -> dict:
+class TesserocrBackend:
     """
-    Extract information from PAN card
+    libtesseract in-process via tesserocr: the language model is loaded once per engine
+    and images are handed over as in-memory buffers.
+    
+    A tesseract API object isn't thread-safe, so engines are pooled and each concurrent
+    caller (card regions are read on several threads) borrows its own.
     """
-    data = {
-        "name": "",
-        "father_name": "",
-        "dob": "",
-        "pan_number": "",
-        "address": ""
-    }
+    name = "tesserocr"
     
-    # TODO: Implement PAN data extraction using regex or NLP
-    # This is a placeholder implementation
-    lines = text.split('\n')
-    for line in lines:
-        if "Name" in line:
-            data["name"] = line.split(":")[-1].strip()
-        elif "Father's Name" in line:
-            data["father_name"] = line.split(":")[-1].strip()
-        elif "Date of Birth" in line:
-            data["dob"] = line.split(":")[-1].strip()
-        elif "PAN" in line:
-            data["pan_number"] = line.split(":")[-1].strip()
+    def __init__(self):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._engines = queue.LifoQueue()
+        # Fail here, at worker start-up, if the library or language data is missing
+        self._engines.put(self._create_engine())
     
-    return data
+    def _create_engine(self):
+        kwargs = {"lang": settings.OCR_LANGUAGE}
+        if settings.TESSDATA_DIR:
+            kwargs["path"] = settings.TESSDATA_DIR
+        return self._tesserocr.PyTessBaseAPI(**kwargs)
+    
+    def recognize(self, image: np.ndarray, config: str = "") -> str:
+        psm, variables = parse_tesseract_config(config)
+        try:
+            engine = self._engines.get_nowait()
+        except queue.Empty:
+            engine = self._create_engine()
+        defaults = {name: engine.GetVariableAsString(name) for name in variables}
+        try:
+            image = np.ascontiguousarray(image, dtype=np.uint8)
+            height, width = image.shape[:2]
+            channels = image.shape[2] if image.ndim == 3 else 1
+            engine.SetPageSegMode(psm)
+            for name, value in variables.items():
+                engine.SetVariable(name, value)
+            engine.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+            if not engine.Recognize(timeout=settings.OCR_TASK_TIMEOUT * 1000):
+                raise RuntimeError(f"tesseract gave up after {settings.OCR_TASK_TIMEOUT}s")
+            return engine.GetUTF8Text()
+        finally:
+            # Variables persist on the engine; restore them so the next caller starts clean
+            for name, value in defaults.items():
+                engine.SetVariable(name, value or "")
+            engine.Clear()
+            self._engines.put(engine)
+
+OCR_BACKENDS = {
+    SubprocessOcrBackend.name: SubprocessOcrBackend,
+    TesserocrBackend.name: TesserocrBackend,
+}
+
+_ocr_backend = None
 
-def extract_income_data(text: str) -> dict:
+def get_ocr_backend():
     """
-    Extract information from income proof document
+    This process's OCR backend, created on first use. With OCR_BACKEND "auto" the
+    in-process engine is preferred and the subprocess path is the fallback.
     """
-    data = {
-        "monthly_income": 0.0,
-        "employment_type": "",
-        "employer_name": "",
-        "document_type": ""
-    }
-    
-    # TODO: Implement income data extraction using regex or NLP
-    # This is a placeholder implementation
-    lines = text.split('\n')
-    for line in lines:
-        if "Income" in line:
+    global _ocr_backend
+    if _ocr_backend is None:
+        if settings.OCR_BACKEND == "auto":
             try:
-                data["monthly_income"] = float(line.split(":")[-1].strip().replace(",", ""))
-            except:
-                pass
-        elif "Employment" in line:
-            data["employment_type"] = line.split(":")[-1].strip()
-        elif "Employer" in line:
-            data["employer_name"] = line.split(":")[-1].strip()
-    
-    return data 
\ No newline at end of file
+                _ocr_backend = TesserocrBackend()
+            except Exception as e:
+                print(f"Error in OCR engine setup, using the tesseract binary instead: {str(e)}")
+                _ocr_backend = SubprocessOcrBackend()
+        else:
+            _ocr_backend = OCR_BACKENDS[settings.OCR_BACKEND]()
+    return _ocr_backend
+
+def preprocess_fast(gray: np.ndarray) -> np.ndarray:
+    """
+    Downscale large photos and binarize; enough for clean scans
+    """
+    scale = settings.OCR_FAST_MAX_SIDE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+def preprocess_standard(gray: np.ndarray) -> np.ndarray:
+    """
+    Full-resolution Otsu binarization
+    """
+    return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
+def preprocess_enhanced(gray: np.ndarray) -> np.ndarray:
+    """
+    Upscale small images, denoise, deskew and adaptively threshold for poor captures
+    """
+    if max(gray.shape) < settings.OCR_UPSCALE_MIN_SIDE:
+        gray = cv2.resize(gray, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    gray = cv2.fastNlMeansDenoising(gray, h=10)
+    gray = deskew(gray)
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+def deskew(gray: np.ndarray) -> np.ndarray:
+    """
+    Rotate the image so the dominant text direction is horizontal
+    """
+    ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)[1]
+    coords = cv2.findNonZero(ink)
+    if coords is None:
+        return gray
+    angle = cv2.minAreaRect(coords)[-1]
+    # minAreaRect's angle convention differs between OpenCV versions; normalize to [-45, 45]
+    if angle > 45:
+        angle -= 90
+    elif angle < -45:
+        angle += 90
+    if abs(angle) < 0.5:
+        return gray
+    height, width = gray.shape
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+# OCR passes from cheapest to most expensive: (name, preprocessing, tesseract page segmentation mode)
+OCR_TIERS = [
+    ("fast", preprocess_fast, 6),  # single uniform block of text
+    ("standard", preprocess_standard, 3),  # automatic page segmentation
+    ("enhanced", preprocess_enhanced, 11),  # sparse text, for cards photographed at an angle
+]
+
+_LETTERS_DIGITS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+# Characters the fast pass may emit per document type (keeps tesseract off non-Latin scripts)
+OCR_CHAR_WHITELISTS = {
+    "aadhaar": _LETTERS_DIGITS + ":/-",
+    "pan": _LETTERS_DIGITS + ":/-.",
+    "income_proof": _LETTERS_DIGITS + ":/-.,",
+}
+
+def read_pdf_text_layer(file_path: str) -> list:
+    """
+    Return the embedded text of each page, or None for pages that need OCR (runs in an OCR worker)
+    """
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        page_texts = []
+        for index in range(min(len(pdf), settings.PDF_MAX_PAGES)):
+            page = pdf[index]
+            text = page.get_textpage().get_text_range()
+            # Scanned pages have no (or only a stray) text layer
+            page_texts.append(text if len(text.strip()) >= settings.PDF_TEXT_LAYER_MIN_CHARS else None)
+        return page_texts
+    finally:
+        pdf.close()
+
+def run_pdf_page_ocr(file_path: str, page_index: int) -> str:
+    """
+    Rasterize a single PDF page and OCR it (runs in an OCR worker)
+    """
+    try:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            # Render only this page, straight to grayscale
+            bitmap = pdf[page_index].render(scale=settings.PDF_RASTER_DPI / 72, grayscale=True)
+            gray = bitmap.to_numpy()
+        finally:
+            pdf.close()
+        
+        return ocr_image(gray)
+        
+    except Exception as e:
+        print(f"Error in PDF page processing: {str(e)}")
+        return ""
+
+def ocr_image(gray: np.ndarray) -> str:
+    """
+    Binarize a grayscale page and run tesseract on it
+    """
+    return recognize_text(preprocess_standard(gray))
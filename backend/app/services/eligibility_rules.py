@@ -0,0 +1,345 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.models.models import DocumentType, JobStatus, LoanStatus
+from app.services.field_extraction import REQUIRED_FIELDS
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "eligibility_rules.json"
+
+DOCUMENT_LABELS = {
+    "aadhaar": "Aadhaar card",
+    "pan": "PAN card",
+    "income_proof": "income proof",
+    "bank_statement": "bank statement",
+}
+
+
+def normalize_employment_type(value: Optional[str]) -> str:
+    """
+    "Self-Employed", "self_employed" and "self employed" are the same employment type
+    """
+    return " ".join((value or "").lower().replace("-", " ").replace("_", " ").split())
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    """
+    Eligibility rules as data, loaded from a JSON file.
+
+    An application is rejected if it fails the income, employment type or loan amount
+    rule, before its documents are looked at: a low income with documents missing is
+    rejected, not asked for more information. Applications passing those rules need more
+    information until every required document has been read with its required fields.
+    """
+    version: str
+    min_monthly_income: float
+    max_loan_multiplier: float  # largest loan as a multiple of monthly income
+    # Normalized employment type -> factor on max_loan_multiplier; empty allows any type
+    employment_multipliers: Dict[str, float]
+    # Loan type -> required document types; "default" covers loan types not listed
+    required_documents: Dict[str, Tuple[str, ...]]
+
+    def required_for(self, loan_type: Optional[str]) -> Tuple[str, ...]:
+        return self.required_documents.get((loan_type or "").lower(), self.required_documents["default"])
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "min_monthly_income": self.min_monthly_income,
+            "max_loan_multiplier": self.max_loan_multiplier,
+            "employment_types": dict(self.employment_multipliers),
+            "required_documents": {loan_type: list(docs) for loan_type, docs in self.required_documents.items()},
+        }
+
+
+def parse_ruleset(data: dict) -> Ruleset:
+    """
+    Validate a ruleset definition, raising ValueError on anything a decision can't use
+    """
+    try:
+        version = str(data["version"]).strip()
+        min_monthly_income = float(data["min_monthly_income"])
+        max_loan_multiplier = float(data["max_loan_multiplier"])
+        employment = {
+            normalize_employment_type(name): float(factor)
+            for name, factor in data.get("employment_types", {}).items()
+        }
+        required = {
+            loan_type.lower(): tuple(docs)
+            for loan_type, docs in data["required_documents"].items()
+        }
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"Invalid eligibility ruleset: {str(e)}")
+
+    if not version:
+        raise ValueError("Invalid eligibility ruleset: version is empty")
+    if min_monthly_income < 0 or max_loan_multiplier <= 0 or any(factor <= 0 for factor in employment.values()):
+        raise ValueError("Invalid eligibility ruleset: thresholds and multipliers must be positive")
+    if "default" not in required:
+        raise ValueError("Invalid eligibility ruleset: required_documents needs a \"default\" entry")
+    known = {document_type.value for document_type in DocumentType}
+    unknown = {doc for docs in required.values() for doc in docs} - known
+    if unknown:
+        raise ValueError(f"Invalid eligibility ruleset: unknown document types {sorted(unknown)}")
+
+    return Ruleset(
+        version=version,
+        min_monthly_income=min_monthly_income,
+        max_loan_multiplier=max_loan_multiplier,
+        employment_multipliers=employment,
+        required_documents=required,
+    )
+
+
+def load_ruleset(path: Path) -> Ruleset:
+    with open(path) as f:
+        return parse_ruleset(json.load(f))
+
+
+def check_required_documents(documents: list, required: Tuple[str, ...]) -> dict:
+    """
+    Check if all required documents are present
+    """
+    present = {getattr(doc.document_type, "value", doc.document_type) for doc in documents}
+    missing_docs = [doc_type for doc_type in required if doc_type not in present]
+
+    return {
+        "all_present": len(missing_docs) == 0,
+        "missing_docs": ", ".join(missing_docs) if missing_docs else None
+    }
+
+
+def missing_fields(document_type: str, data: dict) -> List[str]:
+    """
+    Required fields of a document type that its extracted data lacks
+    """
+    return [field for field in REQUIRED_FIELDS.get(document_type, []) if not data.get(field)]
+
+
+def document_problem(document_type: str, status: Optional[JobStatus], data: Optional[dict]) -> Optional[str]:
+    """
+    Why a single document doesn't verify, or None if it does; `data` isn't read while
+    the document is still being processed
+    """
+    label = DOCUMENT_LABELS.get(document_type, document_type)
+    if status in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        return f"The {label} is still being processed"
+    if missing_fields(document_type, data):
+        return f"Incomplete {label} information"
+    return None
+
+
+def verify_document_data(context) -> dict:
+    """
+    Verify the data extracted from documents
+    """
+    for doc in context.documents:
+        try:
+            document_type = getattr(doc.document_type, "value", doc.document_type)
+            processing = doc.status in (JobStatus.QUEUED, JobStatus.PROCESSING)
+            problem = document_problem(document_type, doc.status, None if processing else context.extracted_data(doc))
+            if problem is not None:
+                return {"verified": False, "reason": problem}
+
+        except Exception as e:
+            return {
+                "verified": False,
+                "reason": f"Error verifying document data: {str(e)}"
+            }
+
+    return {"verified": True}
+
+
+# A rule returns None when the application passes it, or the (status, reason) failing it
+Check = Callable[[object], Optional[Tuple[LoanStatus, str]]]
+
+
+def income_rule(ruleset: Ruleset) -> Check:
+    minimum = ruleset.min_monthly_income
+
+    def check(context):
+        income = context.application.monthly_income
+        if income < minimum:
+            return LoanStatus.REJECTED, f"Monthly income ({income}) is below minimum requirement ({minimum:g})"
+    return check
+
+
+def employment_rule(ruleset: Ruleset) -> Optional[Check]:
+    allowed = ruleset.employment_multipliers
+    if not allowed:
+        return None
+
+    def check(context):
+        employment_type = context.application.employment_type
+        if normalize_employment_type(employment_type) not in allowed:
+            return LoanStatus.REJECTED, f"Unsupported employment type ({employment_type})"
+    return check
+
+
+def loan_amount_rule(ruleset: Ruleset) -> Check:
+    multiplier = ruleset.max_loan_multiplier
+    factors = ruleset.employment_multipliers
+
+    def check(context):
+        application = context.application
+        factor = factors.get(normalize_employment_type(application.employment_type), 1.0)
+        max_eligible_amount = application.monthly_income * multiplier * factor
+        if application.loan_amount > max_eligible_amount:
+            return (
+                LoanStatus.REJECTED,
+                f"Requested loan amount ({application.loan_amount}) exceeds maximum eligible amount ({max_eligible_amount})"
+            )
+    return check
+
+
+def required_documents_rule(ruleset: Ruleset) -> Check:
+    def check(context):
+        result = check_required_documents(context.documents, ruleset.required_for(context.application.loan_type))
+        if not result["all_present"]:
+            return LoanStatus.MORE_INFO_NEEDED, result["missing_docs"]
+    return check
+
+
+def document_data_rule(ruleset: Ruleset) -> Check:
+    def check(context):
+        result = verify_document_data(context)
+        if not result["verified"]:
+            return LoanStatus.MORE_INFO_NEEDED, result["reason"]
+    return check
+
+
+# (relative cost, reads documents, rule factory): field comparisons first, document
+# lookups next, JSON parsing last, so a decision stops at the cheapest failing rule
+RULES = [
+    (1, False, income_rule),
+    (2, False, employment_rule),
+    (3, False, loan_amount_rule),
+    (10, True, required_documents_rule),
+    (100, True, document_data_rule),
+]
+
+
+class ApplicationOnly(NamedTuple):
+    """
+    A context for the rules that read only the application's own fields
+    """
+    application: object
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    ruleset: Ruleset
+    decide: Callable[[object], dict]
+    # The first failing application-field rule as (status, reason), or None
+    check_application: Callable[[object], Optional[Tuple[LoanStatus, str]]]
+    # The decision for an application passing every rule
+    approval: Callable[[object], dict]
+
+
+def compile_ruleset(ruleset: Ruleset) -> CompiledRules:
+    """
+    Build the decision function for a ruleset once: constants are bound into each rule,
+    rules that don't apply are dropped, and the rest run cheapest first
+    """
+    rules = [
+        (factory(ruleset), reads_documents)
+        for _, reads_documents, factory in sorted(RULES, key=lambda rule: rule[0])
+    ]
+    checks = tuple(check for check, _ in rules if check is not None)
+    application_checks = tuple(check for check, reads_documents in rules if check is not None and not reads_documents)
+    version = ruleset.version
+    multiplier = ruleset.max_loan_multiplier
+    factors = ruleset.employment_multipliers
+
+    def decide(context) -> dict:
+        for check in checks:
+            failure = check(context)
+            if failure is not None:
+                return {"status": failure[0], "reason": failure[1], "ruleset_version": version}
+        return approval(context.application)
+
+    def check_application(application) -> Optional[Tuple[LoanStatus, str]]:
+        context = ApplicationOnly(application)
+        for check in application_checks:
+            failure = check(context)
+            if failure is not None:
+                return failure
+        return None
+
+    def approval(application) -> dict:
+        factor = factors.get(normalize_employment_type(application.employment_type), 1.0)
+        return {
+            "status": LoanStatus.APPROVED,
+            "reason": "Loan application approved",
+            "ruleset_version": version,
+            "details": {
+                "loan_amount": application.loan_amount,
+                "monthly_income": application.monthly_income,
+                "employment_type": application.employment_type,
+                "max_eligible_amount": application.monthly_income * multiplier * factor
+            }
+        }
+
+    return CompiledRules(ruleset=ruleset, decide=decide, check_application=check_application, approval=approval)
+
+
+class RuleEngine:
+    """
+    The active compiled ruleset, reloaded when its file changes.
+
+    The file's modification time is checked at most every `check_interval` seconds. A
+    new ruleset is compiled before it is swapped in with a single reference assignment,
+    so a decision uses one ruleset from start to finish. A file that fails to parse, or
+    that changes its rules without a new version, leaves the active ruleset in place.
+    """
+
+    def __init__(self, path: Path, check_interval: float):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._active: Optional[CompiledRules] = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> CompiledRules:
+        if self._active is None or time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        return self._active
+
+    def refresh(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self._mtime:
+                    return
+                compiled = compile_ruleset(load_ruleset(self.path))
+            except (OSError, ValueError) as e:
+                if self._active is None:
+                    raise
+                print(f"Error in eligibility rules reload: {str(e)}")
+                return
+            self._mtime = mtime
+
+            current = self._active
+            if current is not None and compiled.ruleset.version == current.ruleset.version:
+                if compiled.ruleset != current.ruleset:
+                    print(f"Error in eligibility rules reload: rules changed without a new version ({current.ruleset.version})")
+                return
+            self.swap(compiled)
+
+    def swap(self, compiled: CompiledRules):
+        self._active = compiled
+
+
+rule_engine = RuleEngine(
+    settings.ELIGIBILITY_RULES_PATH or DEFAULT_RULES_PATH,
+    settings.ELIGIBILITY_RULES_CHECK_INTERVAL,
+)
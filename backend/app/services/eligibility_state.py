@@ -0,0 +1,155 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Optional
+
+from app.models.models import JobStatus, LoanApplication, LoanStatus
+from app.services.eligibility_rules import CompiledRules, document_problem, missing_fields, rule_engine
+from app.services.loan_service import parse_extracted_data
+
+
+@dataclass
+class EligibilityState:
+    """
+    The inputs of an application's eligibility decision, stored on the application and
+    updated one document at a time.
+
+    Each document's check result is kept, so adding or changing a document re-checks that
+    document only, and the application-field rules are only re-run when the ruleset
+    version changes. The decision is derived from these results without loading or
+    parsing any document.
+    """
+    ruleset_version: Optional[str] = None
+    # First failing application-field rule under ruleset_version: {"status", "reason"}
+    application_failure: Optional[dict] = None
+    # Document id -> {"type", "status", "missing_fields", "problem"}
+    documents: Dict[str, dict] = field(default_factory=dict)
+    decision: Optional[dict] = None
+
+    @classmethod
+    def load(cls, value: Optional[dict]) -> Optional["EligibilityState"]:
+        return cls(**value) if value else None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def document_entry(document) -> dict:
+    """
+    Check a single document, parsing its extracted data if it has finished processing
+    """
+    document_type = getattr(document.document_type, "value", document.document_type)
+    missing = None
+    if document.status in (JobStatus.QUEUED, JobStatus.PROCESSING):
+        problem = document_problem(document_type, document.status, None)
+    else:
+        try:
+            data = parse_extracted_data(document)
+            missing = missing_fields(document_type, data)
+            problem = document_problem(document_type, document.status, data)
+        except Exception as e:
+            problem = f"Error verifying document data: {str(e)}"
+    return {
+        "type": document_type,
+        "status": getattr(document.status, "value", document.status),
+        "missing_fields": missing,
+        "problem": problem,
+    }
+
+
+def refresh_application_rules(state: EligibilityState, application: LoanApplication, rules: CompiledRules):
+    failure = rules.check_application(application)
+    state.application_failure = {"status": failure[0].value, "reason": failure[1]} if failure else None
+    state.ruleset_version = rules.ruleset.version
+
+
+def decide(state: EligibilityState, application: LoanApplication, rules: CompiledRules) -> dict:
+    """
+    The decision the compiled rules make for the same application and documents, in the
+    same rule order
+    """
+    if state.ruleset_version != rules.ruleset.version:
+        refresh_application_rules(state, application, rules)
+    version = rules.ruleset.version
+
+    if state.application_failure is not None:
+        return {
+            "status": LoanStatus(state.application_failure["status"]),
+            "reason": state.application_failure["reason"],
+            "ruleset_version": version
+        }
+
+    entries = [state.documents[key] for key in sorted(state.documents, key=int)]
+    present = {entry["type"] for entry in entries}
+    missing_docs = [doc_type for doc_type in rules.ruleset.required_for(application.loan_type) if doc_type not in present]
+    if missing_docs:
+        return {"status": LoanStatus.MORE_INFO_NEEDED, "reason": ", ".join(missing_docs), "ruleset_version": version}
+
+    for entry in entries:
+        if entry["problem"] is not None:
+            return {"status": LoanStatus.MORE_INFO_NEEDED, "reason": entry["problem"], "ruleset_version": version}
+
+    return rules.approval(application)
+
+
+def build_state(documents: Iterable) -> EligibilityState:
+    """
+    A fresh state with every document checked
+    """
+    state = EligibilityState()
+    for document in documents:
+        state.documents[str(document.id)] = document_entry(document)
+    return state
+
+
+def save_decision(application: LoanApplication, state: EligibilityState, rules: CompiledRules) -> dict:
+    """
+    Decide from the state and store state, status and ruleset version on the application
+    """
+    decision = decide(state, application, rules)
+    state.decision = {**decision, "status": decision["status"].value}
+    application.eligibility_state = state.to_dict()
+    application.status = decision["status"]
+    application.ruleset_version = decision["ruleset_version"]
+    return decision
+
+
+def initialize_eligibility(
+    application: LoanApplication, documents: Iterable = (), rules: Optional[CompiledRules] = None
+) -> dict:
+    """
+    Build an application's state from scratch: for new applications, and ones saved
+    before the state existed
+    """
+    rules = rules or rule_engine.active
+    return save_decision(application, build_state(documents), rules)
+
+
+def update_eligibility(application: LoanApplication, document, rules: Optional[CompiledRules] = None) -> dict:
+    """
+    Fold one added or changed document into the application's state and save the new
+    decision. The caller holds the application row locked, so concurrent document updates
+    don't overwrite each other's state.
+    """
+    rules = rules or rule_engine.active
+    state = EligibilityState.load(application.eligibility_state)
+    if state is None:
+        raise ValueError("The application has no eligibility state; initialize it with all its documents")
+    state.documents[str(document.id)] = document_entry(document)
+    return save_decision(application, state, rules)
+
+
+def current_eligibility(application: LoanApplication, rules: Optional[CompiledRules] = None) -> Optional[dict]:
+    """
+    The stored decision with the per-document checks, re-derived in memory if the active
+    ruleset has changed since it was saved
+    """
+    state = EligibilityState.load(application.eligibility_state)
+    if state is None:
+        return None
+    rules = rules or rule_engine.active
+    decision = state.decision
+    if decision is None or decision["ruleset_version"] != rules.ruleset.version:
+        decision = decide(state, application, rules)
+    return {
+        **decision,
+        "documents": [{"id": int(key), **state.documents[key]} for key in sorted(state.documents, key=int)]
+    }
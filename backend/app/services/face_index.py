@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.lazy import LazyModule
+from app.models.models import VideoInteraction
+
+np = LazyModule("numpy")
+
+# face_recognition (dlib) embeddings are 128 floats; float32 keeps each one at 512 bytes
+EMBEDDING_SIZE = 128
+EMBEDDING_DTYPE = "float32"
+
+
+def encode_embedding(encoding: np.ndarray) -> bytes:
+    """
+    Serialize a face encoding for the face_encoding column
+    """
+    return np.asarray(encoding, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def decode_embeddings(blobs: list) -> np.ndarray:
+    """
+    Stack serialized face encodings into an (n, 128) matrix
+    """
+    if not blobs:
+        return np.empty((0, EMBEDDING_SIZE), dtype=EMBEDDING_DTYPE)
+    return np.frombuffer(b"".join(blobs), dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_SIZE)
+
+
+class FaceIndex:
+    """
+    Reference face encodings per user, held as one NumPy matrix per user.
+
+    References are the encodings of a user's earlier verified interactions. Matrices are
+    loaded from the database on first use and kept for the most recently seen users.
+    """
+
+    def __init__(self, max_users: int, max_references: int, threshold: float):
+        self.max_references = max_references
+        self.threshold = threshold
+        self._matrices = LRUCache(max_users)
+
+    async def references(self, user_id: int, db: AsyncSession) -> np.ndarray:
+        matrix = self._matrices.get(user_id)
+        if matrix is None:
+            blobs = (await db.scalars(
+                select(VideoInteraction.face_encoding).where(
+                    VideoInteraction.user_id == user_id,
+                    VideoInteraction.face_verified == True,
+                    VideoInteraction.face_encoding.isnot(None),
+                ).order_by(VideoInteraction.id.desc()).limit(self.max_references)
+            )).all()
+            matrix = decode_embeddings(list(blobs))
+            self._matrices.set(user_id, matrix)
+        return matrix
+
+    async def match(self, user_id: int, encoding: np.ndarray, db: AsyncSession) -> dict:
+        """
+        Compare an encoding with all of the user's references in one vectorized step.
+
+        A user with no references yet is enrolled with this face.
+        """
+        references = await self.references(user_id, db)
+        if not len(references):
+            return {"matched": True, "enrolled": True, "distance": None, "references": 0}
+
+        distances = np.linalg.norm(references - np.asarray(encoding, dtype=EMBEDDING_DTYPE), axis=1)
+        distance = float(distances.min())
+        return {
+            "matched": distance <= self.threshold,
+            "enrolled": False,
+            "distance": round(distance, 4),
+            "references": len(references),
+        }
+
+    def add(self, user_id: int, encoding: np.ndarray):
+        """
+        Add a newly verified encoding to a cached user; uncached users pick it up on load
+        """
+        matrix: Optional[np.ndarray] = self._matrices.get(user_id)
+        if matrix is None:
+            return
+        row = np.asarray(encoding, dtype=EMBEDDING_DTYPE).reshape(1, EMBEDDING_SIZE)
+        # Newest first, as loaded from the database
+        self._matrices.set(user_id, np.vstack([row, matrix])[:self.max_references])
+
+
+face_index = FaceIndex(
+    max_users=settings.FACE_INDEX_MAX_USERS,
+    max_references=settings.FACE_MAX_REFERENCES,
+    threshold=settings.FACE_MATCH_THRESHOLD,
+)
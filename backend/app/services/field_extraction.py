@@ -0,0 +1,296 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Horizontal whitespace only, so a value never runs onto the next OCR line
+_S = r"[^\S\n]*"
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    How to find one field in OCR text.
+
+    Labelled specs match lines of the form "<label>: <value>"; the rest of the line must
+    then match `value`, whose `(?P<value>...)` group (or whole match) is parsed. Specs
+    without a label are searched for anywhere in the text, but only when no labelled spec
+    found the field. Several specs may target the same field; the highest confidence wins.
+    """
+    name: str
+    label: Optional[str]
+    value: str
+    parse: Callable[[str], Any] = str.strip
+    confidence: float = 0.9
+    validate: Optional[Callable[[Any], bool]] = None
+
+
+@dataclass
+class FieldMatch:
+    value: Any
+    confidence: float
+    span: tuple
+
+
+@dataclass
+class CompiledSpecs:
+    """
+    Specs for one document type: all labels fused into a single line-anchored regex
+    """
+    line_regex: re.Pattern
+    labelled: Dict[str, tuple]
+    bare: List[tuple]
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    by_field: Dict[str, List[tuple]] = field(default_factory=dict)
+
+
+def _parse_amount(raw: str) -> float:
+    return float(raw.replace(",", ""))
+
+
+def _parse_digits(raw: str) -> str:
+    return re.sub(r"\D", "", raw)
+
+
+def _parse_date(raw: str) -> str:
+    day, month, year = re.split(r"[/.\-]", raw)
+    return f"{day}/{month}/{year}"
+
+
+_VERHOEFF_D = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+    [2, 3, 4, 0, 1, 7, 8, 9, 5, 6], [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+    [4, 0, 1, 2, 3, 9, 5, 6, 7, 8], [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2], [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+    [8, 7, 6, 5, 9, 3, 2, 1, 0, 4], [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+]
+_VERHOEFF_P = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+    [5, 8, 0, 3, 7, 9, 6, 1, 4, 2], [8, 9, 1, 6, 0, 4, 3, 5, 2, 7],
+    [9, 4, 5, 3, 1, 2, 8, 7, 6, 0], [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5], [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+]
+
+
+def is_valid_aadhaar(number: str) -> bool:
+    """
+    Aadhaar numbers don't start with 0 or 1 and end in a Verhoeff check digit
+    """
+    if len(number) != 12 or number[0] in "01":
+        return False
+    check = 0
+    for i, digit in enumerate(reversed(number)):
+        check = _VERHOEFF_D[check][_VERHOEFF_P[i % 8][int(digit)]]
+    return check == 0
+
+
+def is_valid_pan(number: str) -> bool:
+    """
+    The fourth PAN character encodes the holder type
+    """
+    return number[3] in "ABCFGHJLPT"
+
+
+_NAME = r"(?P<value>[A-Za-z][A-Za-z .'\-]*?)" + _S + r"$"
+_DATE = r"(?P<value>\d{2}[/.\-]\d{2}[/.\-]\d{4})"
+_LINE = r"(?P<value>\S.*?)" + _S + r"$"
+_AMOUNT = r"(?:(?i:rs)\.?|(?i:inr)|₹)?" + _S + r"(?P<value>\d[\d,]*(?:\.\d+)?)"
+_AADHAAR = r"(?P<value>\d{4} ?\d{4} ?\d{4})(?!\d)"
+_PAN = r"(?P<value>[A-Z]{5}\d{4}[A-Z])\b"
+
+FIELD_SPECS: Dict[str, List[FieldSpec]] = {
+    "aadhaar": [
+        FieldSpec("name", r"name", _NAME),
+        FieldSpec("dob", r"dob|date of birth", _DATE, parse=_parse_date),
+        FieldSpec("gender", r"gender|sex", r"(?P<value>(?i:male|female|transgender)|[MFT])\b"),
+        FieldSpec("gender", None, r"\b(?P<value>MALE|FEMALE|Male|Female)\b", confidence=0.6),
+        FieldSpec("aadhaar_number", r"aadhaar(?:" + _S + r"no\.?|" + _S + r"number)?", _AADHAAR,
+                  parse=_parse_digits, validate=is_valid_aadhaar),
+        FieldSpec("aadhaar_number", None, r"(?<!\d)(?P<value>[2-9]\d{3} \d{4} \d{4})(?!\d)",
+                  parse=_parse_digits, confidence=0.7, validate=is_valid_aadhaar),
+        FieldSpec("address", r"address", _LINE, confidence=0.8),
+    ],
+    "pan": [
+        FieldSpec("name", r"name", _NAME),
+        FieldSpec("father_name", r"father'?s name", _NAME),
+        FieldSpec("dob", r"date of birth|dob", _DATE, parse=_parse_date),
+        FieldSpec("pan_number", r"permanent account number|pan(?:" + _S + r"no\.?|" + _S + r"number)?", _PAN,
+                  validate=is_valid_pan),
+        FieldSpec("pan_number", None, r"\b" + _PAN, confidence=0.75, validate=is_valid_pan),
+        FieldSpec("address", r"address", _LINE, confidence=0.8),
+    ],
+    "income_proof": [
+        FieldSpec("monthly_income", r"monthly income|net salary|net pay", _AMOUNT, parse=_parse_amount),
+        FieldSpec("monthly_income", r"gross salary|salary|income", _AMOUNT, parse=_parse_amount, confidence=0.7),
+        FieldSpec("employment_type", r"employment(?: type)?", _NAME),
+        FieldSpec("employer_name", r"employer(?: name)?", _LINE),
+        FieldSpec("document_type", r"document type", _LINE),
+    ],
+}
+FIELD_SPECS["bank_statement"] = FIELD_SPECS["income_proof"]
+
+# Fields verify_document_data in eligibility_rules requires for each document type
+REQUIRED_FIELDS = {
+    "aadhaar": ["name", "dob", "aadhaar_number"],
+    "pan": ["name", "dob", "pan_number"],
+    "income_proof": ["monthly_income", "employment_type"],
+}
+
+# Fields OCR keeps trying to find (escalating passes, further PDF pages) until present
+TARGET_FIELDS = {
+    **REQUIRED_FIELDS,
+    "bank_statement": ["monthly_income"],
+}
+
+# Value reported for a field that wasn't found
+FIELD_DEFAULTS = {"monthly_income": 0.0}
+
+
+def compile_specs(specs: List[FieldSpec]) -> CompiledSpecs:
+    """
+    Fuse the labels of a document type into one line-anchored regex with a group per spec
+    """
+    labelled = {}
+    alternatives = []
+    bare = []
+    # A label must end at a word boundary and may be followed by ":" or "-"
+    separator = r"(?![A-Za-z])" + _S + r"[:\-]?" + _S
+    by_field = {}
+    for index, spec in enumerate(specs):
+        by_field.setdefault(spec.name, []).append((spec, re.compile(spec.value, re.MULTILINE)))
+        if spec.label is None:
+            bare.append((spec, re.compile(spec.value)))
+            continue
+        labelled[f"f{index}"] = (spec, re.compile(spec.value), f"r{index}")
+        alternatives.append(f"(?P<f{index}>(?:{spec.label}){separator}(?P<r{index}>[^\\n]*))")
+    line_regex = re.compile(
+        # Optional bilingual prefix ("जन्म तिथि / DOB"), then one of the labels
+        r"^" + _S + r"(?:[^\n:/]*/" + _S + r")?(?:" + "|".join(alternatives) + ")",
+        re.MULTILINE | re.IGNORECASE,
+    )
+    return CompiledSpecs(
+        line_regex=line_regex,
+        labelled=labelled,
+        bare=bare,
+        defaults={spec.name: FIELD_DEFAULTS.get(spec.name, "") for spec in specs},
+        by_field=by_field,
+    )
+
+
+COMPILED_SPECS: Dict[str, CompiledSpecs] = {
+    document_type: compile_specs(specs) for document_type, specs in FIELD_SPECS.items()
+}
+
+
+def _score(spec: FieldSpec, raw: str) -> Optional[tuple]:
+    try:
+        value = spec.parse(raw)
+    except ValueError:
+        return None
+    confidence = spec.confidence
+    if spec.validate is not None and not spec.validate(value):
+        confidence *= 0.5
+    return value, confidence
+
+
+def match_fields(text: str, document_type: str) -> Dict[str, FieldMatch]:
+    """
+    Scan OCR text once for labelled fields and return the best match for each field found
+    """
+    compiled = COMPILED_SPECS.get(getattr(document_type, "value", document_type))
+    if compiled is None:
+        return {}
+
+    matches: Dict[str, FieldMatch] = {}
+    for m in compiled.line_regex.finditer(text):
+        spec, value_regex, rest_group = compiled.labelled[m.lastgroup]
+        value_match = value_regex.match(m.group(rest_group))
+        if value_match is None:
+            continue
+        scored = _score(spec, value_match.group("value"))
+        if scored is None:
+            continue
+        current = matches.get(spec.name)
+        if current is None or scored[1] > current.confidence:
+            matches[spec.name] = FieldMatch(scored[0], scored[1], m.span())
+
+    # Unlabelled fallbacks (OCR often drops the label) only run for fields still missing
+    for spec, value_regex in compiled.bare:
+        if spec.name in matches:
+            continue
+        m = value_regex.search(text)
+        if m is None:
+            continue
+        scored = _score(spec, m.group("value"))
+        if scored is not None:
+            matches[spec.name] = FieldMatch(scored[0], scored[1], m.span())
+    return matches
+
+
+def parse_field(text: str, document_type: str, name: str) -> Optional[FieldMatch]:
+    """
+    Parse one field from text known to hold only that field, such as an OCR'd region crop
+    """
+    compiled = COMPILED_SPECS.get(getattr(document_type, "value", document_type))
+    if compiled is None:
+        return None
+
+    best = None
+    for spec, value_regex in compiled.by_field.get(name, []):
+        m = value_regex.search(text)
+        if m is None:
+            continue
+        scored = _score(spec, m.group("value"))
+        if scored is not None and (best is None or scored[1] > best.confidence):
+            best = FieldMatch(scored[0], scored[1], m.span())
+    return best
+
+
+def empty_fields(document_type: str) -> dict:
+    """
+    Extracted-data dict for a document type with every field at its default
+    """
+    compiled = COMPILED_SPECS.get(getattr(document_type, "value", document_type))
+    if compiled is None:
+        return {}
+    return {**compiled.defaults, "confidence": {}}
+
+
+def extract_fields(text: str, document_type: str) -> dict:
+    """
+    Extract document data from OCR text, with per-field confidence under "confidence"
+    """
+    compiled = COMPILED_SPECS.get(getattr(document_type, "value", document_type))
+    if compiled is None:
+        return {}
+
+    matches = match_fields(text, document_type)
+    data = empty_fields(document_type)
+    data.update({name: match.value for name, match in matches.items()})
+    data["confidence"] = {name: round(match.confidence, 2) for name, match in matches.items()}
+    return data
+
+
+def merge_fields(base: dict, update: dict) -> dict:
+    """
+    Merge extracted data from another page or pass, keeping the more confident value per field
+    """
+    merged = dict(base)
+    confidence = dict(base.get("confidence", {}))
+    update_confidence = update.get("confidence", {})
+    for name, value in update.items():
+        if name == "confidence":
+            continue
+        if name not in merged or (value and update_confidence.get(name, 0) > confidence.get(name, 0)):
+            merged[name] = value
+            if name in update_confidence:
+                confidence[name] = update_confidence[name]
+    merged["confidence"] = confidence
+    return merged
+
+
+def missing_fields(data: dict, document_type: str) -> List[str]:
+    """
+    Target fields that are still empty
+    """
+    required = TARGET_FIELDS.get(getattr(document_type, "value", document_type), [])
+    return [name for name in required if not data.get(name)]
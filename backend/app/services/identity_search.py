@@ -0,0 +1,83 @@
+import enum
+from typing import List
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.database import json_text
+from app.models.models import Document
+
+
+class IdentifierType(str, enum.Enum):
+    PAN = "pan"
+    AADHAAR = "aadhaar"
+
+
+# Extracted field holding each identifier; both have an expression index (models.py)
+IDENTIFIER_FIELDS = {
+    IdentifierType.PAN: "pan_number",
+    IdentifierType.AADHAAR: "aadhaar_number",
+}
+
+
+def normalize_identifier(identifier_type: IdentifierType, value: str) -> str:
+    """
+    Write an identifier the way field extraction stores it: PAN upper case, Aadhaar digits only
+    """
+    if identifier_type == IdentifierType.PAN:
+        return "".join(value.split()).upper()
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def identifier_column(identifier_type: IdentifierType, document=Document):
+    return json_text(document.extracted_data, IDENTIFIER_FIELDS[identifier_type])
+
+
+async def find_documents(db: AsyncSession, identifier_type: IdentifierType, value: str, limit: int = 100) -> List[Document]:
+    """
+    Documents carrying an identifier, through its expression index
+    """
+    result = await db.scalars(
+        select(Document)
+        .where(identifier_column(identifier_type) == normalize_identifier(identifier_type, value))
+        .order_by(Document.id)
+        .limit(limit)
+    )
+    return list(result)
+
+
+async def find_duplicate_identities(db: AsyncSession, loan_application_id: int, limit: int = 100) -> List[dict]:
+    """
+    Documents outside a loan application that carry one of its PAN or Aadhaar numbers.
+
+    Each identifier on the application is an index lookup, so the check costs the same
+    however many documents the table holds.
+    """
+    own = aliased(Document)
+    duplicates = []
+    for identifier_type in IdentifierType:
+        column = identifier_column(identifier_type)
+        own_identifiers = select(identifier_column(identifier_type, own)).where(
+            own.loan_application_id == loan_application_id
+        )
+        rows = await db.execute(
+            select(column, Document.id, Document.user_id, Document.loan_application_id)
+            .where(
+                column.in_(own_identifiers),
+                or_(Document.loan_application_id.is_(None), Document.loan_application_id != loan_application_id),
+            )
+            .order_by(Document.id)
+            .limit(limit)
+        )
+        duplicates.extend(
+            {
+                "identifier_type": identifier_type.value,
+                "identifier": identifier,
+                "document_id": document_id,
+                "user_id": user_id,
+                "loan_application_id": other_application_id,
+            }
+            for identifier, document_id, user_id, other_application_id in rows
+        )
+    return duplicates
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.lazy import LazyModule
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+# Sharpness is measured at a fixed size so thresholds don't depend on camera resolution
+ANALYSIS_MAX_SIDE = 1000
+# Pixels darker than this count as ink; a few words of text on a page are well above the minimum
+INK_LEVEL = 128
+MIN_INK_FRACTION = 0.002
+
+
+@dataclass
+class QualityReport:
+    accepted: bool
+    reasons: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    metrics: dict = field(default_factory=dict)
+
+
+def find_document_contour(gray: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Largest four-sided contour covering a meaningful part of the image, if any
+    """
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, None)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = 0.2 * gray.shape[0] * gray.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4:
+            return approx.reshape(4, 2)
+    return None
+
+
+def assess_image_quality(file_path: str) -> QualityReport:
+    """
+    Cheap checks that predict whether OCR can succeed on an image
+    """
+    # Decoding at half resolution is several times faster for JPEGs and plenty for these checks
+    gray = cv2.imread(file_path, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if gray is None:
+        return QualityReport(accepted=False, reasons=["The image could not be decoded"])
+
+    height, width = gray.shape[0] * 2, gray.shape[1] * 2
+    scale = ANALYSIS_MAX_SIDE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    histogram = np.bincount(gray.ravel(), minlength=256)
+    total = histogram.sum()
+    brightness = float(np.dot(np.arange(256), histogram) / total)
+    contrast = float(gray.std())
+    clipped_dark = float(histogram[:16].sum() / total)
+    clipped_bright = float(histogram[240:].sum() / total)
+    ink = float(histogram[:INK_LEVEL].sum() / total)
+    has_document_edges = find_document_contour(gray) is not None
+
+    report = QualityReport(accepted=True, metrics={
+        "width": width,
+        "height": height,
+        "sharpness": round(sharpness, 1),
+        "brightness": round(brightness, 1),
+        "contrast": round(contrast, 1),
+        "clipped_dark": round(clipped_dark, 3),
+        "clipped_bright": round(clipped_bright, 3),
+        "ink": round(ink, 4),
+        "document_edges_found": has_document_edges,
+    })
+
+    if min(height, width) < settings.QUALITY_MIN_SHORT_SIDE:
+        report.reasons.append(
+            f"Resolution is too low ({width}x{height}); move the camera closer or scan at a higher resolution"
+        )
+    if sharpness < settings.QUALITY_MIN_SHARPNESS:
+        report.reasons.append("The image is blurry; hold the camera steady and make sure the document is in focus")
+    elif sharpness < 2 * settings.QUALITY_MIN_SHARPNESS:
+        report.warnings.append("The image is slightly blurry")
+    if brightness < settings.QUALITY_MIN_BRIGHTNESS or clipped_dark > 0.5:
+        report.reasons.append("The image is too dark; take the photo in better light")
+    # A clean scan of white paper is nearly all highlights too; it's only overexposed once the text
+    # has washed out with it
+    elif (brightness > settings.QUALITY_MAX_BRIGHTNESS or clipped_bright > 0.95) and ink < MIN_INK_FRACTION:
+        report.reasons.append("The image is overexposed; avoid direct light or flash glare on the document")
+    if contrast < settings.QUALITY_MIN_CONTRAST:
+        report.reasons.append("The text has too little contrast with the background")
+    if not has_document_edges:
+        # Flatbed scans fill the frame and have no visible edges, so this alone never rejects
+        report.warnings.append(
+            "Document edges were not detected; place it on a contrasting background with all four corners visible"
+        )
+
+    report.accepted = not report.reasons
+    return report
@@ -0,0 +1,125 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.core.cache import LRUCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """
+    SHA-256 of a file's contents, read in fixed-size chunks
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OcrResultCache:
+    """
+    Two-tier cache of extracted document data keyed by file hash and document type.
+
+    Entries live in an in-process LRU and as JSON files under `<cache_dir>/<version>/`.
+    Directories of other extractor versions are removed on first use, so bumping the
+    version invalidates everything. The disk tier is trimmed oldest-first once it grows
+    past `max_disk_bytes`.
+    """
+
+    def __init__(self, cache_dir: Path, version: str, max_entries: int, max_disk_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = LRUCache(max_entries)
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version_dir(self) -> Path:
+        return self.cache_dir / self.version
+
+    def _key(self, content_hash: str, document_type: str) -> str:
+        return f"{getattr(document_type, 'value', document_type)}-{content_hash}"
+
+    async def get(self, content_hash: str, document_type: str) -> Optional[dict]:
+        """
+        Return cached extracted data, or None on a miss
+        """
+        key = self._key(content_hash, document_type)
+        data = self._memory.get(key)
+        if data is None:
+            data = await asyncio.to_thread(self._read_disk, key)
+            if data is None:
+                return None
+            self._memory.set(key, data)
+        return copy.deepcopy(data)
+
+    async def set(self, content_hash: str, document_type: str, data: dict):
+        """
+        Store extracted data in both tiers
+        """
+        key = self._key(content_hash, document_type)
+        self._memory.set(key, copy.deepcopy(data))
+        await asyncio.to_thread(self._write_disk, key, data)
+
+    def _prepare(self):
+        # Runs once per process: drop stale extractor versions and size the disk tier
+        if self._disk_bytes is not None:
+            return
+        self.version_dir.mkdir(parents=True, exist_ok=True)
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and entry.name != self.version:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        self._disk_bytes = sum(e.stat().st_size for e in os.scandir(self.version_dir))
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        with self._lock:
+            self._prepare()
+        path = self.version_dir / f"{key}.json"
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            # Refresh mtime so eviction approximates LRU
+            os.utime(path)
+            return data
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, data: dict):
+        payload = json.dumps(data).encode()
+        with self._lock:
+            self._prepare()
+            path = self.version_dir / f"{key}.json"
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            try:
+                # Rewriting a key replaces its file rather than adding one
+                self._disk_bytes -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._disk_bytes += len(payload)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Trim to 90% of the budget so we don't rescan the directory on every write
+        entries = sorted(os.scandir(self.version_dir), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        target = self.max_disk_bytes * 0.9
+        for entry in entries:
+            if total <= target:
+                break
+            total -= entry.stat().st_size
+            self._memory.pop(Path(entry.name).stem)
+            os.remove(entry.path)
+        self._disk_bytes = total
@@ -0,0 +1,47 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class Page:
+    items: List
+    next_cursor: Optional[str]
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    The id a page continues after; ValueError for cursors this module didn't issue
+    """
+    try:
+        prefix, _, value = base64.urlsafe_b64decode(cursor.encode()).decode().partition(":")
+        if prefix != "id":
+            raise ValueError
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+async def keyset_page(db: AsyncSession, query, model, cursor: Optional[str], limit: int) -> Page:
+    """
+    One page of a query, newest first.
+
+    Pages continue from the last id seen (WHERE id < cursor) instead of skipping rows
+    with OFFSET, so with an index on (filter column, id) any page costs the same as the
+    first. Ids are assigned in insertion order, which makes id order creation order.
+    """
+    if cursor:
+        query = query.where(model.id < decode_cursor(cursor))
+    rows = list(await db.scalars(query.order_by(model.id.desc()).limit(limit + 1)))
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return Page(items=rows[:limit], next_cursor=next_cursor)
@@ -0,0 +1,155 @@
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import aiofiles
+
+from app.core.config import settings
+
+# Extensions in Settings.VIDEO_FORMATS mapped to the MIME types we sniff
+VIDEO_MIME_TYPES = {
+    "mp4": "video/mp4",
+    "webm": "video/webm",
+    "mov": "video/quicktime",
+}
+
+MIME_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "application/pdf": ".pdf",
+    "video/mp4": ".mp4",
+    "video/webm": ".webm",
+    "video/quicktime": ".mov",
+}
+
+# QuickTime files without an `ftyp` box start directly with one of these atoms
+QUICKTIME_ATOMS = (b"moov", b"mdat", b"wide", b"free", b"skip")
+
+
+class UploadRejected(Exception):
+    """
+    Raised when an upload fails validation during ingest
+    """
+
+    def __init__(self, detail: Union[str, dict], status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+    mime_type: str
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """
+    Identify the file type from its leading bytes
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head[4:8] == b"ftyp":
+        return "video/quicktime" if head[8:12] == b"qt  " else "video/mp4"
+    if head[4:8] in QUICKTIME_ATOMS:
+        return "video/quicktime"
+    return None
+
+
+class StreamingUpload:
+    """
+    A file written to UPLOAD_DIR/<subdir> chunk by chunk as it arrives, with the same
+    type, size and hashing checks as save_upload. The type is sniffed from the first chunk.
+    """
+
+    def __init__(self, subdir: str, allowed_types: list, max_size: int):
+        self.subdir = subdir
+        self.allowed_types = allowed_types
+        self.max_size = max_size
+        self.path: Optional[Path] = None
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._file = None
+
+    async def write(self, chunk: bytes):
+        if self._file is None:
+            await self._open(chunk)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            await self.discard()
+            raise UploadRejected(f"File exceeds maximum upload size of {self.max_size} bytes", status_code=413)
+        self._digest.update(chunk)
+        await self._file.write(chunk)
+
+    async def flush(self):
+        """
+        Make everything written so far readable from the file
+        """
+        if self._file is not None:
+            await self._file.flush()
+
+    async def close(self) -> StoredUpload:
+        if self._file is None:
+            raise UploadRejected("The upload is empty")
+        await self._file.close()
+        return StoredUpload(
+            path=str(self.path),
+            size=self.size,
+            sha256=self._digest.hexdigest(),
+            mime_type=self.mime_type,
+        )
+
+    async def discard(self):
+        """
+        Remove a partially written file
+        """
+        if self._file is not None:
+            await self._file.close()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    async def _open(self, head: bytes):
+        mime_type = sniff_mime_type(head)
+        if mime_type not in self.allowed_types:
+            raise UploadRejected(
+                f"Unsupported file type ({mime_type or 'unknown'}); allowed: {', '.join(self.allowed_types)}",
+                status_code=415,
+            )
+        self.mime_type = mime_type
+        unique_filename = f"{uuid.uuid4()}{MIME_EXTENSIONS[mime_type]}"
+        self.path = settings.UPLOAD_DIR / self.subdir / unique_filename
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = await aiofiles.open(self.path, 'wb')
+
+
+async def save_upload(upload_file, subdir: str, allowed_types: list, max_size: int) -> StoredUpload:
+    """
+    Stream an UploadFile to UPLOAD_DIR/<subdir> in fixed-size chunks.
+
+    The size limit, SHA-256 and MIME sniffing are all handled in the same pass, so memory
+    use per upload is bounded by UPLOAD_CHUNK_SIZE regardless of file size. Partially
+    written files are removed when the upload is rejected.
+    """
+    # Starlette already knows the spooled size; reject without copying anything
+    if upload_file.size is not None and upload_file.size > max_size:
+        raise UploadRejected(f"File exceeds maximum upload size of {max_size} bytes", status_code=413)
+
+    upload = StreamingUpload(subdir, allowed_types, max_size)
+    try:
+        while chunk := await upload_file.read(settings.UPLOAD_CHUNK_SIZE):
+            await upload.write(chunk)
+        return await upload.close()
+    except BaseException:
+        await upload.discard()
+        raise
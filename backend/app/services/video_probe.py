@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+from fractions import Fraction
+from typing import Optional
+
+from app.core.config import settings
+from app.core.lazy import LazyModule
+
+cv2 = LazyModule("cv2")
+
+
+@dataclass
+class VideoMetadata:
+    duration: Optional[float]  # seconds
+    video_codec: Optional[str]
+    width: int
+    height: int
+    frame_rate: Optional[float]
+    frame_count: Optional[int]
+    has_audio: Optional[bool]  # None when the probe can't tell
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# OpenCV reports FOURCCs; map them to the codec names ffprobe uses
+FOURCC_CODECS = {
+    "avc1": "h264", "h264": "h264", "x264": "h264",
+    "hev1": "hevc", "hvc1": "hevc",
+    "vp80": "vp8", "vp90": "vp9", "av01": "av1",
+    "mp4v": "mpeg4", "fmp4": "mpeg4", "xvid": "mpeg4", "divx": "mpeg4",
+}
+
+
+class ProbeFailed(Exception):
+    """
+    Raised when a file's container can't be parsed as a video
+    """
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    try:
+        value = float(Fraction(rate))
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return value or None
+
+
+async def _ffprobe(*args: str) -> dict:
+    process = await asyncio.create_subprocess_exec(
+        settings.FFPROBE_CMD, "-v", "error", "-of", "json", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), settings.VIDEO_PROBE_TIMEOUT)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise ProbeFailed("Timed out reading the video container")
+    if process.returncode != 0:
+        raise ProbeFailed(stderr.decode(errors="replace").strip()[-300:] or "ffprobe failed")
+    return json.loads(stdout or b"{}")
+
+
+async def probe_with_ffprobe(video_path: str) -> VideoMetadata:
+    """
+    Read duration, codec, resolution, frame rate and audio presence from the container
+    headers; no frames are decoded
+    """
+    info = await _ffprobe(
+        "-show_entries", "format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate,r_frame_rate,nb_frames",
+        video_path,
+    )
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise ProbeFailed("The file has no video track")
+
+    frame_rate = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+    duration = info.get("format", {}).get("duration")
+    frame_count = int(video["nb_frames"]) if str(video.get("nb_frames", "")).isdigit() else None
+
+    if duration is None:
+        # Browser MediaRecorder WebM has no duration in its header; count packets instead,
+        # which only demuxes the file
+        counted = await _ffprobe(
+            "-select_streams", "v:0", "-count_packets", "-show_entries", "stream=nb_read_packets", video_path,
+        )
+        packets = counted.get("streams", [{}])[0].get("nb_read_packets")
+        if packets and str(packets).isdigit():
+            frame_count = int(packets)
+            if frame_rate:
+                duration = frame_count / frame_rate
+
+    return VideoMetadata(
+        duration=float(duration) if duration is not None else None,
+        video_codec=video.get("codec_name"),
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        frame_rate=round(frame_rate, 3) if frame_rate else None,
+        frame_count=frame_count,
+        has_audio=any(s.get("codec_type") == "audio" for s in streams),
+    )
+
+
+def probe_with_opencv(video_path: str) -> VideoMetadata:
+    """
+    Fallback probe through OpenCV when ffprobe isn't installed; it can't see audio tracks
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            raise ProbeFailed("The video container could not be read")
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ").lower()
+        codec = FOURCC_CODECS.get(fourcc, fourcc or None)
+        frame_rate = cap.get(cv2.CAP_PROP_FPS) or None
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frame_count = frame_count if frame_count > 0 else None
+        return VideoMetadata(
+            duration=frame_count / frame_rate if frame_count and frame_rate else None,
+            video_codec=codec,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            frame_rate=round(frame_rate, 3) if frame_rate else None,
+            frame_count=frame_count,
+            has_audio=None,
+        )
+    finally:
+        cap.release()
+
+
+async def probe_video(video_path: str) -> VideoMetadata:
+    """
+    Container metadata for a video, raising ProbeFailed for files that aren't valid videos
+    """
+    try:
+        return await probe_with_ffprobe(video_path)
+    except FileNotFoundError:
+        return await asyncio.to_thread(probe_with_opencv, video_path)
+
+
+def check_video_metadata(metadata: VideoMetadata, require_duration: bool = False) -> Optional[str]:
+    """
+    Why a probed video can't be accepted, or None if it can; a duration the probe couldn't
+    determine is only a reason with `require_duration`
+    """
+    if metadata.width <= 0 or metadata.height <= 0:
+        return "The video has no readable frames"
+    if metadata.video_codec is not None and metadata.video_codec not in settings.VIDEO_CODECS:
+        return f"Unsupported video codec ({metadata.video_codec}); allowed: {', '.join(settings.VIDEO_CODECS)}"
+    if metadata.duration is None and require_duration:
+        return "The video's duration could not be determined"
+    if metadata.duration is not None and metadata.duration > settings.MAX_VIDEO_DURATION:
+        return (
+            f"The video is {metadata.duration:.0f} seconds long; "
+            f"answers can be at most {settings.MAX_VIDEO_DURATION} seconds"
+        )
+    return None
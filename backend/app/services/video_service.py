@@ -1,91 +1,382 @@
-import cv2
-import numpy as np
-import face_recognition
+from __future__ import annotations
+
+import asyncio
+import itertools
+import math
+import time
 import os
 from pathlib import Path
-import aiofiles
 from app.core.config import settings
-import uuid
+from app.core.lazy import LazyModule
+from app.core.metrics import metrics
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.workers import ProcessPool
+from app.models.models import JobStatus, VideoInteraction
+from app.services.face_index import encode_embedding, face_index
+from app.services.upload_service import StoredUpload, StreamingUpload, UploadRejected, VIDEO_MIME_TYPES, save_upload
+from app.services.video_probe import ProbeFailed, VideoMetadata, check_video_metadata, probe_video
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+async def process_video(video_file) -> StoredUpload:
+    """
+    Stream the uploaded video file to disk, validating its format and size
+    """
+    return await save_upload(
+        video_file,
+        subdir="videos",
+        allowed_types=[VIDEO_MIME_TYPES[fmt] for fmt in settings.VIDEO_FORMATS],
+        max_size=settings.MAX_VIDEO_UPLOAD_SIZE,
+    )
+
+async def screen_video(upload: StoredUpload, require_duration: bool = False) -> VideoMetadata:
+    """
+    Probe the container headers and reject corrupt, over-long or unsupported videos
+    before any frames are decoded
+    """
+    try:
+        metadata = await probe_video(upload.path)
+        reason = check_video_metadata(metadata, require_duration)
+    except ProbeFailed as e:
+        metadata, reason = None, f"The video could not be read: {str(e)}"
+    
+    if reason is not None:
+        metrics.increment("video_probe.rejected")
+        Path(upload.path).unlink(missing_ok=True)
+        raise UploadRejected(reason, status_code=422)
+    
+    metrics.increment("video_probe.accepted")
+    return metadata
 
-async def process_video(video_file) -> str:
+async def record_video_interaction(
+    db: AsyncSession,
+    user_id: int,
+    question_id: int,
+    video_path: str,
+    face_result: dict,
+    metadata: Optional[VideoMetadata] = None,
+) -> tuple:
     """
-    Process and save the uploaded video file
+    Check the detected face against the user's earlier interactions and save the interaction.
+    
+    Returns the saved VideoInteraction and the face match details.
     """
-    # Generate unique filename
-    file_extension = os.path.splitext(video_file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = settings.UPLOAD_DIR / "videos" / unique_filename
+    encoding = face_result.pop("encoding", None)
+    face_match = await face_index.match(user_id, encoding, db) if encoding is not None else {"matched": False}
+    
+    # Videos known to have no audio have nothing to transcribe
+    no_audio = metadata is not None and metadata.has_audio is False
+    
+    video_interaction = VideoInteraction(
+        user_id=user_id,
+        video_path=video_path,
+        question_id=question_id,
+        face_verified=face_match["matched"],
+        face_encoding=encode_embedding(encoding) if encoding is not None else None,
+        face_distance=face_match.get("distance"),
+        transcription_status=JobStatus.COMPLETED if no_audio else JobStatus.QUEUED,
+        **(metadata.to_dict() if metadata is not None else {})
+    )
     
-    # Create videos directory if it doesn't exist
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+    db.add(video_interaction)
+    await db.commit()
+    await db.refresh(video_interaction)
     
-    # Save video file
-    async with aiofiles.open(file_path, 'wb') as out_file:
-        content = await video_file.read()
-        await out_file.write(content)
+    if face_match["matched"]:
+        face_index.add(user_id, encoding)
     
-    return str(file_path)
+    return video_interaction, face_match
 
-async def verify_face(video_path: str) -> bool:
+def init_face_worker():
     """
-    Verify face in the video using face_recognition library
+    Initialize a face worker process: load the dlib detector and encoder models and run
+    them once, so no request pays for model loading
+    """
+    cv2.setNumThreads(1)
+    # Importing face_recognition loads its dlib models
+    import face_recognition
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(blank)
+    face_recognition.face_encodings(blank, [(8, 56, 56, 8)])
+
+face_pool = ProcessPool(
+    name="face",
+    max_workers=settings.FACE_WORKERS,
+    initializer=init_face_worker,
+    max_tasks_per_child=settings.FACE_MAX_TASKS_PER_WORKER,
+    task_timeout=settings.FACE_TASK_TIMEOUT,
+    max_in_flight=settings.FACE_WORKERS,
+)
+
+async def verify_face(video_path: str, frame_count: Optional[int] = None) -> dict:
+    """
+    Verify face in the video using face_recognition library, in a face worker process.
+    
+    Returns whether a face was found, its encoding under "encoding", and the sampling
+    stats for the video. `frame_count` from the ingest probe lets the search seek in
+    videos whose headers OpenCV can't count frames from.
     """
     try:
-        # Open video file
-        cap = cv2.VideoCapture(video_path)
+        result = await face_pool.run(run_face_verification, video_path, frame_count)
+    except asyncio.TimeoutError:
+        print(f"Error in face verification: timed out after {settings.FACE_TASK_TIMEOUT}s")
+        result = {"face_found": False, "error": "timeout"}
+    except Exception as e:
+        print(f"Error in face verification: {str(e)}")
+        result = {"face_found": False, "error": str(e)}
+    
+    metrics.increment("face.found" if result["face_found"] else "face.not_found")
+    if "seconds" in result:
+        metrics.observe("face.latency", result["seconds"])
+    return result
+
+class LiveRecording:
+    """
+    A video answer received as MediaRecorder chunks while the user is still recording.
+    
+    Chunks are appended to the upload file as they arrive, and the frames they add are
+    searched for a face in the background, so the face is usually found before the
+    recording ends. A growing recording can't be seeked, so every scan decodes its way
+    past the frames earlier scans covered; live scans therefore stop after the first
+    FACE_STREAM_MAX_FRAMES frames, and finish() searches the rest of the file.
+    """
+    
+    def __init__(self):
+        self.upload = StreamingUpload(
+            subdir="videos",
+            allowed_types=[VIDEO_MIME_TYPES[fmt] for fmt in settings.VIDEO_FORMATS],
+            max_size=settings.MAX_VIDEO_UPLOAD_SIZE,
+        )
+        self.face_result: Optional[dict] = None
+        self._started: Optional[float] = None
+        self._next_frame = 0
+        self._scan: Optional[asyncio.Task] = None
+        self._last_scan = time.monotonic()
+    
+    @property
+    def face_confident(self) -> bool:
+        return bool(self.face_result) and self.face_result["detection_score"] >= settings.FACE_MIN_DETECTION_SCORE
+    
+    async def add_chunk(self, chunk: bytes) -> Optional[dict]:
+        """
+        Append a chunk and start a scan of the new frames if one is due.
         
-        # Read first frame
-        ret, frame = cap.read()
-        if not ret:
-            return False
+        Returns the result of a scan that finished since the last chunk, if any. Raises
+        UploadRejected once the recording has run longer than answers may be.
+        """
+        # Chunks arrive as they're recorded, so wall-clock time bounds the duration while
+        # receiving; the size limit is enforced by the upload
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        elif now - self._started > settings.MAX_VIDEO_DURATION + settings.VIDEO_STREAM_ALLOWANCE:
+            raise UploadRejected(
+                f"The recording is longer than {settings.MAX_VIDEO_DURATION} seconds", status_code=422
+            )
+        await self.upload.write(chunk)
         
-        # Convert frame to RGB (face_recognition uses RGB)
-        rgb_frame = frame[:, :, ::-1]
+        finished = None
+        if self._scan is not None and self._scan.done():
+            finished = self._collect_scan()
         
-        # Find face locations
-        face_locations = face_recognition.face_locations(rgb_frame)
+        due = time.monotonic() - self._last_scan >= settings.FACE_STREAM_SCAN_INTERVAL
+        scannable = self._next_frame < settings.FACE_STREAM_MAX_FRAMES
+        if self._scan is None and due and scannable and not self.face_confident:
+            await self.upload.flush()
+            self._last_scan = time.monotonic()
+            self._scan = asyncio.create_task(face_pool.run(
+                scan_recording, str(self.upload.path), self._next_frame, settings.FACE_STREAM_MAX_FRAMES
+            ))
+        return finished
+    
+    async def finish(self) -> tuple:
+        """
+        Complete the file, probe it, and complete the face search; the whole video is
+        searched only if the live scans found no confident face
+        """
+        upload = await self.upload.close()
+        if self._scan is not None:
+            # A failed live scan (timeout, dead worker) must not fail the recording;
+            # _collect_scan logs it and the full search below covers the video
+            await asyncio.wait([self._scan])
+            self._collect_scan()
+        # The limits were only approximated while receiving: a client can send recorded
+        # media faster than real time. Without a known duration there is no bound.
+        metadata = await screen_video(upload, require_duration=True)
         
-        # If no face found, return False
-        if not face_locations:
-            return False
+        if not self.face_confident:
+            result = await verify_face(upload.path, metadata.frame_count)
+            if self.face_result is None or result.get("detection_score", 0.0) > self.face_result["detection_score"]:
+                self.face_result = result
+        else:
+            metrics.increment("face.found")
+            metrics.increment("face.live_verdict")
+        return upload, self.face_result, metadata
+    
+    async def discard(self):
+        if self._scan is not None:
+            self._scan.cancel()
+        await self.upload.discard()
+    
+    def _collect_scan(self) -> Optional[dict]:
+        scan, self._scan = self._scan, None
+        try:
+            result = scan.result()
+        except Exception as e:
+            print(f"Error in live face verification: {str(e)}")
+            return None
+        self._next_frame = result["frames_decoded"]
+        if result["face_found"] and (
+            self.face_result is None or result["detection_score"] > self.face_result["detection_score"]
+        ):
+            self.face_result = result
+        return result
+
+def sample_frame_positions(frame_count: int, samples: int) -> list:
+    """
+    Indexes of `samples` evenly spaced frames, centred in their slots so the first frame
+    (often black while the webcam starts) is skipped
+    """
+    samples = max(1, min(samples, frame_count))
+    return sorted({int((i + 0.5) * frame_count / samples) for i in range(samples)})
+
+def detect_face(rgb_frame: np.ndarray) -> tuple:
+    """
+    Find the most confident face on a downscaled copy of the frame.
+    
+    Returns the face box at full resolution as (top, right, bottom, left) and the
+    detector's score, or (None, 0.0) if there is no face.
+    """
+    from face_recognition.api import face_detector
+    
+    scale = min(1.0, settings.FACE_DETECTION_WIDTH / rgb_frame.shape[1])
+    small = cv2.resize(rgb_frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else rgb_frame
+    
+    # Upsample once, as face_recognition.face_locations does, so small faces are still found
+    detections, scores, _ = face_detector.run(small, 1, 0.0)
+    if not len(detections):
+        return None, 0.0
+    
+    best = int(np.argmax(scores))
+    box = detections[best]
+    height, width = rgb_frame.shape[:2]
+    location = (
+        max(0, int(box.top() / scale)),
+        min(width, int(box.right() / scale)),
+        min(height, int(box.bottom() / scale)),
+        max(0, int(box.left() / scale)),
+    )
+    return location, float(scores[best])
+
+def run_face_verification(video_path: str, frame_count: Optional[int] = None) -> dict:
+    """
+    Detect and encode the face in the video (runs in a face worker).
+    
+    Seeks to FACE_SAMPLE_FRAMES evenly spaced frames instead of decoding the whole video,
+    and stops at the first frame with a confident face; otherwise the best face seen is used.
+    """
+    started = time.perf_counter()
+    result = {"face_found": False, "detection_score": 0.0, "frame_index": None,
+              "frames_decoded": 0, "frames_searched": 0}
+    
+    try:
+        # Open video file
+        cap = cv2.VideoCapture(video_path)
         
-        # Get face encoding
-        face_encoding = face_recognition.face_encodings(rgb_frame, face_locations)[0]
+        frame_count = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0) or frame_count or 0
+        if frame_count > 0:
+            positions = sample_frame_positions(frame_count, settings.FACE_SAMPLE_FRAMES)
+            stride = 0
+        else:
+            # Browser WebM recordings often report no frame count, so they can't be seeked
+            # by index; step through them half a second at a time instead
+            positions = [None] * settings.FACE_SAMPLE_FRAMES
+            stride = max(1, round((cap.get(cv2.CAP_PROP_FPS) or 30) / 2))
         
-        # TODO: Compare with stored face encoding from previous interactions
-        # For now, return True if a face is detected
-        return True
+        search_frames(cap, positions, stride, result)
         
     except Exception as e:
+        # Errors from dlib don't always pickle back to the parent; report them here
         print(f"Error in face verification: {str(e)}")
-        return False
+        result["error"] = str(e)
     finally:
         if 'cap' in locals():
             cap.release()
+    
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
 
-def extract_audio(video_path: str) -> str:
+def scan_recording(video_path: str, start_frame: int, end_frame: int) -> dict:
     """
-    Extract audio from video file
+    Search the frames a still-growing recording has gained since `start_frame`, up to
+    `end_frame` (runs in a face worker). "frames_decoded" in the result is where the next
+    scan should start.
     """
+    started = time.perf_counter()
+    result = {"face_found": False, "detection_score": 0.0, "frame_index": None,
+              "frames_decoded": start_frame, "frames_searched": 0}
+    
     try:
-        # Open video file
         cap = cv2.VideoCapture(video_path)
+        # Containers being recorded can't be seeked; skip what earlier scans covered
+        for _ in range(start_frame):
+            if not cap.grab():
+                break
+        stride = max(1, round((cap.get(cv2.CAP_PROP_FPS) or 30) / 2))
+        # Until the end of what has been written so far, or end_frame
+        samples = max(0, math.ceil((end_frame - start_frame) / stride))
+        search_frames(cap, itertools.repeat(None, samples), stride, result, first_index=start_frame)
         
-        # Get audio properties
-        audio_path = str(Path(video_path).with_suffix('.wav'))
-        
-        # TODO: Implement audio extraction
-        # This would typically use ffmpeg or similar
-        
-        return audio_path
+    except Exception as e:
+        print(f"Error in face verification: {str(e)}")
+        result["error"] = str(e)
     finally:
         if 'cap' in locals():
             cap.release()
+    
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
 
-async def transcribe_audio(audio_path: str) -> str:
+def search_frames(cap, positions, stride: int, result: dict, first_index: int = 0):
     """
-    Transcribe audio to text
+    Run face detection on the frames at `positions` (or, for None positions, every
+    `stride`-th frame), stopping at the first confident face, and record the best face
+    in `result`
     """
-    # TODO: Implement audio transcription
-    # This would typically use a speech-to-text service
-    return "Transcribed text placeholder" 
\ No newline at end of file
+    import face_recognition
+    
+    best = None
+    index = first_index
+    for position in positions:
+        if position is not None:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            index = position
+        else:
+            for _ in range(stride - 1):
+                if not cap.grab():
+                    break
+                result["frames_decoded"] += 1
+                index += 1
+        ret, frame = cap.read()
+        if not ret:
+            break
+        result["frames_decoded"] += 1
+        index += 1
+        
+        # Convert frame to RGB (face_recognition uses RGB)
+        rgb_frame = np.ascontiguousarray(frame[:, :, ::-1])
+        location, score = detect_face(rgb_frame)
+        result["frames_searched"] += 1
+        
+        if location is not None and (best is None or score > best[1]):
+            best = (location, score, rgb_frame, index - 1)
+            if score >= settings.FACE_MIN_DETECTION_SCORE:
+                break
+    
+    if best is not None:
+        location, score, rgb_frame, frame_index = best
+        # Encode at full resolution for an accurate embedding
+        result["encoding"] = face_recognition.face_encodings(rgb_frame, [location])[0]
+        result.update(face_found=True, detection_score=round(score, 3), frame_index=frame_index)
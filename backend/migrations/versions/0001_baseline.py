@@ -0,0 +1,82 @@
+"""Baseline schema, as the app created it before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases created by the app itself already have these tables; app.core.schema stamps
+them at this revision instead of running it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+LOAN_STATUS = ("PENDING", "APPROVED", "REJECTED", "MORE_INFO_NEEDED")
+DOCUMENT_TYPE = ("AADHAAR", "PAN", "INCOME_PROOF", "BANK_STATEMENT", "OTHER")
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("email", sa.String),
+        sa.Column("hashed_password", sa.String),
+        sa.Column("full_name", sa.String),
+        sa.Column("phone_number", sa.String),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "loan_applications",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("loan_amount", sa.Float),
+        sa.Column("loan_type", sa.String),
+        sa.Column("status", sa.Enum(*LOAN_STATUS, name="loanstatus")),
+        sa.Column("monthly_income", sa.Float),
+        sa.Column("employment_type", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_loan_applications_id", "loan_applications", ["id"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("loan_application_id", sa.Integer, sa.ForeignKey("loan_applications.id")),
+        sa.Column("document_type", sa.Enum(*DOCUMENT_TYPE, name="documenttype")),
+        sa.Column("file_path", sa.String),
+        sa.Column("extracted_data", sa.String),
+        sa.Column("is_verified", sa.Boolean),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+    op.create_table(
+        "video_interactions",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("video_path", sa.String),
+        sa.Column("question_id", sa.Integer),
+        sa.Column("response_text", sa.String),
+        sa.Column("face_verified", sa.Boolean),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_video_interactions_id", "video_interactions", ["id"])
+
+
+def downgrade():
+    for table in ("video_interactions", "documents", "loan_applications", "users"):
+        op.drop_table(table)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS documenttype")
+        op.execute("DROP TYPE IF EXISTS loanstatus")
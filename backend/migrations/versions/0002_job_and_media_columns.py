@@ -0,0 +1,84 @@
+"""Add the document job, video metadata, face index and eligibility columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Databases the app created partway through these changes already have some of the
+columns; only the missing ones are added. Existing documents were extracted during their
+upload, so they're marked completed; videos with a transcript likewise.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+job_status = sa.Enum("QUEUED", "PROCESSING", "COMPLETED", "FAILED", name="jobstatus")
+
+
+def new_columns():
+    return {
+        "documents": [
+            sa.Column("status", job_status),
+            sa.Column("progress", sa.Integer),
+            sa.Column("error", sa.String),
+            sa.Column("content_hash", sa.String),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        ],
+        "video_interactions": [
+            sa.Column("transcription_status", job_status),
+            sa.Column("duration", sa.Float),
+            sa.Column("video_codec", sa.String),
+            sa.Column("width", sa.Integer),
+            sa.Column("height", sa.Integer),
+            sa.Column("frame_rate", sa.Float),
+            sa.Column("frame_count", sa.Integer),
+            sa.Column("has_audio", sa.Boolean),
+            sa.Column("face_encoding", sa.LargeBinary),
+            sa.Column("face_distance", sa.Float),
+        ],
+        "loan_applications": [
+            sa.Column("ruleset_version", sa.String),
+            sa.Column("eligibility_state", sa.String),
+        ],
+    }
+
+
+def existing_columns(table):
+    if op.get_context().as_sql:
+        # Offline SQL generation can't inspect; emit every column
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # add_column doesn't create enum types
+        job_status.create(bind, checkfirst=not op.get_context().as_sql)
+    for table, columns in new_columns().items():
+        existing = existing_columns(table)
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+    # The job queue's index until 0004 replaced it
+    op.create_index("ix_documents_status", "documents", ["status"], if_not_exists=True)
+
+    op.execute("UPDATE documents SET status = 'COMPLETED', progress = 100 WHERE status IS NULL")
+    op.execute(
+        "UPDATE video_interactions SET transcription_status = 'COMPLETED' "
+        "WHERE transcription_status IS NULL AND response_text IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_documents_status", table_name="documents", if_exists=True)
+    for table, columns in new_columns().items():
+        with op.batch_alter_table(table) as batch:
+            for column in columns:
+                batch.drop_column(column.name)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS jobstatus")
@@ -0,0 +1,54 @@
+"""Store extracted document data as JSON and index PAN and Aadhaar numbers
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+On Postgres the text column is converted to JSONB in place; SQLite keeps JSON as text,
+so only the indexes are added.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.database import json_text
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_documents_pan_number": "pan_number",
+    "ix_documents_aadhaar_number": "aadhaar_number",
+}
+
+
+def is_jsonb(bind):
+    if op.get_context().as_sql:
+        # Offline SQL generation can't inspect; emit the conversion
+        return False
+    columns = sa.inspect(bind).get_columns("documents")
+    return any(isinstance(column["type"], JSONB) for column in columns if column["name"] == "extracted_data")
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created after the model change already have the JSONB column
+    if bind.dialect.name == "postgresql" and not is_jsonb(bind):
+        op.execute(
+            "ALTER TABLE documents ALTER COLUMN extracted_data TYPE JSONB "
+            "USING NULLIF(extracted_data, '')::jsonb"
+        )
+    for name, key in INDEXES.items():
+        op.create_index(name, "documents", [json_text(sa.column("extracted_data"), key)], if_not_exists=True)
+    # Duplicate checks start from one application's documents
+    op.create_index("ix_documents_loan_application_id", "documents", ["loan_application_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_documents_loan_application_id", table_name="documents", if_exists=True)
+    for name in INDEXES:
+        op.drop_index(name, table_name="documents", if_exists=True)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TABLE documents ALTER COLUMN extracted_data TYPE VARCHAR USING extracted_data::text")
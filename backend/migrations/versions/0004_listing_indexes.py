@@ -0,0 +1,43 @@
+"""Composite indexes for keyset-paginated listings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Each listing filters on one column and pages by id, so (column, id) indexes serve the
+filter and the order together. They replace the single-column documents indexes.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_loan_applications_status_id": ("loan_applications", ["status", "id"]),
+    "ix_loan_applications_user_id_id": ("loan_applications", ["user_id", "id"]),
+    "ix_documents_loan_application_id_id": ("documents", ["loan_application_id", "id"]),
+    "ix_documents_user_id_id": ("documents", ["user_id", "id"]),
+    "ix_documents_status_id": ("documents", ["status", "id"]),
+    "ix_video_interactions_user_id_id": ("video_interactions", ["user_id", "id"]),
+}
+
+REPLACED = {
+    "ix_documents_loan_application_id": ("documents", ["loan_application_id"]),
+    "ix_documents_status": ("documents", ["status"]),
+}
+
+
+def upgrade():
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, (table, _) in REPLACED.items():
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade():
+    for name, (table, columns) in REPLACED.items():
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,29 @@
+"""Lease and attempt columns for document jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Jobs left PROCESSING without a lease are taken over by the next worker that looks for
+work, as they were re-queued at startup before. Existing jobs start with no attempts
+counted.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("documents", sa.Column("claimed_by", sa.String))
+    op.add_column("documents", sa.Column("claimed_at", sa.DateTime(timezone=True)))
+    op.add_column("documents", sa.Column("attempts", sa.Integer))
+
+
+def downgrade():
+    op.drop_column("documents", "attempts")
+    op.drop_column("documents", "claimed_at")
+    op.drop_column("documents", "claimed_by")
@@ -0,0 +1,40 @@
+"""Store application eligibility state as JSON
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+On Postgres the text column is converted to JSONB in place; SQLite keeps JSON as text,
+so there is nothing to do there.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def is_jsonb(bind):
+    if op.get_context().as_sql:
+        # Offline SQL generation can't inspect; emit the conversion
+        return False
+    columns = sa.inspect(bind).get_columns("loan_applications")
+    return any(isinstance(column["type"], JSONB) for column in columns if column["name"] == "eligibility_state")
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases created after the model change already have the JSONB column
+    if bind.dialect.name == "postgresql" and not is_jsonb(bind):
+        op.execute(
+            "ALTER TABLE loan_applications ALTER COLUMN eligibility_state TYPE JSONB "
+            "USING NULLIF(eligibility_state, '')::jsonb"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TABLE loan_applications ALTER COLUMN eligibility_state TYPE VARCHAR USING eligibility_state::text")
@@ -0,0 +1,147 @@
+"""
+Concurrent throughput benchmark for the sync and async database paths.
+
+Reads a loan application's eligibility decision (the application row with its stored
+eligibility state, as GET /loan-applications/{id} does on a cache miss) the two ways a
+request handler can: through the sync session, as the routes did before, which blocks the
+event loop for every round trip; and through the async session the routes now use, which
+yields it. Both run on one event loop, i.e. one server worker, with the same
+number of concurrent clients.
+
+Pass a PostgreSQL URL to measure real round trips. Without one a temporary SQLite file is
+used and --rtt-ms of network latency is added to every statement inside the driver call,
+which is where a remote database's round trip is spent.
+
+    python benchmarks/bench_db_concurrency.py [--database-url postgresql://...] [--clients 50] [--seconds 5] [--rtt-ms 2]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+APPLICATIONS = 200
+
+
+def seed(SessionLocal, User, LoanApplication, Document, DocumentType, JobStatus, initialize_eligibility):
+    extracted = {
+        DocumentType.AADHAAR: {"name": "Asha Rao", "dob": "01/02/1990", "aadhaar_number": "123456789012"},
+        DocumentType.PAN: {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"},
+        DocumentType.INCOME_PROOF: {"monthly_income": 60000, "employment_type": "salaried"},
+    }
+    with SessionLocal() as db:
+        user = User(email=f"bench-{time.time()}@example.com", full_name="Asha Rao")
+        db.add(user)
+        db.flush()
+        ids = []
+        for _ in range(APPLICATIONS):
+            application = LoanApplication(
+                user_id=user.id, loan_amount=500000, loan_type="personal",
+                monthly_income=60000, employment_type="salaried",
+            )
+            db.add(application)
+            db.flush()
+            ids.append(application.id)
+            documents = [
+                Document(
+                    user_id=user.id, loan_application_id=application.id, document_type=document_type,
+                    extracted_data=data, status=JobStatus.COMPLETED,
+                )
+                for document_type, data in extracted.items()
+            ]
+            db.add_all(documents)
+            db.flush()
+            initialize_eligibility(application, documents)
+        db.commit()
+    return ids
+
+
+async def run_clients(handler, ids, clients, seconds):
+    """
+    Requests completed per second by `clients` concurrent callers of `handler`
+    """
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def client(offset):
+        nonlocal done
+        i = offset
+        while time.perf_counter() < deadline:
+            result = await handler(ids[i % len(ids)])
+            assert result["status"] == "approved", result
+            done += 1
+            i += clients
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(clients)))
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; defaults to a temporary SQLite file")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="simulated round trip per statement (SQLite only)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+
+    from sqlalchemy import event
+
+    from app.core.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+    from app.models.models import Document, DocumentType, JobStatus, LoanApplication, User
+    from app.services.eligibility_state import current_eligibility, initialize_eligibility
+
+    Base.metadata.create_all(bind=engine)
+    ids = seed(SessionLocal, User, LoanApplication, Document, DocumentType, JobStatus, initialize_eligibility)
+    # Later connections get the latency hook
+    engine.dispose()
+
+    if database_url.startswith("sqlite") and args.rtt_ms > 0:
+        rtt = args.rtt_ms / 1000
+
+        # The trace callback runs in whichever thread executes the statement: the event
+        # loop's for the sync driver, aiosqlite's connection thread for the async one
+        def round_trip(statement):
+            time.sleep(rtt)
+
+        @event.listens_for(engine, "connect")
+        def add_sync_latency(dbapi_connection, connection_record):
+            dbapi_connection.set_trace_callback(round_trip)
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def add_async_latency(dbapi_connection, connection_record):
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(round_trip))
+
+    async def sync_handler(loan_application_id):
+        # The routes before the async session: sync queries inside an async def handler
+        with SessionLocal() as db:
+            return current_eligibility(db.get(LoanApplication, loan_application_id))
+
+    async def async_handler(loan_application_id):
+        async with AsyncSessionLocal() as db:
+            return current_eligibility(await db.get(LoanApplication, loan_application_id))
+
+    async def run():
+        # Open the pools' connections before timing
+        await asyncio.gather(*(handler(ids[0]) for handler in (sync_handler, async_handler) for _ in range(args.clients)))
+        sync_rate = await run_clients(sync_handler, ids, args.clients, args.seconds)
+        async_rate = await run_clients(async_handler, ids, args.clients, args.seconds)
+        await async_engine.dispose()
+        return sync_rate, async_rate
+
+    sync_rate, async_rate = asyncio.run(run())
+    target = "postgres" if not database_url.startswith("sqlite") else f"sqlite, {args.rtt_ms:g} ms simulated round trip"
+    print(f"{args.clients} concurrent clients, one event loop ({target})")
+    print(f"  sync session:  {sync_rate:8.1f} reads/s")
+    print(f"  async session: {async_rate:8.1f} reads/s  ({async_rate / sync_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
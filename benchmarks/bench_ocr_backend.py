@@ -0,0 +1,94 @@
+"""
+Latency benchmark for the OCR backends on ID card images.
+
+Compares the pytesseract subprocess backend (temp file, process spawn and model load on
+every call) with the in-process tesserocr engine on the two call patterns the OCR
+workers use: one full-card pass, and the per-field region crops of a rectified card.
+Uses the card images given with --images, or renders synthetic PAN cards.
+
+    python benchmarks/bench_ocr_backend.py [--images "test_data/documents/*.jpg"] [--repeat 5]
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import cv2
+import numpy as np
+
+from app.services.card_layout import CARD_HEIGHT, CARD_WIDTH, extract_card_fields, rectify_card
+from app.services.document_service import OCR_BACKENDS, preprocess_fast
+
+
+def synthetic_card(seed):
+    """
+    A PAN-like card photographed on a dark desk
+    """
+    rng = np.random.default_rng(seed)
+    card = np.full((CARD_HEIGHT, CARD_WIDTH), 230, dtype=np.uint8)
+    lines = [
+        (0.34, f"ABCPE{rng.integers(1000, 9999)}F"),
+        (0.52, "ASHA RAO"),
+        (0.68, "MOHAN RAO"),
+        (0.85, f"{rng.integers(1, 28):02d}/{rng.integers(1, 12):02d}/19{rng.integers(60, 99)}"),
+    ]
+    for top, text in lines:
+        cv2.putText(card, text, (80, int(top * CARD_HEIGHT)), cv2.FONT_HERSHEY_DUPLEX, 2.2, 20, 4)
+    photo = np.full((2000, 3000), 40, dtype=np.uint8)
+    photo[400:400 + CARD_HEIGHT, 600:600 + CARD_WIDTH] = card
+    return photo
+
+
+def load_cards(pattern):
+    if pattern:
+        return [cv2.imread(path, cv2.IMREAD_GRAYSCALE) for path in sorted(glob.glob(pattern))]
+    return [synthetic_card(seed) for seed in range(5)]
+
+
+def time_calls(fn, images, repeat):
+    samples = []
+    for _ in range(repeat):
+        for image in images:
+            start = time.perf_counter()
+            fn(image)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(pattern, repeat):
+    photos = [photo for photo in load_cards(pattern) if photo is not None]
+    cards = [card for card in map(rectify_card, photos) if card is not None]
+    print(f"{len(photos)} images, {len(cards)} rectified cards, {repeat} repeats")
+
+    for name, backend_class in OCR_BACKENDS.items():
+        try:
+            start = time.perf_counter()
+            backend = backend_class()
+            setup = time.perf_counter() - start
+            # Fails fast if the tesseract binary or language data is missing
+            backend.recognize(np.full((32, 32), 255, dtype=np.uint8))
+        except Exception as e:
+            print(f"{name:>10}: unavailable ({e})")
+            continue
+
+        full_page = time_calls(lambda photo: backend.recognize(preprocess_fast(photo), "--psm 6"), photos, repeat)
+        regions = time_calls(lambda card: extract_card_fields(card, "pan", backend.recognize), cards, repeat)
+        print(
+            f"{name:>10}: setup {setup * 1000:7.1f} ms"
+            f" | full card p50 {statistics.median(full_page) * 1000:7.1f} ms"
+            f" | field regions p50 {statistics.median(regions) * 1000 if regions else float('nan'):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--images", help="glob of card images; synthetic cards are rendered if omitted")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.images, args.repeat)
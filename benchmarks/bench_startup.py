@@ -0,0 +1,76 @@
+"""
+Cold start benchmark for the API process.
+
+Each run starts a fresh interpreter, imports app.main and serves GET /health through the
+app's lifespan, like a new server process behind a load balancer. The schema is created
+once beforehand with app.core.schema, as a deploy step would. --eager imports the vision,
+OCR and numeric libraries first, which is what importing the app used to cost.
+
+    python benchmarks/bench_startup.py [--runs 5] [--eager]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+HEAVY_MODULES = ["numpy", "cv2", "pytesseract", "pypdfium2", "PIL.Image"]
+
+RUN = """
+import importlib, json, sys, time
+started = time.perf_counter()
+for name in {eager}:
+    importlib.import_module(name)
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    assert client.get("/health").status_code == 200
+    served = time.perf_counter()
+heavy = [name for name in {heavy} if name in sys.modules]
+print(json.dumps({{"import": imported - started, "first_response": served - started, "heavy": heavy}}))
+"""
+
+
+def run_once(env, eager):
+    code = RUN.format(eager=HEAVY_MODULES if eager else [], heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="import the heavy libraries up front")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{workdir}/startup.db",
+        "UPLOAD_DIR": f"{workdir}/uploads",
+        # Keep the background worker warm-up small; it doesn't delay startup either way
+        "OCR_WORKERS": "1",
+        "FACE_WORKERS": "1",
+    }
+    subprocess.run([sys.executable, "-m", "app.core.schema"], cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+
+    results = [run_once(env, args.eager) for _ in range(args.runs)]
+    imports = [result["import"] for result in results]
+    responses = [result["first_response"] for result in results]
+    print(f"{args.runs} cold starts{' (eager heavy imports)' if args.eager else ''}")
+    print(f"  import app.main:  median {statistics.median(imports):.3f}s, max {max(imports):.3f}s")
+    print(f"  first response:   median {statistics.median(responses):.3f}s, max {max(responses):.3f}s")
+    print(f"  heavy libraries loaded in the API process: {', '.join(results[-1]['heavy']) or 'none'}")
+    print(f"  upload dir created at startup: {os.path.exists(env['UPLOAD_DIR'])}")
+
+
+if __name__ == "__main__":
+    main()
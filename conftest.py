@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp())
+# app.core.database builds its engine at import; no Postgres driver is needed for the tests
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes import router
+from app.core.database import Base, get_db
+
+
+class TestDatabase:
+    """
+    A throwaway SQLite database with the models' tables, standing in for Postgres.
+
+    `Session` opens async sessions as the API uses them and `SyncSession` sync ones as the
+    job queue and re-scoring use them. Statements and commits on the async engine are
+    recorded so tests can count round trips.
+    """
+
+    def __init__(self, path: Path):
+        self.sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=self.sync_engine)
+        self.SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=self.sync_engine)
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.Session = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+
+        self.statements = []
+        self.commits = []
+        event.listen(
+            self.engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+        event.listen(self.engine.sync_engine, "commit", lambda conn: self.commits.append(conn))
+
+    def dispose(self):
+        self.engine.sync_engine.dispose()
+        self.sync_engine.dispose()
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = TestDatabase(tmp_path / "test.db")
+    yield database
+    database.dispose()
+
+
+@pytest.fixture
+def client(db):
+    """
+    The API routes, served from the test database
+    """
+    app = FastAPI()
+    app.include_router(router)
+
+    async def test_db():
+        async with db.Session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = test_db
+    return TestClient(app)
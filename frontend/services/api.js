@@ -48,6 +48,15 @@ const videoService = {
       throw error;
     }
   },
+  
+  // Send MediaRecorder chunks while recording (socket.send(event.data) in ondataavailable),
+  // then socket.send('end'); the server replies with "face" progress and a final "result" message
+  openVideoStream: (questionId, userId) => {
+    const wsBase = api.defaults.baseURL.replace(/^http/, 'ws');
+    const socket = new WebSocket(`${wsBase}/video-interaction/stream?question_id=${questionId}&user_id=${userId}`);
+    socket.binaryType = 'arraybuffer';
+    return socket;
+  },
 };
 
 // Document service
@@ -73,6 +82,16 @@ const documentService = {
       throw error;
     }
   },
+  
+  // Extraction runs in the background; poll until status is "completed" or "failed"
+  getDocument: async (documentId) => {
+    try {
+      const response = await api.get(`/documents/${documentId}`);
+      return response.data;
+    } catch (error) {
+      throw error;
+    }
+  },
 };
 
 // Loan application service
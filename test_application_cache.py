@@ -0,0 +1,59 @@
+from app.models.models import Document, DocumentType, JobStatus, LoanStatus
+from app.services.application_cache import application_cache
+from app.services.document_jobs import DocumentJobQueue
+
+
+def create_application(client) -> int:
+    response = client.post("/loan-applications", data={
+        "loan_amount": 100000, "loan_type": "personal", "monthly_income": 50000,
+        "employment_type": "salaried", "user_id": 1,
+    })
+    assert response.status_code == 200
+    return response.json()["loan_application_id"]
+
+
+def test_unchanged_polls_get_304_without_a_query(db, client):
+    application_cache.clear()
+    application_id = create_application(client)
+
+    first = client.get(f"/loan-applications/{application_id}")
+    assert first.status_code == 200
+    assert first.json()["status"] == LoanStatus.MORE_INFO_NEEDED
+    etag, modified = first.headers["etag"], first.headers["last-modified"]
+
+    db.statements.clear()
+    polled = client.get(f"/loan-applications/{application_id}", headers={"If-None-Match": etag})
+    assert polled.status_code == 304 and polled.content == b""
+    assert polled.headers["etag"] == etag
+    # Last-Modified is informational: it can't see same-second writes or ruleset changes
+    assert client.get(f"/loan-applications/{application_id}", headers={"If-Modified-Since": modified}).status_code == 200
+    # A full read is served from the cache too
+    assert client.get(f"/loan-applications/{application_id}").json() == first.json()
+    assert db.statements == []
+
+    assert client.get(f"/loan-applications/{application_id}", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/loan-applications/999999").status_code == 404
+
+
+def test_finished_document_job_invalidates_the_cached_application(db, client):
+    application_cache.clear()
+    application_id = create_application(client)
+    etag = client.get(f"/loan-applications/{application_id}").headers["etag"]
+
+    with db.SyncSession() as session:
+        document = Document(
+            user_id=1, loan_application_id=application_id, document_type=DocumentType.PAN, status=JobStatus.PROCESSING
+        )
+        session.add(document)
+        session.commit()
+        document_id = document.id
+    DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession)._finish(
+        document_id, status=JobStatus.COMPLETED, progress=100,
+        extracted_data={"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"}
+    )
+
+    response = client.get(f"/loan-applications/{application_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [document["id"] for document in response.json()["eligibility"]["documents"]] == [document_id]
+
@@ -0,0 +1,180 @@
+import asyncio
+import sys
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.models import JobStatus, VideoInteraction
+from app.services import audio_service
+from app.services.audio_service import (
+    SAMPLE_RATE,
+    EnergyVad,
+    StubSpeechToText,
+    resume_transcriptions,
+    transcribe_interaction,
+    transcribe_segments,
+)
+
+rng = np.random.default_rng(5)
+
+
+def silence(seconds):
+    # Room noise around -60 dBFS
+    return (rng.normal(scale=30, size=int(seconds * SAMPLE_RATE))).astype(np.int16)
+
+
+def speech(seconds):
+    # A 220 Hz "voice" around -15 dBFS
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def make_track():
+    # Webcam start-up silence, two answers separated by a pause, a click, trailing silence
+    return np.concatenate([
+        silence(1.0), speech(1.5), silence(0.8), speech(0.6), silence(0.5), speech(0.05), silence(1.0),
+    ])
+
+
+async def blocks_of(track, block_samples):
+    for start in range(0, len(track), block_samples):
+        yield track[start:start + block_samples]
+
+
+def test_vad_trims_silence_and_drops_clicks():
+    vad = EnergyVad(threshold_db=-40, min_silence_ms=400, min_speech_ms=250, max_segment_seconds=20)
+    track = make_track()
+    # Odd block size, so frames straddle block boundaries
+    segments = []
+    for start in range(0, len(track), 7001):
+        segments.extend(vad.feed(track[start:start + 7001]))
+    segments.extend(vad.flush())
+
+    durations = [len(segment) / SAMPLE_RATE for segment in segments]
+    assert len(durations) == 2
+    assert abs(durations[0] - 1.5) < 0.06
+    assert abs(durations[1] - 0.6) < 0.06
+    # Only speech reaches the recognizer
+    assert sum(durations) < 0.5 * len(track) / SAMPLE_RATE
+
+
+def test_vad_splits_long_speech():
+    vad = EnergyVad(threshold_db=-40, min_silence_ms=400, min_speech_ms=250, max_segment_seconds=2)
+    segments = vad.feed(speech(5.0)) + vad.flush()
+    assert [round(len(segment) / SAMPLE_RATE) for segment in segments] == [2, 2, 1]
+
+
+def test_stub_transcription_is_deterministic():
+    async def transcribe():
+        return [text async for text in transcribe_segments(blocks_of(make_track(), SAMPLE_RATE), StubSpeechToText())]
+
+    first, second = asyncio.run(transcribe()), asyncio.run(transcribe())
+    assert first == second
+    assert len(first) == 2
+    assert first[0].startswith("[speech 1.5")
+
+
+def fake_ffmpeg(directory, track, returncode=0):
+    """
+    An ffmpeg stand-in that pipes `track` out as 16 kHz PCM whatever it is asked to read
+    """
+    pcm = directory / "track.pcm"
+    pcm.write_bytes(track.astype("<i2").tobytes())
+    script = directory / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"sys.stdout.buffer.write(open({str(pcm)!r}, 'rb').read())\n"
+        "sys.stdout.flush()\n"
+        f"if {returncode}:\n"
+        "    sys.stderr.write('Invalid data found when processing input')\n"
+        f"sys.exit({returncode})\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+def use_test_pipeline(db, monkeypatch, ffmpeg_cmd):
+    """
+    Transcribe into the test database with the stub backend, recording every save
+    """
+    saves = []
+    save = audio_service._save_transcript
+
+    def recording_save(video_interaction_id, text, status):
+        saves.append((text, status))
+        save(video_interaction_id, text, status)
+
+    monkeypatch.setattr(settings, "FFMPEG_CMD", ffmpeg_cmd)
+    monkeypatch.setattr(audio_service, "SessionLocal", db.SyncSession)
+    monkeypatch.setattr(audio_service, "_stt_backend", StubSpeechToText())
+    monkeypatch.setattr(audio_service, "_transcription_slots", None)
+    monkeypatch.setattr(audio_service, "_save_transcript", recording_save)
+    return saves
+
+
+def add_interaction(db, status=JobStatus.QUEUED, response_text=None):
+    with db.SyncSession() as session:
+        interaction = VideoInteraction(
+            user_id=1, question_id=1, video_path="answer.webm", transcription_status=status, response_text=response_text
+        )
+        session.add(interaction)
+        session.commit()
+        return interaction.id
+
+
+def get_interaction(db, video_interaction_id):
+    with db.SyncSession() as session:
+        return session.get(VideoInteraction, video_interaction_id)
+
+
+def test_transcript_is_saved_segment_by_segment(db, tmp_path, monkeypatch):
+    saves = use_test_pipeline(db, monkeypatch, fake_ffmpeg(tmp_path, make_track()))
+    interaction_id = add_interaction(db)
+
+    asyncio.run(transcribe_interaction(interaction_id, "answer.webm"))
+
+    first = saves[1][0]
+    transcript = saves[-1][0]
+    assert first.startswith("[speech 1.5") and transcript[len(first):].startswith(" [speech 0.6")
+    # Marked as running first, then the transcript grows with every segment
+    assert saves == [
+        (None, JobStatus.PROCESSING),
+        (first, JobStatus.PROCESSING),
+        (transcript, JobStatus.PROCESSING),
+        (transcript, JobStatus.COMPLETED),
+    ]
+    interaction = get_interaction(db, interaction_id)
+    assert interaction.transcription_status == JobStatus.COMPLETED
+    assert interaction.response_text == transcript
+
+
+def test_failed_decoding_keeps_the_partial_transcript(db, tmp_path, monkeypatch):
+    use_test_pipeline(db, monkeypatch, fake_ffmpeg(tmp_path, make_track(), returncode=1))
+    interaction_id = add_interaction(db)
+
+    asyncio.run(transcribe_interaction(interaction_id, "answer.webm"))
+
+    interaction = get_interaction(db, interaction_id)
+    assert interaction.transcription_status == JobStatus.FAILED
+    assert interaction.response_text.startswith("[speech 1.5")
+
+
+def test_interrupted_transcriptions_resume_at_startup(db, tmp_path, monkeypatch):
+    use_test_pipeline(db, monkeypatch, fake_ffmpeg(tmp_path, make_track()))
+    queued = add_interaction(db)
+    # Cut off mid-transcription by a restart
+    interrupted = add_interaction(db, JobStatus.PROCESSING, response_text="[speech 1.50s]")
+    done = add_interaction(db, JobStatus.COMPLETED, response_text="My name is Asha")
+
+    async def run():
+        resumed = await resume_transcriptions()
+        await asyncio.gather(*audio_service._background_transcriptions)
+        return resumed
+
+    assert asyncio.run(run()) == 2
+    for interaction_id in (queued, interrupted):
+        interaction = get_interaction(db, interaction_id)
+        assert interaction.transcription_status == JobStatus.COMPLETED
+        assert interaction.response_text.count("[speech") == 2
+    assert get_interaction(db, done).response_text == "My name is Asha"
@@ -0,0 +1,114 @@
+
+import cv2
+import numpy as np
+
+from app.services import document_service
+from app.services.card_layout import CARD_HEIGHT, CARD_WIDTH, LAYOUT_TEMPLATES, extract_card_fields, rectify_card
+from app.services.field_extraction import is_valid_aadhaar
+
+NUMBER_REGION = next(region for region in LAYOUT_TEMPLATES["aadhaar"] if region.name == "aadhaar_number")
+
+
+def region_pixels(box):
+    left, top, right, bottom = box
+    return slice(int(top * CARD_HEIGHT), int(bottom * CARD_HEIGHT)), slice(int(left * CARD_WIDTH), int(right * CARD_WIDTH))
+
+
+def photographed_card(corners, canvas=(760, 1000)):
+    """
+    A white card with a grey block over the number region, warped onto a dark background
+    """
+    card = np.full((CARD_HEIGHT, CARD_WIDTH), 255, dtype=np.uint8)
+    card[region_pixels(NUMBER_REGION.box)] = 100
+    source = np.array([[0, 0], [CARD_WIDTH, 0], [CARD_WIDTH, CARD_HEIGHT], [0, CARD_HEIGHT]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(source, np.array(corners, dtype=np.float32))
+    return cv2.warpPerspective(card, matrix, (canvas[1], canvas[0]), borderValue=0)
+
+
+def valid_aadhaar_number():
+    prefix = "23456789012"
+    return next(prefix + digit for digit in "0123456789" if is_valid_aadhaar(prefix + digit))
+
+
+def test_rectify_card_undoes_the_perspective():
+    gray = photographed_card([(150, 120), (900, 170), (880, 640), (130, 600)])
+    card = rectify_card(gray)
+
+    assert card.shape == (CARD_HEIGHT, CARD_WIDTH)
+    # The block lands back on the number region; a few pixels of edge blur are allowed
+    rows, columns = region_pixels(NUMBER_REGION.box)
+    inner = card[rows.start + 10:rows.stop - 10, columns.start + 10:columns.stop - 10]
+    assert abs(float(inner.mean()) - 100) < 10
+    assert float(card[100:200, 100:300].mean()) > 240
+
+
+def test_rectify_card_rejects_pages_that_are_not_card_shaped():
+    # An A4 page photographed upright
+    gray = photographed_card([(300, 60), (700, 60), (700, 630), (300, 630)])
+    assert rectify_card(gray) is None
+
+
+def test_card_fields_are_read_per_region():
+    number = valid_aadhaar_number()
+    by_region = {
+        "name": "Asha Rao",
+        "dob": "DOB: 01/02/1990",
+        "gender": "Female",
+        "aadhaar_number": f"{number[:4]} {number[4:8]} {number[8:]}",
+    }
+    # The regions' whitelists tell them apart
+    texts = {}
+    for region in LAYOUT_TEMPLATES["aadhaar"]:
+        texts[f"--psm {region.psm} -c tessedit_char_whitelist={region.whitelist}"] = by_region[region.name]
+    crops = []
+
+    def recognize(image, config):
+        crops.append(image.shape)
+        return texts[config]
+
+    card = np.full((CARD_HEIGHT, CARD_WIDTH), 255, dtype=np.uint8)
+    data = extract_card_fields(card, "aadhaar", recognize)
+
+    assert data["name"] == "Asha Rao"
+    assert data["dob"] == "01/02/1990"
+    assert data["aadhaar_number"] == number
+    assert data["gender"]
+    assert set(data["confidence"]) == {"name", "dob", "gender", "aadhaar_number"}
+    # Only the four field regions are OCR'd, never the whole card
+    assert len(crops) == 4 and all(shape[0] < CARD_HEIGHT / 5 for shape in crops)
+
+
+def test_card_photos_resolve_without_full_page_ocr(tmp_path, monkeypatch):
+    image_path = tmp_path / "aadhaar.png"
+    cv2.imwrite(str(image_path), photographed_card([(150, 120), (900, 170), (880, 640), (130, 600)]))
+    number = valid_aadhaar_number()
+    by_whitelist = {region.whitelist: region.name for region in LAYOUT_TEMPLATES["aadhaar"]}
+    texts = {"name": "Asha Rao", "dob": "01/02/1990", "gender": "Female", "aadhaar_number": number}
+    configs = []
+
+    def recognize(image, config=""):
+        configs.append(config)
+        return texts[by_whitelist[config.partition("whitelist=")[2]]]
+
+    monkeypatch.setattr(document_service, "recognize_text", recognize)
+    extracted, resolved = document_service.run_document_extraction(str(image_path), "aadhaar")
+
+    assert resolved == "layout"
+    assert extracted["aadhaar_number"] == number
+    assert len(configs) == 4
+
+
+def test_card_numbers_failing_the_check_digit_are_less_confident():
+    number = valid_aadhaar_number()
+    # A single misread digit fails the Verhoeff check
+    misread = number[:-1] + str((int(number[-1]) + 1) % 10)
+    card = np.full((CARD_HEIGHT, CARD_WIDTH), 255, dtype=np.uint8)
+
+    def read(text):
+        recognize = lambda image, config: text if config.endswith("whitelist=0123456789") else ""
+        return extract_card_fields(card, "aadhaar", recognize)
+
+    valid, invalid = read(number), read(misread)
+    assert invalid["aadhaar_number"] == misread
+    assert invalid["confidence"]["aadhaar_number"] < valid["confidence"]["aadhaar_number"]
+    assert "name" not in invalid["confidence"]
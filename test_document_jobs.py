@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+from app.models.models import Document, DocumentType, JobStatus, LoanApplication, LoanStatus
+from app.services import document_jobs as jobs_module
+from app.services.document_jobs import DocumentJobQueue
+from app.services.eligibility_state import initialize_eligibility
+
+
+def add_document(db, status, file_path="pan.png"):
+    with db.SyncSession() as session:
+        doc = Document(user_id=1, document_type=DocumentType.PAN, file_path=file_path, status=status, progress=0)
+        session.add(doc)
+        session.commit()
+        return doc.id
+
+
+def get_document(db, document_id):
+    with db.SyncSession() as session:
+        return session.get(Document, document_id)
+
+
+async def run_queue_until_idle(db, queue, document_ids):
+    await queue.start()
+    try:
+        for _ in range(200):
+            statuses = [get_document(db, i).status for i in document_ids]
+            if all(status in (JobStatus.COMPLETED, JobStatus.FAILED) for status in statuses):
+                return
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"Jobs did not finish: {statuses}")
+    finally:
+        await queue.stop()
+
+
+def test_jobs_resume_after_restart_and_run_once(db, monkeypatch):
+    calls = []
+
+    async def fake_extract(file_path, document_type, content_hash=None):
+        calls.append(file_path)
+        await asyncio.sleep(0.01)
+        if file_path == "blank.png":
+            return {}
+        return {"name": "ASHA RAO", "pan_number": "ABCPE1234F"}
+
+    monkeypatch.setattr(jobs_module, "extract_document_data", fake_extract)
+    queued = add_document(db, JobStatus.QUEUED)
+    # Left mid-extraction by a process that was stopped
+    interrupted = add_document(db, JobStatus.PROCESSING, file_path="interrupted.png")
+    blank = add_document(db, JobStatus.QUEUED, file_path="blank.png")
+    done = add_document(db, JobStatus.COMPLETED, file_path="done.png")
+
+    queue = DocumentJobQueue(workers=2, poll_interval=0.05, session_factory=db.SyncSession)
+    asyncio.run(run_queue_until_idle(db, queue, [queued, interrupted, blank]))
+
+    assert sorted(calls) == ["blank.png", "interrupted.png", "pan.png"]
+
+    completed = get_document(db, queued)
+    assert completed.status == JobStatus.COMPLETED
+    assert completed.progress == 100
+    assert completed.extracted_data["pan_number"] == "ABCPE1234F"
+    assert get_document(db, interrupted).status == JobStatus.COMPLETED
+
+    failed = get_document(db, blank)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error
+    assert get_document(db, done).status == JobStatus.COMPLETED
+
+
+def test_claim_is_exclusive(db):
+    queue = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession)
+    document_id = add_document(db, JobStatus.QUEUED)
+
+    claimed = queue._claim(document_id)
+    assert claimed[0] == document_id
+    assert get_document(db, document_id).status == JobStatus.PROCESSING
+    # A second wakeup for the same job, or another worker, gets nothing
+    assert queue._claim(document_id) is None
+
+
+def test_finished_job_updates_application_eligibility(db, monkeypatch):
+    async def fake_extract(file_path, document_type, content_hash=None):
+        return {"name": "ASHA RAO", "dob": "01/02/1990", "pan_number": "ABCPE1234F"}
+
+    with db.SyncSession() as session:
+        application = LoanApplication(
+            user_id=1, loan_amount=500000, loan_type="personal", monthly_income=60000, employment_type="Salaried"
+        )
+        session.add(application)
+        session.flush()
+        session.add_all([
+            Document(user_id=1, loan_application_id=application.id, document_type=DocumentType.AADHAAR,
+                     status=JobStatus.COMPLETED,
+                     extracted_data={"name": "ASHA RAO", "dob": "01/02/1990", "aadhaar_number": "123456789012"}),
+            Document(user_id=1, loan_application_id=application.id, document_type=DocumentType.INCOME_PROOF,
+                     status=JobStatus.COMPLETED,
+                     extracted_data={"monthly_income": 60000, "employment_type": "Salaried"}),
+            Document(user_id=1, loan_application_id=application.id, document_type=DocumentType.PAN,
+                     file_path="pan.png", status=JobStatus.QUEUED),
+        ])
+        session.flush()
+        initialize_eligibility(application, application.documents)
+        session.commit()
+        application_id = application.id
+        pan = application.documents[-1].id
+        assert application.status == LoanStatus.MORE_INFO_NEEDED
+
+    monkeypatch.setattr(jobs_module, "extract_document_data", fake_extract)
+    queue = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession)
+    asyncio.run(queue.run_job(*queue._claim(pan)))
+
+    with db.SyncSession() as session:
+        application = session.get(LoanApplication, application_id)
+        assert application.status == LoanStatus.APPROVED
+        assert application.eligibility_state["documents"][str(pan)]["problem"] is None
+
+
+def test_running_jobs_are_taken_over_only_after_their_lease_expires(db, monkeypatch):
+    results = []
+
+    async def slow_extract(file_path, document_type, content_hash=None):
+        await asyncio.sleep(1.0)
+        results.append(file_path)
+        return {"name": "ASHA RAO", "pan_number": "ABCPE1234F"}
+
+    async def run():
+        first = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession, lease_seconds=0.4)
+        running = asyncio.create_task(first.run_job(*first._claim(document_id)))
+        # Past the first lease: only the heartbeat keeps the job from being taken over
+        await asyncio.sleep(0.6)
+        # Another process starting up leaves a job with a live lease alone
+        other = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession, lease_seconds=0.4)
+        assert other._claim(document_id) is None
+        await running
+
+    monkeypatch.setattr(jobs_module, "extract_document_data", slow_extract)
+    document_id = add_document(db, JobStatus.QUEUED, file_path="leased.png")
+    asyncio.run(run())
+    assert results == ["leased.png"]
+    assert get_document(db, document_id).status == JobStatus.COMPLETED
+
+    stalled = add_document(db, JobStatus.QUEUED, file_path="stalled.png")
+    stale = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession, lease_seconds=0.05)
+    job = stale._claim(stalled)
+    # No heartbeat: the lease runs out and another worker takes the job
+    time.sleep(0.2)
+    taken = stale._claim(stalled)
+    assert taken[0] == stalled and taken[-1] != job[-1]
+    # The first worker's late result is dropped
+    asyncio.run(stale.run_job(*job[:-1], claim=job[-1]))
+    assert get_document(db, stalled).status == JobStatus.PROCESSING
+    asyncio.run(stale.run_job(*taken))
+    assert get_document(db, stalled).status == JobStatus.COMPLETED
+
+
+def test_jobs_that_never_finish_fail_after_max_attempts(db, monkeypatch):
+    async def fake_extract(file_path, document_type, content_hash=None):
+        return {"name": "ASHA RAO", "pan_number": "ABCPE1234F"}
+
+    monkeypatch.setattr(jobs_module, "extract_document_data", fake_extract)
+    queue = DocumentJobQueue(workers=1, poll_interval=1, session_factory=db.SyncSession, lease_seconds=0.05, max_attempts=2)
+    document_id = add_document(db, JobStatus.QUEUED, file_path="crashes.png")
+
+    # Each worker dies mid-job, so its lease runs out
+    first = queue._claim(None)
+    time.sleep(0.1)
+    assert queue._claim(None)[0] == document_id
+    time.sleep(0.1)
+    assert queue._claim(None) is None
+
+    failed = get_document(db, document_id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.attempts == 3 and "2 attempts" in failed.error
+    # A worker that was only slow can't bring the job back
+    asyncio.run(queue.run_job(*first))
+    assert get_document(db, document_id).status == JobStatus.FAILED
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from app.models.models import Document, JobStatus, LoanApplication, LoanStatus
+from app.services.eligibility_rules import DEFAULT_RULES_PATH, RuleEngine, compile_ruleset, load_ruleset, parse_ruleset
+from app.services.loan_service import EvaluationContext
+
+RULES = {
+    "version": "test-1",
+    "min_monthly_income": 25000,
+    "max_loan_multiplier": 24,
+    "employment_types": {"salaried": 1.0, "self-employed": 0.5},
+    "required_documents": {
+        "default": ["aadhaar", "pan", "income_proof"],
+        "home": ["aadhaar", "pan", "income_proof", "bank_statement"],
+    },
+}
+
+EXTRACTED = {
+    "aadhaar": {"name": "Asha Rao", "dob": "01/02/1990", "aadhaar_number": "123456789012"},
+    "pan": {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"},
+    "income_proof": {"monthly_income": 60000, "employment_type": "Salaried"},
+    "bank_statement": {"monthly_income": 60000},
+}
+
+
+def context(loan_type="personal", employment_type="Salaried", loan_amount=500000, monthly_income=60000, documents=None):
+    application = LoanApplication(
+        loan_amount=loan_amount, loan_type=loan_type, monthly_income=monthly_income, employment_type=employment_type
+    )
+    if documents is None:
+        documents = ["aadhaar", "pan", "income_proof"]
+    return EvaluationContext(application=application, documents=[
+        Document(document_type=document_type, extracted_data=EXTRACTED[document_type], status=JobStatus.COMPLETED)
+        for document_type in documents
+    ])
+
+
+class UntouchableDocuments:
+    def __init__(self, application):
+        self.application = application
+
+    @property
+    def documents(self):
+        raise AssertionError("documents were read after a cheaper rule failed")
+
+
+def test_bundled_ruleset_loads():
+    ruleset = load_ruleset(DEFAULT_RULES_PATH)
+    assert ruleset.required_for("car") == ("aadhaar", "pan", "income_proof")
+    decide = compile_ruleset(ruleset).decide
+    assert decide(context())["status"] == LoanStatus.APPROVED
+    # Any employment type is accepted
+    assert decide(context(employment_type="Freelance"))["status"] == LoanStatus.APPROVED
+
+
+def test_failing_thresholds_rejects_before_documents_are_asked_for():
+    decide = compile_ruleset(load_ruleset(DEFAULT_RULES_PATH)).decide
+
+    assert decide(context(documents=["aadhaar"]))["status"] == LoanStatus.MORE_INFO_NEEDED
+    # A low income with documents missing is rejected, not asked for more information
+    decision = decide(context(monthly_income=10000, documents=["aadhaar"]))
+    assert decision["status"] == LoanStatus.REJECTED
+    assert "below minimum requirement" in decision["reason"]
+
+
+def test_cheapest_rules_run_first_and_short_circuit():
+    decide = compile_ruleset(parse_ruleset(RULES)).decide
+
+    poor = UntouchableDocuments(context(monthly_income=10000).application)
+    decision = decide(poor)
+    assert decision["status"] == LoanStatus.REJECTED
+    assert "below minimum" in decision["reason"]
+    assert decision["ruleset_version"] == "test-1"
+
+    # Failing thresholds outrank missing documents
+    assert decide(context(loan_amount=10 ** 8, documents=[]))["status"] == LoanStatus.REJECTED
+
+
+def test_required_documents_depend_on_loan_type():
+    decide = compile_ruleset(parse_ruleset(RULES)).decide
+
+    assert decide(context(loan_type="personal"))["status"] == LoanStatus.APPROVED
+    home = decide(context(loan_type="home"))
+    assert home["status"] == LoanStatus.MORE_INFO_NEEDED
+    assert home["reason"] == "bank_statement"
+    documents = ["aadhaar", "pan", "income_proof", "bank_statement"]
+    assert decide(context(loan_type="Home", documents=documents))["status"] == LoanStatus.APPROVED
+
+
+def test_employment_multipliers():
+    decide = compile_ruleset(parse_ruleset(RULES)).decide
+
+    # 60000 * 24 = 1,440,000 for salaried applicants, half that when self-employed
+    assert decide(context(loan_amount=1000000))["status"] == LoanStatus.APPROVED
+    assert decide(context(loan_amount=1000000, employment_type="Self Employed"))["status"] == LoanStatus.REJECTED
+    approved = decide(context(loan_amount=700000, employment_type="self_employed"))
+    assert approved["details"]["max_eligible_amount"] == 720000
+
+    unsupported = decide(context(employment_type="Freelance"))
+    assert unsupported["status"] == LoanStatus.REJECTED
+    assert "Unsupported employment type" in unsupported["reason"]
+
+
+def test_invalid_rulesets_are_rejected():
+    for broken in (
+        {**RULES, "required_documents": {"home": ["aadhaar"]}},
+        {**RULES, "required_documents": {"default": ["passport"]}},
+        {**RULES, "max_loan_multiplier": 0},
+        {key: value for key, value in RULES.items() if key != "version"},
+    ):
+        try:
+            parse_ruleset(broken)
+            assert False, f"accepted {broken}"
+        except ValueError:
+            pass
+
+
+def test_rules_file_is_hot_swapped():
+    path = Path(tempfile.mkdtemp()) / "rules.json"
+    mtime = [1_000_000_000]
+
+    def write(rules):
+        path.write_text(json.dumps(rules))
+        mtime[0] += 1_000_000_000
+        os.utime(path, ns=(mtime[0], mtime[0]))
+
+    write(RULES)
+    engine = RuleEngine(path, check_interval=0)
+    first = engine.active
+    assert first.ruleset.version == "test-1"
+
+    write({**RULES, "version": "test-2", "min_monthly_income": 80000})
+    second = engine.active
+    assert second.ruleset.version == "test-2"
+    assert second.decide(context())["status"] == LoanStatus.REJECTED
+    # A decision that picked up the old rules finishes with them
+    earlier = first.decide(context())
+    assert earlier["status"] == LoanStatus.APPROVED and earlier["ruleset_version"] == "test-1"
+
+    # Broken files and unversioned edits leave the active rules in place
+    path.write_text("{not json")
+    os.utime(path, ns=(mtime[0] + 1, mtime[0] + 1))
+    assert engine.active is second
+    write({**RULES, "version": "test-2"})
+    assert engine.active is second
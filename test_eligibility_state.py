@@ -0,0 +1,88 @@
+from app.models.models import Document, JobStatus, LoanApplication, LoanStatus
+from app.services import eligibility_state as state_module
+from app.services.eligibility_rules import compile_ruleset, parse_ruleset
+from app.services.eligibility_state import current_eligibility, initialize_eligibility, update_eligibility
+from app.services.loan_service import EvaluationContext, parse_extracted_data
+
+RULES = {
+    "version": "test-1",
+    "min_monthly_income": 25000,
+    "max_loan_multiplier": 24,
+    "employment_types": {"salaried": 1.0},
+    "required_documents": {"default": ["aadhaar", "pan", "income_proof"]},
+}
+
+EXTRACTED = {
+    "aadhaar": {"name": "Asha Rao", "dob": "01/02/1990", "aadhaar_number": "123456789012"},
+    "pan": {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"},
+    "income_proof": {"monthly_income": 60000, "employment_type": "Salaried"},
+}
+
+
+def application(**fields):
+    values = {"loan_amount": 500000, "loan_type": "personal", "monthly_income": 60000, "employment_type": "Salaried"}
+    return LoanApplication(**{**values, **fields})
+
+
+def document(document_id, document_type, status=JobStatus.COMPLETED, data=None):
+    if data is None and status == JobStatus.COMPLETED:
+        data = EXTRACTED[document_type]
+    return Document(id=document_id, document_type=document_type, status=status, extracted_data=data)
+
+
+def test_incremental_updates_match_full_evaluation(monkeypatch):
+    rules = compile_ruleset(parse_ruleset(RULES))
+    loan = application()
+    documents = {}
+
+    def full_decision():
+        context = EvaluationContext(application=loan, documents=sorted(documents.values(), key=lambda doc: doc.id))
+        return rules.decide(context)
+
+    parsed = []
+
+    def counting_parse(doc):
+        parsed.append(doc.id)
+        return parse_extracted_data(doc)
+
+    monkeypatch.setattr(state_module, "parse_extracted_data", counting_parse)
+    assert initialize_eligibility(loan, rules=rules) == full_decision()
+    assert loan.status == LoanStatus.MORE_INFO_NEEDED
+
+    changes = [
+        document(1, "aadhaar"),
+        document(2, "pan", status=JobStatus.QUEUED),
+        document(3, "income_proof", data={"monthly_income": 60000}),
+        document(2, "pan"),
+        document(3, "income_proof"),
+        document(1, "aadhaar", status=JobStatus.FAILED),
+        document(4, "aadhaar"),
+        document(1, "aadhaar"),
+    ]
+    for change in changes:
+        documents[change.id] = change
+        parsed.clear()
+        decision = update_eligibility(loan, change, rules=rules)
+        assert decision == full_decision(), change.id
+        assert loan.status == decision["status"]
+        # Only the changed document is re-checked
+        assert parsed in ([], [change.id])
+
+    assert loan.status == LoanStatus.APPROVED
+
+
+def test_reads_follow_ruleset_changes_without_documents():
+    rules = compile_ruleset(parse_ruleset(RULES))
+    loan = application()
+    initialize_eligibility(loan, [document(1, "aadhaar"), document(2, "pan"), document(3, "income_proof")], rules=rules)
+    stored = current_eligibility(loan, rules=rules)
+    assert stored["status"] == LoanStatus.APPROVED.value
+    assert [entry["type"] for entry in stored["documents"]] == ["aadhaar", "pan", "income_proof"]
+
+    # The stored state alone is enough to decide under a newer ruleset
+    stricter = compile_ruleset(parse_ruleset({**RULES, "version": "test-2", "min_monthly_income": 80000}))
+    decision = current_eligibility(loan, rules=stricter)
+    assert decision["status"] == LoanStatus.REJECTED
+    assert decision["ruleset_version"] == "test-2"
+    # Reads don't write
+    assert loan.status == LoanStatus.APPROVED
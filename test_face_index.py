@@ -0,0 +1,55 @@
+import asyncio
+
+import numpy as np
+
+from app.models.models import VideoInteraction
+from app.services.face_index import FaceIndex, decode_embeddings, encode_embedding
+
+rng = np.random.default_rng(3)
+
+
+def random_face():
+    face = rng.normal(size=128)
+    # dlib embeddings have unit-ish norm; different people sit around 0.8-1.0 apart
+    return face / np.linalg.norm(face) * 0.6
+
+
+def same_person(face):
+    return face + rng.normal(scale=0.01, size=128)
+
+
+def test_embedding_round_trip():
+    faces = [random_face() for _ in range(3)]
+    blobs = [encode_embedding(face) for face in faces]
+
+    assert all(len(blob) == 512 for blob in blobs)
+    matrix = decode_embeddings(blobs)
+    assert matrix.shape == (3, 128)
+    assert np.allclose(matrix, faces, atol=1e-6)
+    assert decode_embeddings([]).shape == (0, 128)
+
+
+def test_match_against_earlier_interactions(db):
+    async def run():
+        index = FaceIndex(max_users=1, max_references=5, threshold=0.6)
+        alice, bob = random_face(), random_face()
+
+        async with db.Session() as session:
+            first = await index.match(1, alice, session)
+            assert first["matched"] and first["enrolled"]
+
+            session.add(VideoInteraction(user_id=1, face_verified=True, face_encoding=encode_embedding(alice)))
+            await session.commit()
+            index.add(1, alice)
+
+            assert (await index.match(1, same_person(alice), session))["matched"]
+            impostor = await index.match(1, bob, session)
+            assert not impostor["matched"]
+            assert impostor["distance"] > 0.6
+
+            # Evict user 1; its references are reloaded from the database
+            await index.match(2, bob, session)
+            reloaded = await index.match(1, same_person(alice), session)
+            assert reloaded["matched"] and reloaded["references"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import types
+
+import cv2
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.workers import ProcessPool
+from app.services import video_service
+
+
+class RecordingPool:
+    """
+    Stands in for the face pool, returning `outcome` or raising it
+    """
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = []
+
+    async def run(self, fn, *args, timeout=None):
+        self.calls.append((fn, args))
+        if isinstance(self.outcome, BaseException):
+            raise self.outcome
+        return self.outcome
+
+
+def verify_with_pool(monkeypatch, pool, *args):
+    monkeypatch.setattr(video_service, "face_pool", pool)
+    return asyncio.run(video_service.verify_face(*args))
+
+
+def numbered_video(directory, frame_count=60):
+    """
+    A video whose frame i is a flat image of brightness 4 * i, so frames can be told apart
+    """
+    path = directory / "answer.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for index in range(frame_count):
+        writer.write(np.full((48, 64, 3), index * 4, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+def search_numbered_video(tmp_path, monkeypatch, scores):
+    """
+    Run face verification on a numbered video with a detector scoring frame i as scores(i)
+    """
+    searched = []
+
+    def detect_face(rgb_frame):
+        index = round(float(rgb_frame.mean()) / 4)
+        searched.append(index)
+        score = scores(index)
+        return ((8, 56, 40, 8) if score else None), score
+
+    encoder = types.SimpleNamespace(face_encodings=lambda frame, locations: [np.zeros(128)])
+    monkeypatch.setattr(video_service, "detect_face", detect_face)
+    monkeypatch.setitem(sys.modules, "face_recognition", encoder)
+    return video_service.run_face_verification(numbered_video(tmp_path)), searched
+
+
+def test_sample_frame_positions():
+    # Centred in eight slots of 7.5 frames, skipping the first frame
+    assert video_service.sample_frame_positions(60, 8) == [3, 11, 18, 26, 33, 41, 48, 56]
+    # Short videos are searched frame by frame, never past the end
+    assert video_service.sample_frame_positions(3, 8) == [0, 1, 2]
+    assert video_service.sample_frame_positions(1, 8) == [0]
+
+
+def test_search_stops_at_the_first_confident_face(tmp_path, monkeypatch):
+    threshold = settings.FACE_MIN_DETECTION_SCORE
+
+    def scores(index):
+        # Weak faces from frame 10, a confident one from frame 30
+        if index < 10:
+            return 0.0
+        return threshold / 2 if index < 30 else threshold + 0.2
+
+    result, searched = search_numbered_video(tmp_path, monkeypatch, scores)
+
+    assert searched == [3, 11, 18, 26, 33]
+    assert result["face_found"] and result["frame_index"] == 33
+    assert result["frames_searched"] == 5
+    assert result["detection_score"] == round(threshold + 0.2, 3)
+
+
+def test_search_keeps_the_best_face_when_none_is_confident(tmp_path, monkeypatch):
+    threshold = settings.FACE_MIN_DETECTION_SCORE
+    result, searched = search_numbered_video(tmp_path, monkeypatch, lambda index: threshold / 2 if index == 41 else threshold / 4)
+
+    # Every sampled frame is searched and the best of them is encoded
+    assert searched == video_service.sample_frame_positions(60, settings.FACE_SAMPLE_FRAMES)
+    assert result["face_found"] and result["frame_index"] == 41
+    assert "encoding" in result
+
+
+def test_verification_runs_in_the_face_pool(monkeypatch):
+    pool = RecordingPool({"face_found": True, "detection_score": 0.9, "seconds": 0.2})
+    found = metrics.snapshot()["counters"].get("face.found", 0)
+
+    result = verify_with_pool(monkeypatch, pool, "answer.webm", 120)
+
+    assert result["face_found"]
+    # The probed frame count is passed on so WebM recordings can be seeked
+    assert pool.calls == [(video_service.run_face_verification, ("answer.webm", 120))]
+    assert metrics.snapshot()["counters"]["face.found"] == found + 1
+
+
+def test_slow_or_failed_verification_finds_no_face(monkeypatch):
+    assert verify_with_pool(monkeypatch, RecordingPool(asyncio.TimeoutError()), "answer.webm") == {
+        "face_found": False, "error": "timeout"
+    }
+    result = verify_with_pool(monkeypatch, RecordingPool(RuntimeError("worker died")), "answer.webm")
+    assert result == {"face_found": False, "error": "worker died"}
+
+
+def test_worker_errors_leave_the_pool_usable(tmp_path, monkeypatch):
+    not_a_video = tmp_path / "answer.webm"
+    not_a_video.write_bytes(b"not a video")
+    pool = ProcessPool(name="test-face", max_workers=1, task_timeout=30)
+
+    async def run():
+        first = await video_service.verify_face(str(not_a_video))
+        second = await video_service.verify_face(str(not_a_video))
+        return first, second, pool._executor
+
+    monkeypatch.setattr(video_service, "face_pool", pool)
+    try:
+        first, second, executor = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert not first["face_found"] and not second["face_found"]
+    # Errors came back from the worker without breaking the executor
+    assert executor is not None
@@ -0,0 +1,108 @@
+import json
+
+from app.models.models import DocumentType
+from app.services.eligibility_rules import DEFAULT_RULES_PATH
+from app.services.field_extraction import (
+    FIELD_SPECS,
+    REQUIRED_FIELDS,
+    TARGET_FIELDS,
+    empty_fields,
+    extract_fields,
+    is_valid_aadhaar,
+    is_valid_pan,
+    merge_fields,
+    missing_fields,
+    parse_field,
+)
+
+
+def valid_aadhaar_number(prefix="23456789012"):
+    return next(prefix + digit for digit in "0123456789" if is_valid_aadhaar(prefix + digit))
+
+
+def test_labelled_fields():
+    number = valid_aadhaar_number()
+    text = "\n".join([
+        "Government of India",
+        "Name: Asha Rao",
+        "जन्म तिथि / DOB: 01-02-1990",
+        "Gender: Female",
+        f"Aadhaar No. {number[:4]} {number[4:8]} {number[8:]}",
+    ])
+    data = extract_fields(text, "aadhaar")
+
+    assert data["name"] == "Asha Rao"
+    assert data["dob"] == "01/02/1990"
+    assert data["gender"] == "Female"
+    assert data["aadhaar_number"] == number
+    assert data["confidence"]["aadhaar_number"] == 0.9
+    assert missing_fields(data, "aadhaar") == []
+
+
+def test_bare_values_are_a_less_confident_fallback():
+    number = valid_aadhaar_number()
+    data = extract_fields(f"Asha Rao\nFEMALE\n{number[:4]} {number[4:8]} {number[8:]}", DocumentType.AADHAAR)
+    assert data["aadhaar_number"] == number and data["confidence"]["aadhaar_number"] == 0.7
+    assert data["gender"] == "FEMALE" and data["confidence"]["gender"] == 0.6
+    # Nothing labelled, so the name isn't guessed
+    assert data["name"] == "" and "name" in missing_fields(data, "aadhaar")
+
+    data = extract_fields("INCOME TAX DEPARTMENT\nABCPE1234F", "pan")
+    assert data["pan_number"] == "ABCPE1234F" and data["confidence"]["pan_number"] == 0.75
+
+
+def test_failed_checks_halve_the_confidence():
+    number = valid_aadhaar_number()
+    misread = number[:-1] + str((int(number[-1]) + 1) % 10)
+    assert is_valid_aadhaar(number) and not is_valid_aadhaar(misread)
+    assert not is_valid_aadhaar("1" + number[1:])
+    assert parse_field(f"Aadhaar: {misread}", "aadhaar", "aadhaar_number").confidence == 0.45
+
+    # "X" is not a holder type
+    assert is_valid_pan("ABCPE1234F") and not is_valid_pan("ABCXE1234F")
+    data = extract_fields("PAN: ABCXE1234F", "pan")
+    assert data["pan_number"] == "ABCXE1234F" and data["confidence"]["pan_number"] == 0.45
+
+
+def test_bank_statement_fields():
+    text = "Account Statement\nEmployer Name: Acme Textiles\nNet Salary: Rs. 60,000.50\nGross Salary: INR 75,000"
+    data = extract_fields(text, "bank_statement")
+
+    # The net figure's label is the more confident one
+    assert data["monthly_income"] == 60000.5
+    assert data["employer_name"] == "Acme Textiles"
+    assert missing_fields(data, "bank_statement") == []
+    assert missing_fields(empty_fields("bank_statement"), "bank_statement") == ["monthly_income"]
+
+
+def test_merge_keeps_the_more_confident_value():
+    base = {"monthly_income": 50000.0, "employer_name": "Acme", "confidence": {"monthly_income": 0.7, "employer_name": 0.9}}
+    update = {
+        "monthly_income": 60000.0,
+        "employer_name": "Other Co",
+        "employment_type": "Salaried",
+        "document_type": "",
+        "confidence": {"monthly_income": 0.9, "employer_name": 0.9, "employment_type": 0.9},
+    }
+    merged = merge_fields(base, update)
+
+    assert merged["monthly_income"] == 60000.0 and merged["confidence"]["monthly_income"] == 0.9
+    # Ties keep the value found first
+    assert merged["employer_name"] == "Acme"
+    assert merged["employment_type"] == "Salaried"
+    assert merged["document_type"] == ""
+    # An empty value never replaces a found one
+    assert merge_fields(merged, {"employer_name": "", "confidence": {"employer_name": 1.0}})["employer_name"] == "Acme"
+
+
+def test_every_required_field_can_be_extracted():
+    for document_type, fields in {**REQUIRED_FIELDS, **TARGET_FIELDS}.items():
+        extractable = {spec.name for spec in FIELD_SPECS[document_type]}
+        assert set(fields) <= extractable, document_type
+        assert set(fields) <= set(empty_fields(document_type)), document_type
+    # Every document the shipped rules require is checked for its fields
+    required_documents = json.loads(DEFAULT_RULES_PATH.read_text())["required_documents"]
+    for document_types in required_documents.values():
+        assert set(document_types) <= set(REQUIRED_FIELDS)
+    # and every document type OCR reads has fields it looks for
+    assert {t.value for t in DocumentType} - {DocumentType.OTHER.value} == set(FIELD_SPECS) == set(TARGET_FIELDS)
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.models.models import Document, DocumentType, JobStatus, LoanApplication
+from app.services.identity_search import IdentifierType, find_documents, find_duplicate_identities
+
+
+async def create_application(db, user_id, pan_number, aadhaar_number):
+    async with db.Session() as session:
+        application = LoanApplication(
+            user_id=user_id, loan_amount=500000, loan_type="personal", monthly_income=60000, employment_type="salaried"
+        )
+        session.add(application)
+        session.add_all([
+            Document(user_id=user_id, loan_application=application, document_type=DocumentType.PAN,
+                     status=JobStatus.COMPLETED, extracted_data={"name": "Asha Rao", "pan_number": pan_number}),
+            Document(user_id=user_id, loan_application=application, document_type=DocumentType.AADHAAR,
+                     status=JobStatus.COMPLETED, extracted_data={"name": "Asha Rao", "aadhaar_number": aadhaar_number}),
+            Document(user_id=user_id, loan_application=application, document_type=DocumentType.INCOME_PROOF,
+                     status=JobStatus.COMPLETED, extracted_data={"monthly_income": 60000}),
+        ])
+        await session.commit()
+        return application.id
+
+
+async def query_plans(db):
+    async with db.engine.connect() as conn:
+        plans = []
+        for statement in db.statements:
+            if statement.lstrip().upper().startswith("SELECT"):
+                # The plan doesn't depend on the parameter values
+                rows = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", (None,) * statement.count("?"))
+                plans.extend(row[-1] for row in rows)
+        return plans
+
+
+def test_identity_lookups_use_the_expression_indexes(db):
+    async def run():
+        first = await create_application(db, 1, "ABCPE1234F", "234567890123")
+        same_person = await create_application(db, 1, "ABCPE1234F", "345678901234")
+        other_user = await create_application(db, 2, "ZZZPE9999Z", "234567890123")
+        unrelated = await create_application(db, 3, "QWEPE5555Q", "456789012345")
+
+        async with db.Session() as session:
+            db.statements.clear()
+            documents = await find_documents(session, IdentifierType.PAN, " abcpe1234f ")
+            assert [(doc.user_id, doc.loan_application_id) for doc in documents] == [(1, first), (1, same_person)]
+            assert [doc.loan_application_id for doc in await find_documents(session, IdentifierType.AADHAAR, "2345 6789 0123")] == [first, other_user]
+
+            duplicates = await find_duplicate_identities(session, first)
+            assert {(d["identifier_type"], d["loan_application_id"], d["user_id"]) for d in duplicates} == {
+                ("pan", same_person, 1),
+                ("aadhaar", other_user, 2),
+            }
+            assert await find_duplicate_identities(session, unrelated) == []
+
+        # Every identifier comparison is an index search, never a scan of documents
+        plans = await query_plans(db)
+        assert any("ix_documents_pan_number" in plan for plan in plans)
+        assert any("ix_documents_aadhaar_number" in plan for plan in plans)
+        assert not any(plan.startswith("SCAN") for plan in plans), plans
+
+    asyncio.run(run())
+
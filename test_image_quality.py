@@ -0,0 +1,72 @@
+import asyncio
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.services.document_service import screen_document
+from app.services.image_quality import assess_image_quality
+from app.services.upload_service import StoredUpload, UploadRejected
+
+
+def scanned_page(width=1240, height=1754):
+    """
+    A flatbed scan: black text on white paper filling the frame
+    """
+    page = np.full((height, width), 255, dtype=np.uint8)
+    for line in range(5):
+        y = 150 + line * 80
+        cv2.putText(page, "Monthly Income: Rs. 60,000 Salaried", (90, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    return page
+
+
+def write_image(tmp_path, image, name="scan.png"):
+    path = tmp_path / name
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+def test_clean_white_scan_is_accepted(tmp_path):
+    report = assess_image_quality(write_image(tmp_path, scanned_page()))
+
+    # Nearly all paper, but the text is intact
+    assert report.metrics["brightness"] > 240 and report.metrics["clipped_bright"] > 0.9
+    assert report.accepted, report.reasons
+
+
+def test_unusable_images_are_rejected(tmp_path):
+    page = scanned_page()
+    blurred = cv2.GaussianBlur(page, (0, 0), 12)
+    dark = (page * 0.15).astype(np.uint8)
+    small = cv2.resize(page, (300, 424), interpolation=cv2.INTER_AREA)
+    # Glare washes the text out along with the paper
+    washed_out = np.maximum(page, 250).astype(np.uint8)
+
+    reasons = {
+        name: " ".join(assess_image_quality(write_image(tmp_path, image, f"{name}.png")).reasons)
+        for name, image in [("blurred", blurred), ("dark", dark), ("small", small), ("washed_out", washed_out)]
+    }
+
+    assert "blurry" in reasons["blurred"]
+    assert "too dark" in reasons["dark"]
+    assert "Resolution is too low" in reasons["small"]
+    assert "overexposed" in reasons["washed_out"]
+
+
+def test_rejected_uploads_are_deleted(tmp_path):
+    path = write_image(tmp_path, cv2.GaussianBlur(scanned_page(), (0, 0), 12))
+    upload = StoredUpload(path=path, size=Path(path).stat().st_size, sha256="", mime_type="image/png")
+
+    try:
+        asyncio.run(screen_document(upload))
+        rejected = None
+    except UploadRejected as e:
+        rejected = e
+
+    assert rejected is not None and rejected.status_code == 422
+    assert rejected.detail["reasons"]
+    assert not Path(path).exists()
+
+    accepted = write_image(tmp_path, scanned_page(), "clean.png")
+    report = asyncio.run(screen_document(StoredUpload(path=accepted, size=0, sha256="", mime_type="image/png")))
+    assert report.accepted and Path(accepted).exists()
@@ -0,0 +1,122 @@
+import asyncio
+import os
+from pathlib import Path
+
+from fastapi import WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from app.api.routes import close_with_error
+from app.core.config import settings
+from app.services import video_service
+from app.services.upload_service import UploadRejected
+from app.services.video_probe import VideoMetadata
+from app.services.video_service import LiveRecording
+
+WEBM_HEADER = b"\x1a\x45\xdf\xa3"
+METADATA = VideoMetadata(duration=4.0, video_codec="vp8", width=640, height=480, frame_rate=30.0, frame_count=120, has_audio=True)
+
+
+def test_failed_live_scan_does_not_fail_the_recording(monkeypatch):
+    searched = []
+
+    async def screen_video(upload, require_duration=False):
+        assert require_duration
+        return METADATA
+
+    async def verify_face(video_path, frame_count=None):
+        searched.append(frame_count)
+        return {"face_found": True, "detection_score": 0.9}
+
+    async def failing_scan():
+        raise asyncio.TimeoutError()
+
+    async def run():
+        recording = LiveRecording()
+        await recording.upload.write(WEBM_HEADER + os.urandom(1024))
+        recording._scan = asyncio.create_task(failing_scan())
+        return await recording.finish()
+
+    monkeypatch.setattr(video_service, "screen_video", screen_video)
+    monkeypatch.setattr(video_service, "verify_face", verify_face)
+    upload, face_result, metadata = asyncio.run(run())
+
+    # The whole video is searched instead
+    assert searched == [120]
+    assert face_result["face_found"] and metadata is METADATA
+    assert Path(upload.path).exists()
+
+
+def test_live_scans_stop_after_the_frame_limit():
+    async def run():
+        recording = LiveRecording()
+        recording._last_scan = 0.0
+        recording._next_frame = settings.FACE_STREAM_MAX_FRAMES
+        await recording.add_chunk(WEBM_HEADER + os.urandom(1024))
+        scan = recording._scan
+        await recording.discard()
+        return scan
+
+    # Due, unconfident and still recording, but past the frames live scans cover
+    assert asyncio.run(run()) is None
+
+
+def test_recording_is_cut_off_once_it_runs_past_the_duration_limit():
+    async def run():
+        recording = LiveRecording()
+        await recording.add_chunk(WEBM_HEADER + os.urandom(1024))
+        recording._started -= settings.MAX_VIDEO_DURATION + settings.VIDEO_STREAM_ALLOWANCE + 1
+        try:
+            await recording.add_chunk(os.urandom(1024))
+            return None
+        except UploadRejected as e:
+            return e
+        finally:
+            await recording.discard()
+
+    rejected = asyncio.run(run())
+    assert rejected is not None and rejected.status_code == 422
+
+
+def test_rejected_stream_gets_an_error_message(client, monkeypatch):
+    # Live scans off, and every recording is already past the duration limit
+    monkeypatch.setattr(settings, "FACE_STREAM_MAX_FRAMES", 0)
+    monkeypatch.setattr(settings, "MAX_VIDEO_DURATION", -1)
+    monkeypatch.setattr(settings, "VIDEO_STREAM_ALLOWANCE", 0)
+
+    with client.websocket_connect("/video-interaction/stream?question_id=1&user_id=1") as websocket:
+        websocket.send_bytes(WEBM_HEADER + os.urandom(1024))
+        websocket.send_bytes(os.urandom(1024))
+        message = websocket.receive_json()
+        closed = websocket.receive()
+
+    assert message["type"] == "error" and message["status_code"] == 422
+    assert closed["type"] == "websocket.close" and closed["code"] == 1008
+
+
+def test_errors_are_not_sent_to_clients_that_went_away():
+    class Socket:
+        def __init__(self, client_state, send_error=None):
+            self.client_state = client_state
+            self.application_state = WebSocketState.CONNECTED
+            self.send_error = send_error
+            self.sent = []
+
+        async def send_json(self, data):
+            if self.send_error is not None:
+                raise self.send_error
+            self.sent.append(data)
+
+        async def close(self, code=1000):
+            self.sent.append(code)
+
+    gone = Socket(WebSocketState.DISCONNECTED)
+    asyncio.run(close_with_error(gone, 500, "boom", code=1011))
+    assert gone.sent == []
+
+    # Disconnected between the state check and the send
+    leaving = Socket(WebSocketState.CONNECTED, send_error=WebSocketDisconnect(1006))
+    asyncio.run(close_with_error(leaving, 500, "boom", code=1011))
+
+    connected = Socket(WebSocketState.CONNECTED)
+    asyncio.run(close_with_error(connected, 500, "boom", code=1011))
+    assert connected.sent == [{"type": "error", "status_code": 500, "detail": "boom"}, 1011]
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.core.config import settings
+from app.models.models import Document, DocumentType, JobStatus, LoanApplication, LoanStatus, User
+from app.services import eligibility_state as state_module
+from app.services.eligibility_state import current_eligibility, initialize_eligibility
+
+EXTRACTED = {
+    DocumentType.AADHAAR: {"name": "Asha Rao", "dob": "01/02/1990", "aadhaar_number": "123456789012"},
+    DocumentType.PAN: {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"},
+    DocumentType.INCOME_PROOF: {"monthly_income": 60000, "employment_type": "salaried"},
+}
+
+
+async def create_application(db):
+    async with db.Session() as session:
+        user = User(email="asha@example.com")
+        application = LoanApplication(
+            user=user, loan_amount=500000, loan_type="personal", monthly_income=60000, employment_type="salaried"
+        )
+        documents = [
+            Document(user=user, loan_application=application, document_type=document_type,
+                     extracted_data=data, status=JobStatus.COMPLETED)
+            for document_type, data in EXTRACTED.items()
+        ]
+        session.add_all([application, *documents])
+        await session.flush()
+        initialize_eligibility(application, documents)
+        await session.commit()
+        return application.id
+
+
+def test_eligibility_reads_one_row_and_no_documents(db, monkeypatch):
+    application_id = asyncio.run(create_application(db))
+    parsed = []
+    monkeypatch.setattr(state_module, "parse_extracted_data", lambda document: parsed.append(document.id))
+
+    async def run():
+        db.statements.clear()
+        async with db.Session() as session:
+            return current_eligibility(await session.get(LoanApplication, application_id))
+
+    result = asyncio.run(run())
+
+    assert result["status"] == LoanStatus.APPROVED
+    assert [document["type"] for document in result["documents"]] == ["aadhaar", "pan", "income_proof"]
+    # The decision comes from the stored state: one SELECT, no document loaded or parsed
+    assert len(db.statements) == 1 and db.statements[0].lstrip().upper().startswith("SELECT")
+    assert "documents" not in db.statements[0]
+    assert parsed == []
+
+
+def test_create_loan_application_is_one_insert_and_one_commit(db, client):
+    db.statements.clear()
+    db.commits.clear()
+    response = client.post("/loan-applications", data={
+        "loan_amount": 100000, "loan_type": "personal", "monthly_income": 50000,
+        "employment_type": "salaried", "user_id": 1,
+    })
+
+    assert response.status_code == 200
+    assert response.json()["eligibility_result"]["status"] == LoanStatus.MORE_INFO_NEEDED
+    assert len(db.statements) == 1 and db.statements[0].lstrip().upper().startswith("INSERT")
+    assert len(db.commits) == 1
+
+    saved = client.get(f"/loan-applications/{response.json()['loan_application_id']}").json()
+    assert saved["status"] == LoanStatus.MORE_INFO_NEEDED
+
+
+def test_document_upload_locks_the_application_before_inserting(db, client):
+    application_id = asyncio.run(create_application(db))
+    upload = lambda: {"document": ("statement.pdf", b"%PDF-1.7\n" + b"0" * 64, "application/pdf")}
+
+    db.statements.clear()
+    response = client.post("/documents", files=upload(), data={
+        "document_type": "bank_statement", "user_id": 1, "loan_application_id": application_id,
+    })
+    assert response.status_code == 202, response.text
+    # The application row is read (FOR UPDATE on Postgres) before the document insert
+    # takes its foreign key lock
+    writes = [statement.lstrip().split()[0].upper() for statement in db.statements]
+    assert writes.index("SELECT") < writes.index("INSERT")
+    assert "loan_applications" in db.statements[writes.index("SELECT")]
+
+    saved = set((settings.UPLOAD_DIR / "documents").iterdir())
+    response = client.post("/documents", files=upload(), data={
+        "document_type": "bank_statement", "user_id": 1, "loan_application_id": 999999,
+    })
+    assert response.status_code == 404
+    assert set((settings.UPLOAD_DIR / "documents").iterdir()) == saved
+
@@ -0,0 +1,84 @@
+import sys
+import types
+
+import numpy as np
+
+from app.core.config import settings
+from app.services import document_service
+
+
+class FakeEngine:
+    """
+    Records what a tesserocr PyTessBaseAPI is asked to do
+    """
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.variables = {"tessedit_char_whitelist": ""}
+        self.images = []
+        FakeEngine.created.append(self)
+
+    def GetVariableAsString(self, name):
+        return self.variables.get(name)
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+
+    def SetImageBytes(self, data, width, height, channels, stride):
+        self.images.append((width, height, channels, stride))
+
+    def Recognize(self, timeout=0):
+        self.seen_whitelist = self.variables["tessedit_char_whitelist"]
+        return True
+
+    def GetUTF8Text(self):
+        return f"psm {self.psm} whitelist {self.seen_whitelist}"
+
+    def Clear(self):
+        pass
+
+
+def backend_for(monkeypatch, value):
+    """
+    The OCR backend `get_ocr_backend` picks when OCR_BACKEND is `value`
+    """
+    monkeypatch.setattr(settings, "OCR_BACKEND", value)
+    monkeypatch.setattr(document_service, "_ocr_backend", None)
+    return document_service.get_ocr_backend()
+
+
+def test_parse_tesseract_config():
+    assert document_service.parse_tesseract_config("") == (3, {})
+    assert document_service.parse_tesseract_config("--psm 7 -c tessedit_char_whitelist=0123456789") == (
+        7, {"tessedit_char_whitelist": "0123456789"}
+    )
+
+
+def test_auto_falls_back_to_the_tesseract_binary(tmp_path, monkeypatch):
+    # No language data here, so the in-process engine can't start
+    monkeypatch.setattr(settings, "TESSDATA_DIR", str(tmp_path))
+    assert backend_for(monkeypatch, "auto").name == "subprocess"
+
+    backend = backend_for(monkeypatch, "subprocess")
+    assert isinstance(backend, document_service.SubprocessOcrBackend)
+
+
+def test_in_process_engine_is_reused_and_left_clean(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeEngine))
+    FakeEngine.created = []
+    backend = backend_for(monkeypatch, "tesserocr")
+    gray = np.zeros((20, 30), dtype=np.uint8)
+    first = backend.recognize(gray, "--psm 7 -c tessedit_char_whitelist=0123456789")
+    second = backend.recognize(np.zeros((20, 30, 3), dtype=np.uint8))
+
+    assert first == "psm 7 whitelist 0123456789"
+    # The whitelist from the first call doesn't leak into the next one
+    assert second == "psm 3 whitelist "
+    # One engine, loaded once, fed in-memory pixels
+    assert len(FakeEngine.created) == 1
+    assert FakeEngine.created[0].kwargs["lang"] == settings.OCR_LANGUAGE
+    assert FakeEngine.created[0].images == [(30, 20, 1, 30), (30, 20, 3, 90)]
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+
+from app.models.models import DocumentType
+from app.services.ocr_cache import OcrResultCache
+
+PAN_DATA = {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"}
+
+
+def new_cache(cache_dir=None, version="v1", max_entries=16, max_disk_bytes=1024 * 1024):
+    return OcrResultCache(Path(cache_dir or tempfile.mkdtemp()), version, max_entries, max_disk_bytes)
+
+
+def test_hits_from_memory_and_disk():
+    cache_dir = tempfile.mkdtemp()
+
+    async def run():
+        cache = new_cache(cache_dir)
+        assert await cache.get("abc", DocumentType.PAN) is None
+        await cache.set("abc", DocumentType.PAN, PAN_DATA)
+        from_memory = await cache.get("abc", DocumentType.PAN)
+        # A fresh process only has the disk tier
+        from_disk = await new_cache(cache_dir).get("abc", DocumentType.PAN)
+        other_type = await cache.get("abc", DocumentType.AADHAAR)
+        return from_memory, from_disk, other_type
+
+    from_memory, from_disk, other_type = asyncio.run(run())
+    assert from_memory == PAN_DATA and from_disk == PAN_DATA
+    assert other_type is None
+
+
+def test_hits_are_copies():
+    async def run():
+        cache = new_cache()
+        data = dict(PAN_DATA)
+        await cache.set("abc", DocumentType.PAN, data)
+        data["name"] = "changed after set"
+        hit = await cache.get("abc", DocumentType.PAN)
+        hit["name"] = "changed after get"
+        return await cache.get("abc", DocumentType.PAN)
+
+    assert asyncio.run(run()) == PAN_DATA
+
+
+def test_new_version_drops_old_entries():
+    cache_dir = tempfile.mkdtemp()
+
+    async def run():
+        await new_cache(cache_dir, version="v1").set("abc", DocumentType.PAN, PAN_DATA)
+        return await new_cache(cache_dir, version="v2").get("abc", DocumentType.PAN)
+
+    assert asyncio.run(run()) is None
+    assert [entry.name for entry in os.scandir(cache_dir)] == ["v2"]
+
+
+def test_disk_tier_is_trimmed_oldest_first():
+    entry_size = len(b'{"n": 0}')
+    cache = new_cache(max_disk_bytes=entry_size * 3)
+
+    async def run():
+        for n in range(4):
+            await cache.set(f"hash{n}", DocumentType.PAN, {"n": n})
+            # Distinct mtimes so the oldest entry is unambiguous
+            path = cache.version_dir / f"{cache._key(f'hash{n}', DocumentType.PAN)}.json"
+            os.utime(path, (n, n))
+        return [await cache.get(f"hash{n}", DocumentType.PAN) for n in range(4)]
+
+    assert asyncio.run(run()) == [None, None, {"n": 2}, {"n": 3}]
+    assert cache._disk_bytes == 2 * entry_size
+
+
+def test_rewriting_a_key_does_not_grow_the_disk_tier():
+    cache = new_cache()
+
+    async def run():
+        for _ in range(5):
+            await cache.set("abc", DocumentType.PAN, PAN_DATA)
+        await cache.set("def", DocumentType.PAN, {"n": 1})
+
+    asyncio.run(run())
+    assert cache._disk_bytes == sum(entry.stat().st_size for entry in os.scandir(cache.version_dir))
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+from app.services import document_service
+
+TIER_TEXTS = {
+    "fast": "Monthly Income: Rs. 60,000",
+    "standard": "Employment Type: Salaried",
+    "enhanced": "Employer Name: Acme Textiles",
+}
+
+
+def run_with_tiers(tmp_path, monkeypatch, document_type, tier_texts):
+    image_path = tmp_path / "payslip.png"
+    cv2.imwrite(str(image_path), np.full((400, 600), 255, dtype=np.uint8))
+    configs = []
+
+    def tier(name):
+        # Tag the image with the pass it went through so recognize can tell them apart
+        return name, lambda gray: name, 3
+
+    def recognize(image, config=""):
+        configs.append((image, config))
+        return tier_texts[image]
+
+    monkeypatch.setattr(document_service, "OCR_TIERS", [tier(name) for name in ("fast", "standard", "enhanced")])
+    monkeypatch.setattr(document_service, "recognize_text", recognize)
+    extracted, resolved = document_service.run_document_extraction(str(image_path), document_type)
+    return extracted, resolved, configs
+
+
+def test_escalation_stops_at_the_first_sufficient_pass(tmp_path, monkeypatch):
+    extracted, resolved, configs = run_with_tiers(tmp_path, monkeypatch, "income_proof", TIER_TEXTS)
+
+    # Fields from the fast pass are kept; the enhanced pass never runs
+    assert resolved == "standard"
+    assert [tier for tier, _ in configs] == ["fast", "standard"]
+    assert extracted["monthly_income"] == 60000
+    assert extracted["employment_type"] == "Salaried"
+    # Only the fast pass is restricted to the document type's characters
+    assert "tessedit_char_whitelist" in configs[0][1]
+    assert "tessedit_char_whitelist" not in configs[1][1]
+
+
+def test_escalation_reports_unresolved_documents(tmp_path, monkeypatch):
+    extracted, resolved, configs = run_with_tiers(tmp_path, monkeypatch, "income_proof", {name: "" for name in TIER_TEXTS})
+
+    assert resolved == "unresolved"
+    assert len(configs) == 3
+    assert not extracted["monthly_income"]
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+
+from app.models.models import Document, DocumentType, JobStatus, LoanApplication, LoanStatus
+
+STATUSES = [LoanStatus.PENDING, LoanStatus.APPROVED, LoanStatus.REJECTED, LoanStatus.MORE_INFO_NEEDED]
+
+
+def seed(db):
+    with db.SyncSession() as session:
+        applications = [
+            LoanApplication(user_id=i % 3, loan_amount=100000, loan_type="personal", status=STATUSES[i % 4])
+            for i in range(25)
+        ]
+        session.add_all(applications)
+        session.flush()
+        session.add_all([
+            Document(user_id=1, loan_application_id=applications[0].id, document_type=DocumentType.PAN, status=JobStatus.COMPLETED)
+            for _ in range(7)
+        ])
+        session.commit()
+        return [application.id for application in applications]
+
+
+def read_all(api, path, limit, **params):
+    items, cursor, pages = [], None, 0
+    while True:
+        response = api.get(path, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages += 1
+        items.extend(response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+def test_keyset_pages_cover_every_row_once(db, client):
+    ids = seed(db)
+
+    items, pages = read_all(client, "/loan-applications", 10)
+    assert [item["id"] for item in items] == sorted(ids, reverse=True)
+    assert pages == 3
+
+    approved, _ = read_all(client, "/loan-applications", 2, status="approved")
+    assert [item["id"] for item in approved] == sorted((ids[i] for i in range(1, 25, 4)), reverse=True)
+    assert all(item["status"] == LoanStatus.APPROVED for item in approved)
+
+    documents, pages = read_all(client, "/documents", 3, loan_application_id=ids[0])
+    assert len(documents) == 7 and pages == 3
+
+    assert client.get("/loan-applications", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/loan-applications", params={"status": "unknown"}).status_code == 422
+
+
+def test_later_pages_use_the_index_without_sorting(db, client):
+    seed(db)
+    statements = []
+    event.listen(
+        db.engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    )
+    first = client.get("/loan-applications", params={"status": "pending", "limit": 2}).json()
+    statements.clear()
+    client.get("/loan-applications", params={"status": "pending", "limit": 2, "cursor": first["next_cursor"]})
+
+    (statement, parameters), = [(s, p) for s, p in statements if s.lstrip().upper().startswith("SELECT")]
+    with db.sync_engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    # A range seek on (status, id), read in index order: no scan and no sort step
+    assert any("USING INDEX ix_loan_applications_status_id (status=? AND id<?)" in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
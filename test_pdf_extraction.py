@@ -0,0 +1,48 @@
+import asyncio
+
+from app.services import document_service
+
+# (text layer, OCR text, seconds the page's OCR takes); later pages finish OCR first
+PAGES = [
+    (None, "Employer Name: Acme Textiles", 0.2),
+    (None, "Employer Name: Other Co\nMonthly Income: 60000", 0.1),
+    ("Employment Type: Salaried", None, 0),
+    (None, "Monthly Income: 99000\nEmployment Type: Self Employed", 0.3),
+]
+
+
+class InlinePool:
+    """
+    Runs tasks on the event loop, each taking its page's OCR time
+    """
+
+    def __init__(self):
+        self.finished = []
+
+    async def run(self, fn, *args, timeout=None):
+        if fn is document_service.run_pdf_page_ocr:
+            await asyncio.sleep(PAGES[args[1]][2])
+            self.finished.append(args[1])
+        return fn(*args)
+
+
+def test_pages_merge_in_page_order_and_stop_once_complete(monkeypatch):
+    pool = InlinePool()
+    monkeypatch.setattr(document_service, "ocr_pool", pool)
+    monkeypatch.setattr(document_service, "read_pdf_text_layer", lambda file_path: [text for text, _, _ in PAGES])
+    monkeypatch.setattr(document_service, "run_pdf_page_ocr", lambda file_path, index: PAGES[index][1])
+
+    async def run():
+        extracted = await document_service.extract_pdf_data("statement.pdf", "income_proof")
+        # Give a page that wasn't cancelled time to finish
+        await asyncio.sleep(0.4)
+        return extracted
+
+    extracted = asyncio.run(run())
+
+    # Page 1 finished first, but page 0's equally confident value comes first in the document
+    assert extracted["employer_name"] == "Acme Textiles"
+    assert extracted["monthly_income"] == 60000
+    assert extracted["employment_type"] == "Salaried"
+    # Every required field was found by page 2, so page 3 was cancelled
+    assert sorted(pool.finished) == [0, 1]
@@ -0,0 +1,142 @@
+import numpy as np
+from sqlalchemy import insert, select
+
+from app.models.models import Document, DocumentType, JobStatus, LoanApplication, LoanStatus
+from app.services.eligibility_rules import compile_ruleset, parse_ruleset
+from app.services.eligibility_state import current_eligibility, initialize_eligibility
+from app.services.loan_service import EvaluationContext
+from app.services.portfolio_rescoring import rescore_portfolio
+
+rng = np.random.default_rng(11)
+STATUSES = [LoanStatus.PENDING, LoanStatus.APPROVED, LoanStatus.REJECTED, LoanStatus.MORE_INFO_NEEDED]
+EMPLOYMENT_TYPES = ["Salaried", "self-employed", "Self Employed", "business", "freelance"]
+TIGHTER = parse_ruleset({
+    "version": "tighter",
+    "min_monthly_income": 40000,
+    "max_loan_multiplier": 18,
+    "employment_types": {"salaried": 1.0, "self employed": 0.75, "business": 0.5},
+    "required_documents": {"default": ["aadhaar", "pan", "income_proof"]},
+})
+LOOSER_RULES = {
+    "version": "looser",
+    "min_monthly_income": 25000,
+    "max_loan_multiplier": 24,
+    "employment_types": {"salaried": 1.0},
+    "required_documents": {"default": ["aadhaar", "pan", "income_proof"]},
+}
+EXTRACTED = {
+    DocumentType.AADHAAR: {"name": "Asha Rao", "dob": "01/02/1990", "aadhaar_number": "123456789012"},
+    DocumentType.PAN: {"name": "Asha Rao", "dob": "01/02/1990", "pan_number": "ABCPE1234F"},
+    DocumentType.INCOME_PROOF: {"monthly_income": 60000, "employment_type": "Salaried"},
+}
+
+
+def seed(db, count=1000):
+    incomes = rng.uniform(10000, 200000, count).round(2)
+    amounts = (incomes * rng.uniform(1, 30, count)).round(2)
+    with db.SyncSession() as session:
+        session.execute(insert(LoanApplication), [
+            {
+                "user_id": 1, "loan_type": "personal", "employment_type": EMPLOYMENT_TYPES[i % len(EMPLOYMENT_TYPES)],
+                "monthly_income": float(income), "loan_amount": float(amount),
+                "status": STATUSES[i % len(STATUSES)],
+            }
+            for i, (income, amount) in enumerate(zip(incomes, amounts))
+        ])
+        session.commit()
+
+
+def expected_statuses(db, ruleset):
+    """
+    Re-score one ORM object at a time with the compiled decision function. Without
+    documents it fails on the threshold rules first, or else on the missing documents.
+    """
+    decide = compile_ruleset(ruleset).decide
+    with db.SyncSession() as session:
+        expected = {}
+        for application in session.scalars(select(LoanApplication)):
+            status = application.status
+            decision = decide(EvaluationContext(application=application, documents=[]))
+            # Failing the thresholds rejects; passing them again lets the documents decide
+            if decision["status"] == LoanStatus.REJECTED or status == LoanStatus.REJECTED:
+                status = decision["status"]
+            expected[application.id] = status
+        return expected
+
+
+def current_statuses(db):
+    with db.SyncSession() as session:
+        return dict(session.execute(select(LoanApplication.id, LoanApplication.status)).all())
+
+
+def test_what_if_report_matches_per_application_checks_and_writes_nothing(db):
+    seed(db)
+    before = current_statuses(db)
+    expected = expected_statuses(db, TIGHTER)
+
+    # A small chunk size, so paging crosses many chunk boundaries
+    report = rescore_portfolio(TIGHTER, chunk_size=64, session_factory=db.SyncSession)
+
+    changed = {application_id for application_id in before if expected[application_id] != before[application_id]}
+    assert report.scanned == len(before)
+    assert report.changed == len(changed) > 0
+    assert set(np.concatenate(report.changed_ids).tolist()) == changed
+    assert set(report.changes) == {
+        "pending -> rejected", "approved -> rejected", "more_info_needed -> rejected", "rejected -> more_info_needed"
+    }
+    assert report.unsupported_employment > 0
+    assert current_statuses(db) == before
+
+
+def test_apply_writes_changed_statuses(db):
+    seed(db)
+    expected = expected_statuses(db, TIGHTER)
+
+    report = rescore_portfolio(TIGHTER, apply=True, chunk_size=100, session_factory=db.SyncSession)
+    assert report.applied and report.changed > 0
+    assert current_statuses(db) == expected
+    with db.SyncSession() as session:
+        changed = session.execute(
+            select(LoanApplication.status, LoanApplication.ruleset_version, LoanApplication.eligibility_state)
+            .where(LoanApplication.id.in_(np.concatenate(report.changed_ids).tolist()))
+        ).all()
+    assert {version for _, version, _ in changed} == {"tighter"}
+    # Each saved state carries the same decision as the status
+    assert all(state["decision"]["status"] == status.value for status, _, state in changed)
+
+    # Scoring again against the same rules finds nothing left to change
+    assert rescore_portfolio(TIGHTER, session_factory=db.SyncSession).changed == 0
+
+
+
+def test_looser_rules_reinstate_rejected_applications_with_their_state(db):
+    strict = compile_ruleset(parse_ruleset({**LOOSER_RULES, "version": "strict", "min_monthly_income": 80000}))
+    with db.SyncSession() as session:
+        application = LoanApplication(
+            user_id=1, loan_type="personal", employment_type="Salaried", monthly_income=60000, loan_amount=500000
+        )
+        session.add(application)
+        session.flush()
+        documents = [
+            Document(user_id=1, loan_application_id=application.id, document_type=document_type,
+                     status=JobStatus.COMPLETED, extracted_data=data)
+            for document_type, data in EXTRACTED.items()
+        ]
+        session.add_all(documents)
+        session.flush()
+        initialize_eligibility(application, documents, rules=strict)
+        session.commit()
+        application_id = application.id
+        assert application.status == LoanStatus.REJECTED
+
+    looser = parse_ruleset(LOOSER_RULES)
+    report = rescore_portfolio(looser, apply=True, session_factory=db.SyncSession)
+    assert report.changes == {"rejected -> approved": 1}
+
+    with db.SyncSession() as session:
+        application = session.get(LoanApplication, application_id)
+        assert application.status == LoanStatus.APPROVED
+        assert application.ruleset_version == "looser"
+        # The stored decision moved with the status, so cached reads agree with it
+        assert application.eligibility_state["decision"]["status"] == LoanStatus.APPROVED.value
+        assert current_eligibility(application, rules=compile_ruleset(looser))["status"] == LoanStatus.APPROVED
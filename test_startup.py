@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.schema import alembic_config, migrate
+from app.models.models import Document, JobStatus, LoanApplication, VideoInteraction
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+
+# What create_all built on SQLite before any of the migrated columns existed
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY, email VARCHAR, hashed_password VARCHAR, full_name VARCHAR,
+    phone_number VARCHAR, is_active BOOLEAN, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME
+);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_users_id ON users (id);
+CREATE TABLE loan_applications (
+    id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER REFERENCES users (id), loan_amount FLOAT,
+    loan_type VARCHAR, status VARCHAR(16), monthly_income FLOAT, employment_type VARCHAR,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME
+);
+CREATE INDEX ix_loan_applications_id ON loan_applications (id);
+CREATE TABLE video_interactions (
+    id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER REFERENCES users (id), video_path VARCHAR,
+    question_id INTEGER, response_text VARCHAR, face_verified BOOLEAN, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX ix_video_interactions_id ON video_interactions (id);
+CREATE TABLE documents (
+    id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER REFERENCES users (id),
+    loan_application_id INTEGER REFERENCES loan_applications (id), document_type VARCHAR(14),
+    file_path VARCHAR, extracted_data VARCHAR, is_verified BOOLEAN, created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX ix_documents_id ON documents (id);
+INSERT INTO users (id, email) VALUES (1, 'asha@example.com');
+INSERT INTO loan_applications (id, user_id, loan_amount, status) VALUES (1, 1, 100000, 'PENDING');
+INSERT INTO documents (id, user_id, loan_application_id, document_type, extracted_data)
+    VALUES (1, 1, 1, 'PAN', '{"pan_number": "ABCPE1234F"}');
+INSERT INTO video_interactions (id, user_id, response_text) VALUES (1, 1, 'My name is Asha');
+"""
+
+
+def schema_of(engine) -> dict:
+    inspector = inspect(engine)
+    with engine.connect() as conn:
+        # Reflection skips expression indexes; sqlite_master lists them all
+        indexes = conn.execute(text("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")).all()
+    return {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {name for indexed, name in indexes if indexed == table},
+        )
+        for table in inspector.get_table_names() if table != "alembic_version"
+    }
+
+
+def test_importing_the_app_is_side_effect_free():
+    workdir = Path(tempfile.mkdtemp())
+    env = {
+        **os.environ,
+        # Nothing may connect at import, so a database that doesn't exist is fine
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{workdir}/missing/app.db",
+        "UPLOAD_DIR": str(workdir / "uploads"),
+    }
+    code = (
+        "import json, sys; import app.main; "
+        "print(json.dumps([m for m in ('numpy', 'cv2', 'pytesseract', 'pypdfium2', 'PIL', 'face_recognition') if m in sys.modules]))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+
+    assert json.loads(output.stdout.strip().splitlines()[-1]) == []
+    assert list(workdir.iterdir()) == []
+
+
+def test_schema_is_created_then_migrated():
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp()}/schema.db")
+
+    assert migrate(engine) == "created"
+    tables = set(inspect(engine).get_table_names())
+    assert {"users", "loan_applications", "documents", "video_interactions", "alembic_version"} <= tables
+    with engine.connect() as conn:
+        stamped = conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+    # An up-to-date database is left as it is
+    assert migrate(engine) == "upgraded"
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == stamped
+
+
+def test_migrations_build_the_models_schema():
+    migrated = create_engine(f"sqlite:///{tempfile.mkdtemp()}/migrated.db")
+    with migrated.begin() as connection:
+        command.upgrade(alembic_config(connection), "head")
+    created = create_engine(f"sqlite:///{tempfile.mkdtemp()}/created.db")
+    Base.metadata.create_all(bind=created)
+
+    assert schema_of(migrated) == schema_of(created)
+
+
+def test_baseline_database_is_upgraded():
+    engine = create_engine(f"sqlite:///{tempfile.mkdtemp()}/baseline.db")
+    with engine.begin() as connection:
+        connection.connection.executescript(BASELINE_SCHEMA)
+
+    assert migrate(engine) == "upgraded"
+
+    created = create_engine(f"sqlite:///{tempfile.mkdtemp()}/created.db")
+    Base.metadata.create_all(bind=created)
+    assert schema_of(engine) == schema_of(created)
+    with Session(engine) as db:
+        document = db.get(Document, 1)
+        assert document.status == JobStatus.COMPLETED and document.progress == 100
+        assert document.extracted_data == {"pan_number": "ABCPE1234F"}
+        assert db.get(VideoInteraction, 1).transcription_status == JobStatus.COMPLETED
+        assert db.get(LoanApplication, 1).eligibility_state is None
@@ -0,0 +1,59 @@
+import asyncio
+import hashlib
+import io
+import os
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from app.core.config import settings
+from app.services.upload_service import UploadRejected, save_upload, sniff_mime_type
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def make_upload(content, filename="scan.png", size=None):
+    return UploadFile(io.BytesIO(content), filename=filename, size=size)
+
+
+def test_sniff_mime_type():
+    assert sniff_mime_type(PNG_HEADER + b"rest") == "image/png"
+    assert sniff_mime_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+    assert sniff_mime_type(b"%PDF-1.7") == "application/pdf"
+    assert sniff_mime_type(b"\x1a\x45\xdf\xa3") == "video/webm"
+    assert sniff_mime_type(b"\x00\x00\x00\x18ftypisom") == "video/mp4"
+    assert sniff_mime_type(b"\x00\x00\x00\x14ftypqt  ") == "video/quicktime"
+    assert sniff_mime_type(b"GIF89a") is None
+
+
+def test_save_upload_streams_and_hashes():
+    content = PNG_HEADER + os.urandom(3 * settings.UPLOAD_CHUNK_SIZE + 17)
+    stored = asyncio.run(save_upload(
+        make_upload(content), "documents", ["image/png"], max_size=len(content)
+    ))
+
+    assert stored.mime_type == "image/png"
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert stored.path.endswith(".png")
+    assert Path(stored.path).read_bytes() == content
+
+
+def test_save_upload_rejects_oversized_stream():
+    content = PNG_HEADER + os.urandom(2 * settings.UPLOAD_CHUNK_SIZE)
+    target_dir = settings.UPLOAD_DIR / "oversized"
+    try:
+        # size=None forces the limit to be enforced while streaming
+        asyncio.run(save_upload(make_upload(content), "oversized", ["image/png"], max_size=1024))
+        assert False, "expected UploadRejected"
+    except UploadRejected as e:
+        assert e.status_code == 413
+    assert not any(target_dir.iterdir())
+
+
+def test_save_upload_rejects_unsupported_type():
+    try:
+        asyncio.run(save_upload(make_upload(b"GIF89a....", "x.gif"), "documents", ["image/png"], 1024))
+        assert False, "expected UploadRejected"
+    except UploadRejected as e:
+        assert e.status_code == 415
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import shutil
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.upload_service import StoredUpload, UploadRejected
+from app.services.video_probe import VideoMetadata, check_video_metadata, probe_video
+from app.services.video_service import screen_video
+
+SAMPLE_VIDEO = Path(__file__).parent / "test_data" / "videos" / "test_video.mp4"
+
+
+def stored(path):
+    return StoredUpload(path=str(path), size=path.stat().st_size, sha256="", mime_type="video/mp4")
+
+
+def test_probe_reads_container_metadata():
+    metadata = asyncio.run(probe_video(str(SAMPLE_VIDEO)))
+
+    assert (metadata.width, metadata.height) == (640, 480)
+    assert metadata.frame_rate == 30
+    assert metadata.frame_count == 140
+    assert abs(metadata.duration - 140 / 30) < 0.1
+    assert check_video_metadata(metadata) is None
+
+
+def test_check_rejects_long_and_unsupported_videos():
+    base = dict(video_codec="h264", width=640, height=480, frame_rate=30.0, frame_count=None, has_audio=True)
+
+    too_long = VideoMetadata(duration=settings.MAX_VIDEO_DURATION + 1, **base)
+    assert "at most" in check_video_metadata(too_long)
+
+    unsupported = VideoMetadata(duration=10.0, **{**base, "video_codec": "mjpeg"})
+    assert "Unsupported video codec" in check_video_metadata(unsupported)
+
+    # Duration missing from the headers is not a reason to reject, unless one is required
+    assert check_video_metadata(VideoMetadata(duration=None, **base)) is None
+    assert "duration" in check_video_metadata(VideoMetadata(duration=None, **base), require_duration=True)
+
+
+def test_screen_video_rejects_corrupt_files_before_decode():
+    corrupt = Path(settings.UPLOAD_DIR) / "corrupt.mp4"
+    corrupt.write_bytes(b"\x00\x00\x00\x18ftypisom" + os.urandom(2048))
+
+    try:
+        asyncio.run(screen_video(stored(corrupt)))
+        assert False, "corrupt video was accepted"
+    except UploadRejected as e:
+        assert e.status_code == 422
+    assert not corrupt.exists()
+
+    copy = Path(settings.UPLOAD_DIR) / "answer.mp4"
+    shutil.copy(SAMPLE_VIDEO, copy)
+    assert asyncio.run(screen_video(stored(copy))).frame_count == 140
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import sys
+import time
+
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.workers import ProcessPool
+from app.services import document_service
+
+# Worker-side stand-ins for the OCR tasks; workers import them from this module
+PAGE_SECONDS = 0.3
+PAGE_TEXTS = [
+    "Employer Name: Acme Textiles",
+    "Statement period: April",
+    "",
+    "",
+    "",
+    "",
+    "Monthly Income: Rs. 60,000",
+    "Employment Type: Salaried",
+]
+
+
+def worker_pid():
+    return os.getpid()
+
+
+def crash_worker():
+    # Stands in for an OOM kill or a segfault in native code
+    os._exit(1)
+
+
+def scanned_pages(file_path):
+    return [None] * len(PAGE_TEXTS)
+
+
+def slow_page_ocr(file_path, page_index):
+    time.sleep(PAGE_SECONDS)
+    return PAGE_TEXTS[page_index]
+
+
+def test_pool_restarts_after_a_worker_dies():
+    pool = ProcessPool(name="test-crash", max_workers=1, task_timeout=30)
+
+    async def run():
+        await pool.warm_up()
+        before = await pool.run(worker_pid)
+        try:
+            await pool.run(crash_worker)
+            crashed = None
+        except BrokenProcessPool as e:
+            crashed = e
+        after = await pool.run(worker_pid)
+        return before, crashed, after
+
+    try:
+        before, crashed, after = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert crashed is not None
+    # The next task got a fresh worker instead of the broken executor
+    assert after != before
+
+
+def test_workers_are_recycled_after_max_tasks():
+    if sys.version_info < (3, 11):
+        return
+    pool = ProcessPool(name="test-recycle", max_workers=1, max_tasks_per_child=2, task_timeout=30)
+
+    async def run():
+        return [await pool.run(worker_pid) for _ in range(4)]
+
+    try:
+        pids = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    assert pids[0] == pids[1] and pids[2] == pids[3]
+    assert pids[1] != pids[2]
+
+
+def test_pdf_pages_beyond_the_worker_count_are_not_timed_out_while_queued(monkeypatch):
+    # One worker and a timeout shorter than all pages together, but well above one page
+    pool = ProcessPool(name="test-ocr", max_workers=1, task_timeout=4 * PAGE_SECONDS, max_in_flight=1)
+    monkeypatch.setattr(document_service, "ocr_pool", pool)
+    monkeypatch.setattr(document_service, "read_pdf_text_layer", scanned_pages)
+    monkeypatch.setattr(document_service, "run_pdf_page_ocr", slow_page_ocr)
+
+    async def run():
+        # Import this module in the worker outside any measured task
+        await pool.run(scanned_pages, "statement.pdf", timeout=60)
+        return await document_service.extract_pdf_data("statement.pdf", "income_proof")
+
+    try:
+        extracted = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    # The fields are only on the last pages, which ran after every earlier page
+    assert extracted["monthly_income"] == 60000
+    assert extracted["employment_type"]
+    assert extracted["employer_name"] == "Acme Textiles"